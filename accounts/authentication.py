@@ -0,0 +1,221 @@
+"""Authentication classes of the accounts app"""
+
+import math
+import time
+from collections import OrderedDict
+from copy import copy
+from threading import Lock
+from typing import Any, override
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.authentication import (
+    SessionAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+from accounts.models import User
+
+
+def revoked_key(user_id: int) -> str:
+    """Return the shared cache key of the last revocation of a user"""
+    return f"accounts:revoked:{user_id}"
+
+
+class TokenCache:
+    """LRU cache of token keys to their user, each entry lives ttl seconds
+
+    The entries are kept per process. Revoking a user, when its token is
+    deleted or the user changes, drops its entries of this process and
+    writes the time of the revocation to the shared cache. Every hit checks
+    that time, so the other processes drop the entries loaded from the
+    database before it on their next hit. The workers must agree on the
+    clock, as they do on one host.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl: float = ttl
+        self.max_entries: int = max_entries
+        self._entries: OrderedDict[str, tuple[User, Token, float, int]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def get(self, key: str) -> tuple[User, Token] | None:
+        """Return the user and the token of the key if they are still fresh"""
+        entry: tuple[User, Token, float, int] | None = self._fresh(key)
+        if entry is None:
+            return None
+        revoked: int | None = caches["shared"].get(revoked_key(entry[0].pk))
+        return self._unless_revoked(key, entry, revoked)
+
+    async def aget(self, key: str) -> tuple[User, Token] | None:
+        """Return the user and the token of the key like get, on the event
+        loop"""
+        entry: tuple[User, Token, float, int] | None = self._fresh(key)
+        if entry is None:
+            return None
+        revoked: int | None = await caches["shared"].aget(revoked_key(entry[0].pk))
+        return self._unless_revoked(key, entry, revoked)
+
+    def _fresh(self, key: str) -> tuple[User, Token, float, int] | None:
+        """Return the entry of the key unless it expired"""
+        with self._lock:
+            entry: tuple[User, Token, float, int] | None = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _unless_revoked(
+        self, key: str, entry: tuple[User, Token, float, int], revoked: int | None
+    ) -> tuple[User, Token] | None:
+        """Return the user and the token of the entry, None when its user
+        was revoked since it was loaded"""
+        user, token, _expires, loaded = entry
+        if revoked is not None and revoked >= loaded:
+            self.invalidate_key(key)
+            return None
+        # Every request gets its own instance to change as it pleases
+        return copy(user), token
+
+    def set(self, key: str, user: User, token: Token, loaded: int) -> None:
+        """Store the user and the token of the key, loaded from the database
+        by a query started at loaded, in nanoseconds since the epoch"""
+        with self._lock:
+            self._entries[key] = (
+                copy(user),
+                token,
+                time.monotonic() + self.ttl,
+                loaded,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revoke_user(self, user_id: int) -> None:
+        """Forget every token of one user, in every process"""
+        self.invalidate_user(user_id)
+        # Older entries have expired by the time the revocation does
+        caches["shared"].set(
+            revoked_key(user_id), time.time_ns(), timeout=math.ceil(self.ttl)
+        )
+
+    def invalidate_key(self, key: str) -> None:
+        """Forget one token in this process"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget every token of one user in this process"""
+        with self._lock:
+            keys: list[str] = [
+                key
+                for key, (user, *_rest) in self._entries.items()
+                if user.pk == user_id
+            ]
+            for key in keys:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Forget every token of this process"""
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache: TokenCache = TokenCache(
+    ttl=settings.AUTH_TOKEN_CACHE_TTL,
+    max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES,
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that skips the Token + User query for the
+    tokens seen in the last AUTH_TOKEN_CACHE_TTL seconds
+
+    aauthenticate does the same on the event loop, for the async views
+    """
+
+    @override
+    def authenticate(self, request: Request) -> tuple[User, Token] | None:
+        key: str | None = self.get_key(request)
+        if key is None:
+            return None
+        return self.authenticate_credentials(key)
+
+    @override
+    def authenticate_credentials(self, key: str) -> tuple[User, Token]:
+        cached: tuple[User, Token] | None = token_cache.get(key)
+        if cached is not None:
+            return cached
+        loaded: int = time.time_ns()
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token, loaded)
+        return user, token
+
+    async def aauthenticate(self, request: Request) -> tuple[User, Token] | None:
+        """Authenticate the request with the async ORM"""
+        key: str | None = self.get_key(request)
+        if key is None:
+            return None
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key: str) -> tuple[User, Token]:
+        """Return the user and the token of the key with the async ORM"""
+        cached: tuple[User, Token] | None = await token_cache.aget(key)
+        if cached is not None:
+            return cached
+        loaded: int = time.time_ns()
+        try:
+            token: Token = await Token.objects.select_related("user").aget(key=key)
+        except Token.DoesNotExist:
+            raise AuthenticationFailed(_("Invalid token."))
+        if not token.user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+        token_cache.set(key, token.user, token, loaded)
+        return token.user, token
+
+    def get_key(self, request: Request) -> str | None:
+        """Return the key of the Authorization header, None for another scheme"""
+        auth: list[bytes] = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise AuthenticationFailed(
+                _("Invalid token header. No credentials provided.")
+            )
+        if len(auth) > 2:
+            raise AuthenticationFailed(
+                _("Invalid token header. Token string should not contain spaces.")
+            )
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed(
+                _(
+                    "Invalid token header. "
+                    "Token string should not contain invalid characters."
+                )
+            )
+
+
+class AsyncSessionAuthentication(SessionAuthentication):
+    """Session authentication which can also run on the event loop"""
+
+    async def aauthenticate(self, request: Request) -> tuple[User, None] | None:
+        """Authenticate the request like authenticate, with request.auser"""
+        auser: Any = getattr(request._request, "auser", None)
+        if auser is None:
+            return None
+        user: User = await auser()
+        if not user or not user.is_active:
+            return None
+        self.enforce_csrf(request)
+        return user, None
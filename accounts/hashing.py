@@ -0,0 +1,131 @@
+"""Password hashing off the request worker
+
+PBKDF2 runs on a small pool of threads instead of the thread serving the
+request. The pool accepts a bounded number of pending hashes, past that
+the request is rejected right away with a 429 instead of waiting in line.
+"""
+
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore
+from typing import Any, Callable, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.signals import user_login_failed
+
+from rest_framework.exceptions import Throttled
+from rest_framework.request import Request
+
+from accounts.models import User
+
+T = TypeVar("T")
+
+
+class HashingBusy(Throttled):
+    """Raised when the hashing pool has no room left for one more password"""
+
+    default_detail: str = "Too many login or signup requests, try again later."
+    default_code: str = "hashing_busy"
+
+
+class HashingPool:
+    """Thread pool running at most max_pending hashes at once"""
+
+    def __init__(self, max_workers: int, max_pending: int) -> None:
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hashing"
+        )
+        self._slots: BoundedSemaphore = BoundedSemaphore(max_pending)
+
+    def submit(self, function: Callable[..., T], *args: Any) -> Future[T]:
+        """Queue the function or raise HashingBusy if the pool is full"""
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy(wait=1)
+        try:
+            future: Future[T] = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _future: self._slots.release())
+        return future
+
+    def run(self, function: Callable[..., T], *args: Any) -> T:
+        """Run the function in the pool and wait for its result"""
+        return self.submit(function, *args).result()
+
+    async def arun(self, function: Callable[..., T], *args: Any) -> T:
+        """Run the function in the pool without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(function, *args))
+
+
+hashing_pool: HashingPool = HashingPool(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    max_pending=settings.PASSWORD_HASHING_MAX_PENDING,
+)
+
+
+def verify_password(
+    password: str | None, encoded: str | None
+) -> tuple[bool, str | None]:
+    """Check the password against the encoded one
+
+    Return whether it matches and, when the hasher asks for an upgrade, the
+    password encoded again with the current parameters, to save in place of
+    the old one. An unknown user is hashed too, so it takes as long as a
+    known one
+    """
+    if encoded is None:
+        make_password(password)
+        return False, None
+    upgraded: list[str] = []
+    matches: bool = check_password(
+        password, encoded, setter=lambda raw: upgraded.append(make_password(raw))
+    )
+    return matches, upgraded[0] if upgraded else None
+
+
+def login_failed(email: str | None, request: Request | None) -> None:
+    """Send user_login_failed like authenticate, without the password"""
+    user_login_failed.send(
+        sender=__name__,
+        credentials={"email": email, "password": "********************"},
+        request=request,
+    )
+
+
+def authenticate_email(
+    email: str | None, password: str | None, request: Request | None = None
+) -> User | None:
+    """Return the active user with this email and password, if any
+
+    It does what authenticate does with ModelBackend, the only backend of
+    the project, with the password checked on the hashing pool
+    """
+    user: User | None = User.objects.filter(email=email).first()
+    encoded: str | None = user.password if user is not None else None
+    matches, upgraded = hashing_pool.run(verify_password, password, encoded)
+    if matches and upgraded is not None:
+        user.password = upgraded
+        user.save(update_fields=["password"])
+    if not matches or not user.is_active:
+        login_failed(email, request)
+        return None
+    return user
+
+
+async def aauthenticate_email(
+    email: str | None, password: str | None, request: Request | None = None
+) -> User | None:
+    """Async version of authenticate_email"""
+    user: User | None = await User.objects.filter(email=email).afirst()
+    encoded: str | None = user.password if user is not None else None
+    matches, upgraded = await hashing_pool.arun(verify_password, password, encoded)
+    if matches and upgraded is not None:
+        user.password = upgraded
+        await user.asave(update_fields=["password"])
+    if not matches or not user.is_active:
+        await sync_to_async(login_failed)(email, request)
+        return None
+    return user
@@ -2,18 +2,33 @@
 
 from typing import Any, override
 
-from django.db.models import Model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.urls import reverse
 
-from rest_framework.serializers import ModelSerializer, StringRelatedField
+from rest_framework.serializers import ModelSerializer, SerializerMethodField
+from rest_framework.request import Request
 from rest_framework.authtoken.models import Token
 
 from accounts.models import User
+from my_project.server_timing import TimedSerializerMixin, phase
+from my_project.sparse_fields import SparseFieldsMixin
 
 
-class UserSerializer(ModelSerializer):
-    """Serializer to serialize the user model"""
+class UserSerializer(TimedSerializerMixin, SparseFieldsMixin, ModelSerializer):
+    """Serializer to serialize the user model
 
-    posts: StringRelatedField[Model] = StringRelatedField(many=True, read_only=True)
+    Only the titles of the most recent posts are nested, the full list is
+    available, paginated, through the url in posts_url. A new_user in the
+    context tells the user was just created by this serializer, so it has
+    no posts to read
+    """
+
+    recent_posts_limit: int = 5
+
+    posts: SerializerMethodField = SerializerMethodField()
+    posts_count: SerializerMethodField = SerializerMethodField()
+    posts_url: SerializerMethodField = SerializerMethodField()
 
     class Meta:
         """Necessary class fot the parent class"""
@@ -22,12 +37,58 @@ class UserSerializer(ModelSerializer):
         fields: str | list[str] = "__all__"
 
     @override
-    def create(self, validated_data: dict[str, Any] | Any) -> User:
-        password: str | None = validated_data.pop("password", None)
-        user: User = super().create(validated_data)
-        user.set_password(raw_password=password)
-        user.save()
+    def to_representation(self, instance: User) -> dict[str, Any]:
+        if not self.context.get("new_user"):
+            return super().to_representation(instance)
+        # The relations of a new user are the ones just given, they are
+        # shown from the validated data instead of being read back
+        many_to_many: set[str] = {field.name for field in User._meta.many_to_many}
+        with phase("serialization"):
+            data: dict[str, Any] = {}
+            for name, field in self.fields.items():
+                if field.write_only:
+                    continue
+                if name in many_to_many:
+                    value: Any = self.validated_data.get(name, [])
+                else:
+                    value = field.get_attribute(instance)
+                data[name] = None if value is None else field.to_representation(value)
+            return data
+
+    def get_posts(self, user: User) -> list[str]:
+        """Return the titles of the most recent posts of the user"""
+        if self.context.get("new_user"):
+            return []
+        return list(
+            user.posts.order_by("-created", "-id").values_list("title", flat=True)[
+                : self.recent_posts_limit
+            ]
+        )
 
-        Token.objects.create(user=user)
+    def get_posts_count(self, user: User) -> int:
+        """Return how many posts the user has written"""
+        if self.context.get("new_user"):
+            return 0
+        return user.posts.count()
 
+    def get_posts_url(self, _user: User) -> str:
+        """Return the url of the paginated list of the posts of the user"""
+        url: str = reverse("posts_for_this_user")
+        request: Request | None = self.context.get("request")
+        if request is None:
+            return url
+        return request.build_absolute_uri(url)
+
+    @override
+    def create(self, validated_data: dict[str, Any] | Any) -> User:
+        password: str | None = validated_data.pop("password", None)
+        # The views hash the password off the request worker beforehand
+        encoded_password: str | None = validated_data.pop("encoded_password", None)
+        if encoded_password is None:
+            encoded_password = make_password(password)
+        # Hashed before the INSERT, so the user row is written only once
+        validated_data["password"] = encoded_password
+        with transaction.atomic():
+            user: User = super().create(validated_data)
+            Token.objects.create(user=user)
         return user
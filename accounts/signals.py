@@ -0,0 +1,24 @@
+"""Signal receivers of the accounts app"""
+
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from accounts.authentication import token_cache
+from accounts.models import User
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(instance: Token, **_kwargs: Any) -> None:
+    """A deleted token must stop authenticating right away, in every worker"""
+    token_cache.invalidate_key(instance.key)
+    token_cache.revoke_user(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_changed_user(instance: User, **_kwargs: Any) -> None:
+    """A deactivated or changed user must not be served from any cache"""
+    token_cache.revoke_user(instance.pk)
@@ -0,0 +1,152 @@
+"""Tests for the cached token authentication"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import override
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED
+
+from accounts.authentication import TokenCache, revoked_key, token_cache
+from accounts.models import User
+from accounts.tests.test_setup import TestSetUP
+
+
+def _revoke_in_another_process(user_id: int) -> None:
+    """Revoke the tokens of a user the way another worker process does"""
+    script: str = (
+        "import django; django.setup(); "
+        "from accounts.authentication import token_cache; "
+        f"token_cache.revoke_user({user_id})"
+    )
+    subprocess.run(
+        [sys.executable, "-c", script],
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "my_project.settings"},
+        cwd=settings.BASE_DIR,
+        check=True,
+    )
+
+
+class TestCachedTokenAuthentication(TestSetUP):
+    """Tests for CachedTokenAuthentication"""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        token_cache.clear()
+        self.client.post(path=self.signup_url, data=self.user_data)
+        self.user: User = User.objects.get(email=self.user_data.get("email"))
+        self.token: Token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+    def _token_queries(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.get(path=self.login_url)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        return len([query for query in queries if "authtoken_token" in query["sql"]])
+
+    def test_token_is_cached(self) -> None:
+        """Ensure only the first request looks the token up"""
+        self.assertEqual(self._token_queries(), 1)
+        self.assertEqual(self._token_queries(), 0)
+
+        response: Response = self.client.get(path=self.login_url)
+        self.assertEqual(response.data.get("user"), self.user_data.get("username"))
+        self.assertEqual(response.data.get("token"), self.token.key)
+
+    def test_deleted_token(self) -> None:
+        """Ensure a deleted token stops authenticating right away"""
+        self._token_queries()
+
+        self.token.delete()
+        response: Response = self.client.get(path=self.userinfo_url)
+
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
+        self.assertEqual(str(response.data.get("detail")), "Invalid token.")
+
+    def test_deactivated_user(self) -> None:
+        """Ensure a deactivated user stops authenticating right away"""
+        self._token_queries()
+
+        self.user.is_active = False
+        self.user.save()
+        response: Response = self.client.get(path=self.userinfo_url)
+
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
+        self.assertEqual(str(response.data.get("detail")), "User inactive or deleted.")
+
+    def test_changed_user(self) -> None:
+        """Ensure the cached user is reloaded after a change"""
+        self._token_queries()
+
+        self.user.username = "renamed"
+        self.user.save()
+        response: Response = self.client.get(path=self.login_url)
+
+        self.assertEqual(response.data.get("user"), "renamed")
+
+    def test_revoked_by_another_process(self) -> None:
+        """Ensure a token revoked by another worker is looked up again"""
+        self._token_queries()
+
+        _revoke_in_another_process(self.user.pk)
+
+        self.assertEqual(self._token_queries(), 1)
+        self.assertEqual(self._token_queries(), 0)
+
+
+class TestTokenCache(SimpleTestCase):
+    """Tests for the eviction of TokenCache"""
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """Ensure the cache never holds more than max_entries tokens"""
+        cache: TokenCache = TokenCache(ttl=60, max_entries=2)
+        users: list[User] = [User(pk=pk, username=f"user{pk}") for pk in range(3)]
+        tokens: list[Token] = [Token(key=f"key{pk}") for pk in range(3)]
+
+        cache.set("key0", users[0], tokens[0], time.time_ns())
+        cache.set("key1", users[1], tokens[1], time.time_ns())
+        cache.get("key0")
+        cache.set("key2", users[2], tokens[2], time.time_ns())
+
+        self.assertIsNotNone(cache.get("key0"))
+        self.assertIsNone(cache.get("key1"))
+        self.assertIsNotNone(cache.get("key2"))
+
+    def test_entries_expire(self) -> None:
+        """Ensure an entry is not served after ttl seconds"""
+        cache: TokenCache = TokenCache(ttl=0.01, max_entries=2)
+        cache.set("key", User(pk=1, username="user"), Token(key="key"), time.time_ns())
+
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get("key"))
+
+    def test_each_hit_is_a_copy(self) -> None:
+        """Ensure a request cannot change the cached user"""
+        cache: TokenCache = TokenCache(ttl=60, max_entries=2)
+        cache.set("key", User(pk=1, username="user"), Token(key="key"), time.time_ns())
+
+        user, _token = cache.get("key")
+        user.username = "changed"
+
+        self.assertEqual(cache.get("key")[0].username, "user")
+
+    def test_loaded_before_revocation(self) -> None:
+        """Ensure an entry loaded before its user was revoked is dropped,
+        even when it was stored after"""
+        cache: TokenCache = TokenCache(ttl=60, max_entries=2)
+        loaded: int = time.time_ns()
+
+        caches["shared"].set(revoked_key(1), time.time_ns())
+        cache.set("key", User(pk=1, username="user"), Token(key="key"), loaded)
+
+        self.assertIsNone(cache.get("key"))
@@ -0,0 +1,159 @@
+"""Tests for the password hashing pool and the async accounts views"""
+
+from threading import Event
+from typing import Any, override
+from unittest import mock
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.signals import user_login_failed
+from django.db.models import QuerySet
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.response import Response
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_404_NOT_FOUND,
+    HTTP_429_TOO_MANY_REQUESTS,
+)
+
+from accounts.hashing import HashingBusy, HashingPool, hashing_pool
+from accounts.models import User
+from accounts.tests.test_setup import TestSetUP
+from accounts.views import AsyncLoginView, AsyncSignUpView, LoginView, SignUpView
+
+
+class TestHashingPool(SimpleTestCase):
+    """Tests for the bounded HashingPool"""
+
+    def test_full_pool_rejects_right_away(self) -> None:
+        """Ensure a hash past max_pending is rejected instead of queued"""
+        pool: HashingPool = HashingPool(max_workers=1, max_pending=1)
+        release: Event = Event()
+        pending = pool.submit(release.wait)
+
+        with self.assertRaises(HashingBusy):
+            pool.submit(sum, [1, 2])
+
+        release.set()
+        pending.result()
+        self.assertEqual(pool.run(sum, [1, 2]), 3)
+
+
+class TestAsyncAccounts(TestSetUP):
+    """Tests for the async signup and login views"""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self.async_signup_url: str = reverse("async_signup")
+        self.async_login_url: str = reverse("async_login")
+
+    def test_async_signup_and_login(self) -> None:
+        """Ensure a user signed up asynchronously can log in with both views"""
+        response: Response = self.client.post(
+            path=self.async_signup_url, data=self.user_data
+        )
+        self.assertEqual(response.status_code, HTTP_201_CREATED)
+        self.assertEqual(response.data.get("email"), self.user_data.get("email"))
+        self.assertNotIn("password", response.data)
+
+        user: User = User.objects.get(email=self.user_data.get("email"))
+        self.assertTrue(user.check_password(self.user_data.get("password")))
+
+        for url in (self.async_login_url, self.login_url):
+            response = self.client.post(path=url, data=self.user_data)
+            self.assertEqual(response.status_code, HTTP_200_OK)
+            self.assertEqual(response.data.get("message"), "Login successfully")
+
+    def test_query_budgets(self) -> None:
+        """Ensure the async views are held to the budgets of their sync twins"""
+        self.assertEqual(AsyncSignUpView.query_budget, SignUpView.query_budget)
+        self.assertEqual(AsyncLoginView.query_budget, LoginView.query_budget)
+
+    def test_async_signup_with_no_valid_data(self) -> None:
+        """Ensure the async signup validates like the sync one"""
+        self.client.post(path=self.async_signup_url, data=self.user_data)
+
+        response: Response = self.client.post(
+            path=self.async_signup_url, data=self.user_data
+        )
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn("email", response.data)
+
+    def test_async_login_with_wrong_credentials(self) -> None:
+        """Ensure a wrong password or an unknown email are refused"""
+        self.client.post(path=self.signup_url, data=self.user_data)
+
+        wrong_password: dict[str, str] = {**self.user_data, "password": "nope1234"}
+        unknown_email: dict[str, str] = {**self.user_data, "email": "no@test.com"}
+        for data in (wrong_password, unknown_email):
+            response: Response = self.client.post(path=self.async_login_url, data=data)
+            self.assertEqual(response.status_code, HTTP_404_NOT_FOUND)
+
+    def test_inactive_user_cannot_log_in(self) -> None:
+        """Ensure an inactive user is refused even with the right password"""
+        self.client.post(path=self.signup_url, data=self.user_data)
+        User.objects.filter(email=self.user_data.get("email")).update(is_active=False)
+
+        for url in (self.async_login_url, self.login_url):
+            response: Response = self.client.post(path=url, data=self.user_data)
+            self.assertEqual(response.status_code, HTTP_404_NOT_FOUND)
+
+    def test_outdated_hash_is_upgraded(self) -> None:
+        """Ensure a password hashed with older parameters is hashed again on
+        login, as authenticate does"""
+        self.client.post(path=self.signup_url, data=self.user_data)
+        hasher: PBKDF2PasswordHasher = PBKDF2PasswordHasher()
+        users: QuerySet = User.objects.filter(email=self.user_data.get("email"))
+
+        for url in (self.async_login_url, self.login_url):
+            with self.subTest(url=url):
+                users.update(
+                    password=hasher.encode(
+                        self.user_data["password"], hasher.salt(), iterations=1000
+                    )
+                )
+
+                response: Response = self.client.post(path=url, data=self.user_data)
+
+                self.assertEqual(response.status_code, HTTP_200_OK)
+                user: User = users.get()
+                self.assertEqual(
+                    hasher.decode(user.password)["iterations"], hasher.iterations
+                )
+                self.assertTrue(user.check_password(self.user_data["password"]))
+
+    def test_failed_login_signal(self) -> None:
+        """Ensure a refused login sends user_login_failed, without the
+        password"""
+        self.client.post(path=self.signup_url, data=self.user_data)
+        received: list[dict[str, Any]] = []
+
+        def receiver(credentials: dict[str, Any], **_kwargs: Any) -> None:
+            received.append(credentials)
+
+        user_login_failed.connect(receiver)
+        try:
+            for url in (self.async_login_url, self.login_url):
+                self.client.post(
+                    path=url, data={**self.user_data, "password": "nope1234"}
+                )
+        finally:
+            user_login_failed.disconnect(receiver)
+
+        credentials: dict[str, Any] = {
+            "email": self.user_data["email"],
+            "password": "********************",
+        }
+        self.assertEqual(received, [credentials, credentials])
+
+    def test_busy_pool(self) -> None:
+        """Ensure the views answer 429 with Retry-After when the pool is full"""
+        with mock.patch.object(hashing_pool, "submit", side_effect=HashingBusy(1)):
+            for url in (self.async_login_url, self.login_url, self.signup_url):
+                response: Response = self.client.post(path=url, data=self.user_data)
+                self.assertEqual(response.status_code, HTTP_429_TOO_MANY_REQUESTS)
+                self.assertEqual(response["Retry-After"], "1")
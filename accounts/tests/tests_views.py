@@ -9,10 +9,15 @@ from rest_framework.status import (
     HTTP_401_UNAUTHORIZED,
 )
 from rest_framework.response import Response
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
 from accounts.tests.test_setup import TestSetUP
 from accounts.models import User
 from accounts.serializers import UserSerializer
+from posts.models import Post
 
 
 class TestSignup(TestSetUP):
@@ -30,6 +35,46 @@ class TestSignup(TestSetUP):
         self.assertEqual(response.status_code, HTTP_201_CREATED)
         self.assertEqual(serializer_data, response.data)
 
+    def test_signup_writes_each_row_once(self) -> None:
+        """Ensure the signup inserts the user and the token once, atomically,
+        and builds the response without reading anything back"""
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.post(
+                path=self.signup_url, data=self.user_data
+            )
+        statements: list[str] = [
+            query["sql"].split()[0].upper() for query in queries.captured_queries
+        ]
+
+        self.assertEqual(response.status_code, HTTP_201_CREATED)
+        self.assertEqual(response.data.get("posts"), [])
+        self.assertEqual(response.data.get("posts_count"), 0)
+        self.assertEqual(statements.count("INSERT"), 2)
+        self.assertNotIn("UPDATE", statements)
+        self.assertEqual(statements.count("SELECT"), 1)
+        self.assertGreater(statements.index("INSERT"), statements.index("SELECT"))
+        user: User = User.objects.get(email=self.user_data.get("email"))
+        self.assertTrue(user.check_password(self.user_data.get("password")))
+
+    def test_signup_with_relations(self) -> None:
+        """Ensure the relations given on signup are shown without being read
+        back"""
+        group: Group = Group.objects.create(name="writers")
+        serializer: UserSerializer = UserSerializer(
+            data={**self.user_data, "groups": [group.pk]}, context={"new_user": True}
+        )
+        self.assertTrue(serializer.is_valid())
+        user: User = serializer.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            data: dict[str, Any] = serializer.data
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(data.get("groups"), [group.pk])
+        self.assertEqual(data.get("user_permissions"), [])
+        self.assertEqual(data.get("posts"), [])
+        self.assertEqual(list(user.groups.all()), [group])
+
     def test_signup_with_no_valid_data(self) -> None:
         """Test the register a user with information missing"""
         copy_data: dict[str, str] = self.user_data.copy()
@@ -115,3 +160,84 @@ class TestUserInfo(TestSetUP):
             str(response.data.get("detail")),
             "Authentication credentials were not provided.",
         )
+
+    def test_userinfo_posts_are_bounded(self) -> None:
+        """Ensure only the most recent posts are nested, along with their count"""
+        token_key: str = self._get_token()
+        user: User = User.objects.get(email=self.user_data.get("email"))
+        posts_quantity: int = UserSerializer.recent_posts_limit + 3
+        Post.objects.bulk_create(
+            Post(title=f"Post {index}", description="Description", author=user)
+            for index in range(posts_quantity)
+        )
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + token_key)
+
+        response: Response = self.client.get(path=self.userinfo_url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(
+            response.data.get("posts"),
+            [f"Post {index}" for index in reversed(range(posts_quantity))][
+                : UserSerializer.recent_posts_limit
+            ],
+        )
+        self.assertEqual(response.data.get("posts_count"), posts_quantity)
+        self.assertEqual(
+            response.data.get("posts_url"),
+            "http://testserver" + reverse("posts_for_this_user"),
+        )
+
+    def test_userinfo_queries_do_not_grow_with_posts(self) -> None:
+        """Ensure the number of queries does not depend on the number of posts"""
+        token_key: str = self._get_token()
+        user: User = User.objects.get(email=self.user_data.get("email"))
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + token_key)
+
+        Post.objects.create(title="Post", description="Description", author=user)
+        # Warm the token cache so both requests authenticate the same way
+        self.client.get(path=self.userinfo_url)
+        with CaptureQueriesContext(connection) as few_posts_queries:
+            self.client.get(path=self.userinfo_url)
+
+        Post.objects.bulk_create(
+            Post(title="Post", description="Description", author=user)
+            for _ in range(20)
+        )
+        with CaptureQueriesContext(connection) as many_posts_queries:
+            self.client.get(path=self.userinfo_url)
+
+        self.assertEqual(len(few_posts_queries), len(many_posts_queries))
+
+    def test_userinfo_sparse_fields(self) -> None:
+        """Ensure ?fields= returns only the fields asked and skips the others' queries"""
+        token_key: str = self._get_token()
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + token_key)
+        # Warm the token cache so both requests authenticate the same way
+        self.client.get(path=self.userinfo_url)
+        with CaptureQueriesContext(connection) as all_fields_queries:
+            self.client.get(path=self.userinfo_url)
+
+        with CaptureQueriesContext(connection) as sparse_queries:
+            response: Response = self.client.get(
+                path=self.userinfo_url, data={"fields": "email,username"}
+            )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {"email": self.user_data["email"], "username": self.user_data["username"]},
+        )
+        self.assertEqual(len(sparse_queries), 0)
+        self.assertGreater(len(all_fields_queries), len(sparse_queries))
+
+    def test_userinfo_unknown_fields(self) -> None:
+        """Ensure asking for a field the user does not have is rejected"""
+        token_key: str = self._get_token()
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + token_key)
+
+        response: Response = self.client.get(
+            path=self.userinfo_url, data={"fields": "email,salary"}
+        )
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn("salary", str(response.data.get("fields")))
@@ -1,10 +1,18 @@
 """Urls for the accounts app"""
 
 from django.urls import path, URLPattern
-from accounts.views import SignUpView, LoginView, UserInfoView
+from accounts.views import (
+    SignUpView,
+    LoginView,
+    UserInfoView,
+    AsyncSignUpView,
+    AsyncLoginView,
+)
 
 urlpatterns: list[URLPattern] = [
     path("signup/", SignUpView.as_view(), name="signup"),
     path("login/", LoginView.as_view(), name="login"),
     path("userinfo/", UserInfoView.as_view(), name="userinfo"),
+    path("async/signup/", AsyncSignUpView.as_view(), name="async_signup"),
+    path("async/login/", AsyncLoginView.as_view(), name="async_login"),
 ]
@@ -1,8 +1,9 @@
-"""The accounts app logic """
+"""The accounts app logic"""
 
 from typing import Any
 
-from django.contrib.auth import authenticate
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractBaseUser, AnonymousUser
 
 from rest_framework.views import APIView
@@ -12,42 +13,65 @@ from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import IsAuthenticated
 
+from accounts.hashing import aauthenticate_email, authenticate_email, hashing_pool
 from accounts.serializers import UserSerializer
+from my_project.async_api import AsyncAPIView
+from my_project.server_timing import ServerTimingMixin
+from my_project.sparse_fields import requested_fields
 
 
-class SignUpView(APIView):
+def _signed_up(serializer: UserSerializer) -> Response:
+    user_data: dict[str, Any] = serializer.data.copy()
+    user_data.pop("password")
+    return Response(data=user_data, status=status.HTTP_201_CREATED)
+
+
+def _logged_in(token: Token) -> Response:
+    data: dict[str, Any] = {
+        "message": "Login successfully",
+        "token": str(token.key),
+    }
+    return Response(data=data, status=status.HTTP_200_OK)
+
+
+def _login_failed() -> Response:
+    response: dict[str, Any] = {"message": "Error: Email or password are incorrect"}
+    return Response(data=response, status=status.HTTP_404_NOT_FOUND)
+
+
+class SignUpView(ServerTimingMixin, APIView):
     """Class to create a new user"""
 
+    query_budget: int = 5
+
     def post(self, request: Request) -> Response:
         """Create a new user"""
-        serializer: UserSerializer = UserSerializer(data=request.data)
+        serializer: UserSerializer = UserSerializer(
+            data=request.data, context={"new_user": True}
+        )
         if serializer.is_valid():
-            serializer.save()
-            user_data: dict[str, Any] = serializer.data.copy()
-            user_data.pop("password")
-            return Response(data=user_data, status=status.HTTP_201_CREATED)
+            password: str | None = serializer.validated_data.get("password")
+            serializer.save(encoded_password=hashing_pool.run(make_password, password))
+            return _signed_up(serializer)
         return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class LoginView(APIView):
+class LoginView(ServerTimingMixin, APIView):
     """Class to authenticate a user"""
 
+    query_budget: int = 3
+
     def post(self, request: Request) -> Response:
         """Method to log in a user"""
         password: str | None = request.data.get("password")
         email: str | None = request.data.get("email")
-        user: AbstractBaseUser | None = authenticate(email=email, password=password)
+        user: AbstractBaseUser | None = authenticate_email(email, password, request)
 
         if user is not None:
             token: Token | None = Token.objects.get(user=user)
-            data: dict[str, Any] = {
-                "message": "Login successfully",
-                "token": str(token.key),
-            }
-            return Response(data=data, status=status.HTTP_200_OK)
+            return _logged_in(token)
 
-        response: dict[str, Any] = {"message": "Error: Email or password are incorrect"}
-        return Response(data=response, status=status.HTTP_404_NOT_FOUND)
+        return _login_failed()
 
     def get(self, request: Request) -> Response:
         """Get information about the current user"""
@@ -56,15 +80,60 @@ class LoginView(APIView):
         return Response(data=data, status=status.HTTP_200_OK)
 
 
-class UserInfoView(APIView):
+class AsyncSignUpView(AsyncAPIView):
+    """Create a new user without holding a worker thread while the
+    password is hashed"""
+
+    query_budget: int = 5
+
+    async def post(self, request: Request) -> Response:
+        """Create a new user"""
+        serializer: UserSerializer = UserSerializer(
+            data=request.data, context={"new_user": True}
+        )
+        if await sync_to_async(serializer.is_valid)():
+            password: str | None = serializer.validated_data.get("password")
+            encoded_password: str = await hashing_pool.arun(make_password, password)
+            await sync_to_async(serializer.save)(encoded_password=encoded_password)
+            return await sync_to_async(_signed_up)(serializer)
+        return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncLoginView(AsyncAPIView):
+    """Log in a user without holding a worker thread while the password
+    is checked"""
+
+    query_budget: int = 3
+
+    async def post(self, request: Request) -> Response:
+        """Method to log in a user"""
+        password: str | None = request.data.get("password")
+        email: str | None = request.data.get("email")
+        user: AbstractBaseUser | None = await aauthenticate_email(
+            email, password, request
+        )
+
+        if user is not None:
+            token: Token = await Token.objects.aget(user=user)
+            return _logged_in(token)
+
+        return _login_failed()
+
+
+class UserInfoView(ServerTimingMixin, APIView):
     """View to manage all the User info"""
 
     permission_classes = [IsAuthenticated]
+    query_budget: int = 5
 
     def get(self, request: Request) -> Response:
         """Show all the user's information"""
         user: AbstractBaseUser | AnonymousUser = request.user
-        serializer: UserSerializer = UserSerializer(instance=user)
+        serializer: UserSerializer = UserSerializer(
+            instance=user,
+            context={"request": request},
+            fields=requested_fields(request, UserSerializer),
+        )
         user_data: dict[str, Any] = serializer.data.copy()
-        user_data.pop("password")
+        user_data.pop("password", None)
         return Response(data=user_data, status=status.HTTP_200_OK)
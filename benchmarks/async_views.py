@@ -0,0 +1,161 @@
+"""Throughput and latency of the posts views under concurrent clients
+
+Each scenario runs --connections clients at once. Every client issues its
+share of --requests one after the other and each latency is measured from
+the moment the client sends the request to the moment it gets the answer.
+
+* wsgi: the sync views through the WSGI handler, one thread per client,
+  like a threaded WSGI server
+* asgi sync views: the sync views through the ASGI handler, which runs
+  each of them in the one thread reserved for sync code
+* asgi async views: the /posts/async/ views through the ASGI handler, on
+  the event loop
+
+The requests alternate between one post and the posts of the user, the
+two reads the page cache does not answer. Everything runs in process with
+django.test.Client and django.test.AsyncClient, no socket is involved.
+
+    python -m benchmarks.async_views --connections 500 --requests 5000
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from benchmarks.common import format_row, setup_django, summarize, test_database
+
+
+def seed(posts: int) -> tuple[str, list[int]]:
+    """Create one author, their token and their posts"""
+    from rest_framework.authtoken.models import Token
+
+    from accounts.models import User
+    from posts.models import Post
+
+    user: User = User.objects.create(
+        email="author@bench.com", username="author", password="!"
+    )
+    token: Token = Token.objects.create(user=user)
+    created: list[Post] = Post.objects.bulk_create(
+        Post(title=f"Post {index}", description="Description", author=user)
+        for index in range(posts)
+    )
+    return token.key, [post.pk for post in created]
+
+
+def urls(prefix: str, ids: list[int], requests: int) -> list[str]:
+    """Alternate the detail of one post and the posts of the user"""
+    return [
+        f"{prefix}{ids[index % len(ids)]}" if index % 2 else f"{prefix}for_this_user/"
+        for index in range(requests)
+    ]
+
+
+def run_wsgi(
+    paths: list[str], connections: int, headers: dict[str, str]
+) -> tuple[list[float], Counter, float]:
+    """Run the clients in threads, return the latencies, the status codes
+    and the wall time"""
+    from django.db import connections as databases
+    from django.test import Client
+
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    lock: threading.Lock = threading.Lock()
+
+    def client_loop(share: list[str]) -> None:
+        client: Client = Client()
+        for path in share:
+            start: float = time.perf_counter()
+            response = client.get(path, headers=headers)
+            elapsed: float = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] += 1
+        databases.close_all()
+
+    start: float = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        for index in range(connections):
+            pool.submit(client_loop, paths[index::connections])
+    return latencies, statuses, time.perf_counter() - start
+
+
+async def run_asgi(
+    paths: list[str], connections: int, headers: dict[str, str]
+) -> tuple[list[float], Counter, float]:
+    """Run the clients as tasks, return the latencies, the status codes
+    and the wall time"""
+    from django.test import AsyncClient
+
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    async def client_loop(share: list[str]) -> None:
+        client: AsyncClient = AsyncClient()
+        for path in share:
+            start: float = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start: float = time.perf_counter()
+    await asyncio.gather(
+        *(client_loop(paths[index::connections]) for index in range(connections))
+    )
+    return latencies, statuses, time.perf_counter() - start
+
+
+def main() -> None:
+    """Parse the arguments and print one line per scenario"""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--posts", type=int, default=200)
+    args: argparse.Namespace = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        key, ids = seed(args.posts)
+        headers: dict[str, str] = {"Authorization": f"Token {key}"}
+        scenarios: list[tuple[str, Any]] = [
+            (
+                "wsgi",
+                lambda: run_wsgi(
+                    urls("/posts/", ids, args.requests), args.connections, headers
+                ),
+            ),
+            (
+                "asgi sync views",
+                lambda: asyncio.run(
+                    run_asgi(
+                        urls("/posts/", ids, args.requests), args.connections, headers
+                    )
+                ),
+            ),
+            (
+                "asgi async views",
+                lambda: asyncio.run(
+                    run_asgi(
+                        urls("/posts/async/", ids, args.requests),
+                        args.connections,
+                        headers,
+                    )
+                ),
+            ),
+        ]
+        for name, scenario in scenarios:
+            latencies, statuses, wall = scenario()
+            print(
+                format_row(name, summarize(latencies)),
+                f"{len(latencies) / wall:8.0f} req/s",
+                dict(statuses),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Throughput of POST /posts/bulk/ against the same posts sent one by one
+
+N posts are created with N single POSTs to /posts/, then with one POST to
+/posts/bulk/ for each batch size. Everything goes through the WSGI handler
+with django.test.Client.
+
+    python -m benchmarks.bulk_create --posts 2000 --batch-sizes 100 500 1000
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.common import setup_django, test_database
+
+
+def make_client() -> object:
+    """Create a user and return a client authenticated with their token"""
+    from django.test import Client
+    from rest_framework.authtoken.models import Token
+
+    from accounts.models import User
+
+    user: User = User.objects.create(
+        email="author@bench.com", username="author", password="!"
+    )
+    token: Token = Token.objects.create(user=user)
+    return Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+
+def items(posts: int) -> list[dict[str, str]]:
+    """Build the body of posts posts"""
+    return [
+        {"title": f"Post {index}", "description": "Description"}
+        for index in range(posts)
+    ]
+
+
+def single_posts(client: object, posts: int) -> float:
+    """Create the posts with one request each and return the seconds it took"""
+    start: float = time.perf_counter()
+    for item in items(posts):
+        client.post("/posts/", item, content_type="application/json")
+    return time.perf_counter() - start
+
+
+def bulk_post(client: object, posts: int) -> float:
+    """Create the posts with one bulk request and return the seconds it took"""
+    body: str = json.dumps(items(posts))
+    start: float = time.perf_counter()
+    response = client.post("/posts/bulk/", body, content_type="application/json")
+    elapsed: float = time.perf_counter() - start
+    assert response.status_code == 201, response.status_code
+    return elapsed
+
+
+def main() -> None:
+    """Parse the arguments and print one line per run"""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 500])
+    args: argparse.Namespace = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings
+
+    from posts.models import Post
+
+    with test_database():
+        client = make_client()
+        runs: list[tuple[str, float]] = [
+            (f"{args.posts} single POSTs", single_posts(client, args.posts))
+        ]
+        for batch_size in args.batch_sizes:
+            Post.objects.all().delete()
+            with override_settings(POSTS_BULK_BATCH_SIZE=batch_size):
+                runs.append(
+                    (
+                        f"1 bulk POST, batch_size={batch_size}",
+                        bulk_post(client, args.posts),
+                    )
+                )
+        for name, seconds in runs:
+            print(
+                f"{name:<32} {seconds * 1000:10.2f}ms "
+                f"{args.posts / seconds:10.0f} posts/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Helpers shared by the benchmarks
+
+The benchmarks run against a throwaway test database, never against
+db.sqlite3. Run them from the root of the repository, for example:
+
+    python -m benchmarks.login_storm
+"""
+
+import os
+import statistics
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator
+
+import django
+
+
+def setup_django() -> None:
+    """Load the settings of the project and the apps"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "my_project.settings")
+    django.setup()
+
+
+@contextmanager
+def test_database(on_disk: bool = False) -> Iterator[None]:
+    """Create a migrated test database and drop it on exit
+
+    SQLite test databases live in memory and lock a whole table for each
+    write, so concurrent writers fail. on_disk puts it in a file in WAL
+    mode instead, where the writers wait for each other like in production
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    if on_disk and connection.vendor == "sqlite":
+        directory: str = tempfile.mkdtemp(prefix="benchmark-")
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "db.sqlite3")
+        connection.settings_dict["OPTIONS"].update(
+            timeout=60,
+            transaction_mode="IMMEDIATE",
+            init_command="PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL",
+        )
+    setup_test_environment()
+    old_name: str = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Return the count, mean and percentiles of latencies in seconds"""
+    if len(samples) < 2:
+        value: float = samples[0] if samples else 0.0
+        return {
+            "count": len(samples),
+            "mean": value,
+            "p50": value,
+            "p95": value,
+            "p99": value,
+        }
+    cuts: list[float] = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "count": len(samples),
+        "mean": statistics.fmean(samples),
+        "p50": cuts[49],
+        "p95": cuts[94],
+        "p99": cuts[98],
+    }
+
+
+def format_row(name: str, summary: dict[str, float]) -> str:
+    """Format one summary as a line of milliseconds"""
+    return (
+        f"{name:<32} n={summary['count']:<6} "
+        f"mean={summary['mean'] * 1000:8.2f}ms "
+        f"p50={summary['p50'] * 1000:8.2f}ms "
+        f"p95={summary['p95'] * 1000:8.2f}ms "
+        f"p99={summary['p99'] * 1000:8.2f}ms"
+    )
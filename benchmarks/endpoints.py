@@ -0,0 +1,425 @@
+"""Throughput and latency of every route of the API, on a seeded database
+
+Seeds --users users and --posts posts with benchmarks.seed, then drives
+each route of posts/urls.py and accounts/urls.py with --connections
+concurrent clients, --requests requests per method of the route. The sync
+routes run through the WSGI handler, one thread per client, the async_
+routes through the ASGI handler, one task per client. Everything runs in
+process with django.test.Client and AsyncClient, no socket is involved,
+against a test database on disk so the writers can run concurrently.
+
+One line is printed per route and method: the throughput, the latency
+percentiles and the status codes. --save writes them as JSON and
+--baseline compares them with a JSON saved before, exiting with 1 when a
+p95 grew or a throughput dropped by more than --tolerance.
+
+    python -m benchmarks.endpoints --users 10000 --posts 1000000 --save base.json
+    python -m benchmarks.endpoints --users 10000 --posts 1000000 --baseline base.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import platform
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, NamedTuple
+
+from benchmarks.common import format_row, setup_django, summarize, test_database
+from benchmarks.search import sentence
+from benchmarks.seed import PASSWORD, Fixture, seed
+
+
+class Call(NamedTuple):
+    """One request sent by a client"""
+
+    method: str
+    path: str
+    data: Any = None
+    token: str | None = None
+
+
+# Build the calls of a scenario from the seeded fixture, the url of the
+# route, the number of requests and a random generator
+Builder = Callable[[Fixture, Callable[..., str], int, random.Random], list[Call]]
+
+# Emails of the users signing up, unique across the scenarios
+signups: itertools.count = itertools.count()
+
+
+def list_get(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Read the first pages of the list, with and without sparse fields"""
+    paths: list[str] = [url(), url() + "?fields=id,title", url() + "?page_size=100"]
+    return [Call("GET", paths[index % len(paths)]) for index in range(n)]
+
+
+def list_post(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Create posts one by one"""
+    data: dict[str, str] = {"title": "Benchmark", "description": sentence(rng, 30)}
+    return [Call("POST", url(), data, fx.author_token) for _ in range(n)]
+
+
+def bulk_post(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Create posts by hundreds"""
+    items: list[dict[str, str]] = [
+        {"title": "Benchmark", "description": sentence(rng, 30)} for _ in range(100)
+    ]
+    return [Call("POST", url(), items, fx.author_token) for _ in range(n)]
+
+
+def bulk_patch(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Update ten posts of the author at a time"""
+    ids: list[int] = fx.create_posts(10 * n)
+    return [
+        Call(
+            "PATCH",
+            url(),
+            {"ids": ids[10 * index : 10 * index + 10], "changes": {"title": "Bulk"}},
+            fx.author_token,
+        )
+        for index in range(n)
+    ]
+
+
+def bulk_delete(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Delete ten posts of the author at a time, each post once"""
+    ids: list[int] = fx.create_posts(10 * n)
+    return [
+        Call(
+            "DELETE", url(), {"ids": ids[10 * index : 10 * index + 10]}, fx.author_token
+        )
+        for index in range(n)
+    ]
+
+
+def detail_get(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Read random posts"""
+    return [Call("GET", url(post_id=rng.choice(fx.post_ids))) for _ in range(n)]
+
+
+def detail_put(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Replace posts of the author"""
+    ids: list[int] = fx.create_posts(n)
+    data: dict[str, str] = {"title": "Replaced", "description": sentence(rng, 30)}
+    return [Call("PUT", url(post_id=pk), data, fx.author_token) for pk in ids]
+
+
+def detail_patch(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Change the title of posts of the author"""
+    ids: list[int] = fx.create_posts(n)
+    return [
+        Call("PATCH", url(post_id=pk), {"title": "Patched"}, fx.author_token)
+        for pk in ids
+    ]
+
+
+def detail_delete(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Delete posts of the author, each once"""
+    ids: list[int] = fx.create_posts(n)
+    return [Call("DELETE", url(post_id=pk), token=fx.author_token) for pk in ids]
+
+
+def for_user_get(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Read the posts of random users"""
+    return [Call("GET", url(), token=rng.choice(fx.tokens)) for _ in range(n)]
+
+
+def search_get(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Search one to three words of the vocabulary of the posts"""
+    return [
+        Call("GET", f"{url()}?q={sentence(rng, rng.randint(1, 3))}") for _ in range(n)
+    ]
+
+
+def cache_stats_get(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Read the counters of the cache as the admin"""
+    return [Call("GET", url(), token=fx.admin_token) for _ in range(n)]
+
+
+def signup_post(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Sign new users up"""
+    calls: list[Call] = []
+    for _ in range(n):
+        index: int = next(signups)
+        data: dict[str, str] = {
+            "email": f"signup{index}@bench.com",
+            "username": f"signup{index}",
+            "password": PASSWORD,
+        }
+        calls.append(Call("POST", url(), data))
+    return calls
+
+
+def login_post(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Log random seeded users in"""
+    return [
+        Call(
+            "POST",
+            url(),
+            {"email": fx.email(rng.randrange(len(fx.user_ids))), "password": PASSWORD},
+        )
+        for _ in range(n)
+    ]
+
+
+def userinfo_get(
+    fx: Fixture, url: Callable[..., str], n: int, rng: random.Random
+) -> list[Call]:
+    """Read the information of random users"""
+    return [Call("GET", url(), token=rng.choice(fx.tokens)) for _ in range(n)]
+
+
+# The scenarios of each named route, the async_ routes share those of the
+# sync ones
+SCENARIOS: dict[str, list[Builder]] = {
+    "posts_list": [list_get, list_post],
+    "posts_bulk": [bulk_post, bulk_patch, bulk_delete],
+    "post_detail": [detail_get, detail_put, detail_patch, detail_delete],
+    "posts_for_this_user": [for_user_get],
+    "posts_search": [search_get],
+    "posts_cache_stats": [cache_stats_get],
+    "signup": [signup_post],
+    "login": [login_post],
+    "userinfo": [userinfo_get],
+}
+
+
+def routes() -> list[str]:
+    """Return the names of the routes of posts/urls.py and accounts/urls.py"""
+    from accounts.urls import urlpatterns as accounts_urls
+    from posts.urls import urlpatterns as posts_urls
+
+    return [pattern.name for pattern in [*posts_urls, *accounts_urls]]
+
+
+def scenarios_of(route: str) -> list[Builder]:
+    """Return the scenarios of the route, those of its sync twin for async_"""
+    return SCENARIOS.get(route, SCENARIOS.get(route.removeprefix("async_"), []))
+
+
+def headers_of(call: Call) -> dict[str, str]:
+    """Return the headers of the call"""
+    return {"Authorization": f"Token {call.token}"} if call.token else {}
+
+
+def body_of(call: Call) -> str:
+    """Return the JSON body of the call"""
+    return "" if call.data is None else json.dumps(call.data)
+
+
+def run_wsgi(calls: list[Call], connections: int) -> tuple[list[float], Counter, float]:
+    """Send the calls from threads, return the latencies, the status codes
+    and the wall time"""
+    from django.db import connections as databases
+    from django.test import Client
+
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    lock: threading.Lock = threading.Lock()
+
+    def client_loop(share: list[Call]) -> None:
+        client: Client = Client(raise_request_exception=False)
+        for call in share:
+            start: float = time.perf_counter()
+            response = client.generic(
+                call.method,
+                call.path,
+                body_of(call),
+                content_type="application/json",
+                headers=headers_of(call),
+            )
+            elapsed: float = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] += 1
+        databases.close_all()
+
+    start: float = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        for index in range(connections):
+            pool.submit(client_loop, calls[index::connections])
+    return latencies, statuses, time.perf_counter() - start
+
+
+async def run_asgi(
+    calls: list[Call], connections: int
+) -> tuple[list[float], Counter, float]:
+    """Send the calls from tasks, return the latencies, the status codes
+    and the wall time"""
+    from django.test import AsyncClient
+
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    async def client_loop(share: list[Call]) -> None:
+        client: AsyncClient = AsyncClient(raise_request_exception=False)
+        for call in share:
+            start: float = time.perf_counter()
+            response = await client.generic(
+                call.method,
+                call.path,
+                body_of(call),
+                content_type="application/json",
+                headers=headers_of(call),
+            )
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start: float = time.perf_counter()
+    await asyncio.gather(
+        *(client_loop(calls[index::connections]) for index in range(connections))
+    )
+    return latencies, statuses, time.perf_counter() - start
+
+
+def run(
+    fixture: Fixture, selected: list[str], connections: int, requests: int
+) -> dict[str, dict[str, Any]]:
+    """Drive the selected routes and return the results by method and route"""
+    from django.urls import reverse
+
+    rng: random.Random = random.Random(1)
+    results: dict[str, dict[str, Any]] = {}
+    for route in selected:
+        builders: list[Builder] = scenarios_of(route)
+        if not builders:
+            print(f"{route:<32} no scenario")
+            continue
+        for builder in builders:
+            calls: list[Call] = builder(
+                fixture, lambda **kwargs: reverse(route, kwargs=kwargs), requests, rng
+            )
+            if route.startswith("async_"):
+                latencies, statuses, wall = asyncio.run(run_asgi(calls, connections))
+            else:
+                latencies, statuses, wall = run_wsgi(calls, connections)
+            name: str = f"{calls[0].method} {route}"
+            summary: dict[str, float] = summarize(latencies)
+            results[name] = {
+                **summary,
+                "throughput": len(latencies) / wall,
+                "statuses": {str(code): count for code, count in statuses.items()},
+            }
+            print(
+                format_row(name, summary),
+                f"{results[name]['throughput']:8.0f} req/s",
+                dict(statuses),
+            )
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, Any]], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Print the changes against the baseline and return the regressions"""
+    regressions: list[str] = []
+    print(f"\n{'against the baseline':<32} {'p95':>10} {'throughput':>12}")
+    for name, result in results.items():
+        before: dict[str, Any] | None = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<32} not in the baseline")
+            continue
+        p95: float = result["p95"] / before["p95"] - 1 if before["p95"] else 0.0
+        throughput: float = result["throughput"] / before["throughput"] - 1
+        regressed: bool = p95 > tolerance or throughput < -tolerance
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<32} {p95:+10.1%} {throughput:+12.1%}"
+            + ("  REGRESSION" if regressed else "")
+        )
+    return regressions
+
+
+def main() -> None:
+    """Parse the arguments, seed, drive the routes, then save or compare"""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--routes", nargs="*", help="only drive these route names")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args: argparse.Namespace = parser.parse_args()
+
+    setup_django()
+    # The failed requests are counted as 500s, their tracebacks not printed
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    with test_database(on_disk=True):
+        start: float = time.perf_counter()
+        fixture: Fixture = seed(args.users, args.posts)
+        print(
+            f"seeded {args.users} users and {args.posts} posts "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+        selected: list[str] = [
+            route for route in routes() if not args.routes or route in args.routes
+        ]
+        results: dict[str, dict[str, Any]] = run(
+            fixture, selected, args.connections, args.requests
+        )
+
+    report: dict[str, Any] = {
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "parameters": {
+            name: getattr(args, name)
+            for name in ("users", "posts", "connections", "requests")
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nsaved to {args.save}")
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline: dict[str, Any] = json.load(file)
+        if baseline["parameters"] != report["parameters"]:
+            print(f"\nthe baseline ran with {baseline['parameters']}")
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Read latency of GET /posts/ during a storm of logins
+
+The same readers run three times: alone, next to a storm on the sync
+/auth/login/ and next to a storm on /auth/async/login/. Everything goes
+through the ASGI handler with django.test.AsyncClient.
+
+    python -m benchmarks.login_storm --logins 200 --reads 200
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Any
+
+from benchmarks.common import format_row, setup_django, summarize, test_database
+
+PASSWORD: str = "benchmark-password"
+
+
+def seed(users: int, posts: int) -> None:
+    """Create the users, their tokens and some posts"""
+    from django.contrib.auth.hashers import make_password
+    from rest_framework.authtoken.models import Token
+
+    from accounts.models import User
+    from posts.models import Post
+
+    encoded: str = make_password(PASSWORD)
+    created: list[User] = User.objects.bulk_create(
+        User(email=f"user{index}@bench.com", username=f"user{index}", password=encoded)
+        for index in range(users)
+    )
+    Token.objects.bulk_create(
+        Token(user=user, key=Token.generate_key()) for user in created
+    )
+    Post.objects.bulk_create(
+        Post(title=f"Post {index}", description="Description", author=created[0])
+        for index in range(posts)
+    )
+
+
+async def read(client: Any, latencies: list[float]) -> None:
+    """Fetch the first page of posts and record how long it took"""
+    start: float = time.perf_counter()
+    await client.get("/posts/")
+    latencies.append(time.perf_counter() - start)
+
+
+async def login(client: Any, url: str, index: int, statuses: Counter) -> None:
+    """Log one user in and record the status code"""
+    response = await client.post(
+        url,
+        {"email": f"user{index}@bench.com", "password": PASSWORD},
+        content_type="application/json",
+    )
+    statuses[response.status_code] += 1
+
+
+async def scenario(
+    login_url: str | None, logins: int, reads: int, users: int
+) -> tuple[dict[str, float], Counter]:
+    """Run the readers, alone or next to a login storm"""
+    from django.test import AsyncClient
+
+    client: AsyncClient = AsyncClient()
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    tasks: list[Any] = []
+    if login_url is not None:
+        tasks += [login(client, login_url, i % users, statuses) for i in range(logins)]
+    tasks += [read(client, latencies) for _ in range(reads)]
+    await asyncio.gather(*tasks)
+    return summarize(latencies), statuses
+
+
+def main() -> None:
+    """Parse the arguments and print one line per scenario"""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--reads", type=int, default=200)
+    args: argparse.Namespace = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        seed(args.users, args.posts)
+        for name, url in (
+            ("reads alone", None),
+            ("reads during sync logins", "/auth/login/"),
+            ("reads during async logins", "/auth/async/login/"),
+        ):
+            summary, statuses = asyncio.run(
+                scenario(url, args.logins, args.reads, args.users)
+            )
+            print(format_row(name, summary), dict(statuses) if statuses else "")
+
+
+if __name__ == "__main__":
+    main()
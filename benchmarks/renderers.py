@@ -0,0 +1,90 @@
+"""Render time and size of the post list payload for each renderer
+
+Seeds --posts posts and serializes them once with PostValuesSerializer,
+in pages of --page-size posts like GET /posts/ returns them. Each page is
+then rendered --repeat times by JSONRenderer, ORJSONRenderer and, when
+msgpack is installed, MessagePackRenderer. A renderer whose library is
+missing is reported as such instead of being timed.
+
+    python -m benchmarks.renderers --posts 10000 --page-size 100 --repeat 20
+"""
+
+import argparse
+import time
+from typing import Any
+
+from benchmarks.common import setup_django, test_database
+
+
+def pages(posts: int, page_size: int) -> list[dict[str, Any]]:
+    """Seed the posts and return them as the bodies of the list pages"""
+    from accounts.models import User
+    from posts.models import Post
+    from posts.serializer import PostValuesSerializer
+
+    author: User = User.objects.create(
+        email="author@bench.com", username="author", password="!"
+    )
+    Post.objects.bulk_create(
+        (
+            Post(title=f"Post {index}", description="Description " * 20, author=author)
+            for index in range(posts)
+        ),
+        batch_size=1_000,
+    )
+    serializer: PostValuesSerializer = PostValuesSerializer()
+    data: list[dict[str, Any]] = serializer.data(serializer.rows(Post.objects.all()))
+    return [
+        {"next": None, "previous": None, "results": data[start : start + page_size]}
+        for start in range(0, len(data), page_size)
+    ]
+
+
+def measure(
+    renderer: Any, bodies: list[dict[str, Any]], repeat: int
+) -> tuple[float, float]:
+    """Return the best seconds to render all the pages and their mean size"""
+    best: float = float("inf")
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        contents: list[bytes] = [renderer.render(body) for body in bodies]
+        best = min(best, time.perf_counter() - start)
+    return best, sum(map(len, contents)) / len(contents)
+
+
+def main() -> None:
+    """Parse the arguments and print one line per renderer"""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args: argparse.Namespace = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from my_project import renderers
+
+    with test_database():
+        bodies: list[dict[str, Any]] = pages(args.posts, args.page_size)
+
+    print(f"{len(bodies)} pages of {args.page_size} posts")
+    print(f"{'renderer':<22} {'us/page':>9} {'bytes/page':>11}")
+    candidates: dict[str, tuple[Any, bool]] = {
+        "JSONRenderer": (JSONRenderer(), True),
+        "ORJSONRenderer": (renderers.ORJSONRenderer(), renderers.orjson is not None),
+        "MessagePackRenderer": (
+            renderers.MessagePackRenderer(),
+            renderers.msgpack is not None,
+        ),
+    }
+    for name, (renderer, installed) in candidates.items():
+        if not installed:
+            print(f"{name:<22} library not installed")
+            continue
+        seconds, size = measure(renderer, bodies, args.repeat)
+        print(f"{name:<22} {seconds / len(bodies) * 1e6:9.1f} {size:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Latency of the full-text search against an icontains scan
+
+Seeds --posts posts made of words drawn from a Zipf distributed vocabulary,
+then runs the same --queries searches through GET /posts/search/ and
+through a plain icontains filter on title and description, one page each.
+The icontains filter returns the first rows it meets, unranked, so it is
+only fast for the words most posts hold: it scans the whole table for the
+rare ones.
+
+    python -m benchmarks.search --posts 1000000 --queries 200
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks.common import format_row, setup_django, summarize, test_database
+
+VOCABULARY_SIZE: int = 50_000
+
+# Word n is drawn with a weight of 1/n, like the words of a real language
+VOCABULARY: list[str] = [f"word{index}" for index in range(1, VOCABULARY_SIZE + 1)]
+WEIGHTS: list[float] = list(
+    itertools.accumulate(1 / index for index in range(1, VOCABULARY_SIZE + 1))
+)
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    """Return words random words of the vocabulary"""
+    return " ".join(rng.choices(VOCABULARY, cum_weights=WEIGHTS, k=words))
+
+
+def seed(posts: int, batch_size: int, rng: random.Random) -> None:
+    """Create one author and their posts, the triggers index them"""
+    from accounts.models import User
+    from posts.models import Post
+
+    author: User = User.objects.create(
+        email="author@bench.com", username="author", password="!"
+    )
+    for start in range(0, posts, batch_size):
+        Post.objects.bulk_create(
+            Post(
+                title=sentence(rng, 3),
+                description=sentence(rng, 30),
+                author=author,
+            )
+            for _ in range(min(batch_size, posts - start))
+        )
+
+
+def search_latencies(queries: list[str]) -> list[float]:
+    """Time a first page of GET /posts/search/ for each query"""
+    from django.test import Client
+
+    client: Client = Client()
+    latencies: list[float] = []
+    for query in queries:
+        start: float = time.perf_counter()
+        response = client.get("/posts/search/", {"q": query})
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+    return latencies
+
+
+def icontains_latencies(queries: list[str]) -> list[float]:
+    """Time a first page of an icontains filter for each query"""
+    from django.db.models import Q
+
+    from posts.models import Post
+
+    latencies: list[float] = []
+    for query in queries:
+        condition: Q = Q()
+        for word in query.split():
+            condition &= Q(title__icontains=word) | Q(description__icontains=word)
+        start: float = time.perf_counter()
+        list(Post.objects.select_related("author").filter(condition)[:20])
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    """Parse the arguments and print one line per strategy"""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args: argparse.Namespace = parser.parse_args()
+
+    rng: random.Random = random.Random(0)
+    setup_django()
+    with test_database():
+        start: float = time.perf_counter()
+        seed(args.posts, args.batch_size, rng)
+        print(f"seeded {args.posts} posts in {time.perf_counter() - start:.1f}s")
+
+        queries: list[str] = [
+            sentence(rng, rng.randint(1, 3)) for _ in range(args.queries)
+        ]
+        print(format_row("fts5 search", summarize(search_latencies(queries))))
+        print(format_row("icontains", summarize(icontains_latencies(queries))))
+
+
+if __name__ == "__main__":
+    main()
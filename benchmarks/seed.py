@@ -0,0 +1,136 @@
+"""Seed users and posts straight through the ORM, at production scale
+
+Every row is written with bulk_create in batches, so a million posts take
+a few INSERTs per batch instead of one request each. The users share one
+password, hashed once, and each of them gets a token. The posts are spread
+over the users and written with the Zipf vocabulary of benchmarks.search,
+so the search index holds realistic words.
+
+    python -m benchmarks.seed --users 10000 --posts 1000000
+
+Run alone, it seeds a throwaway test database and reports how long it took.
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import setup_django, test_database
+from benchmarks.search import sentence
+
+PASSWORD: str = "benchmark-password"
+
+
+class Fixture:
+    """What was seeded, for the benchmarks to build their requests on"""
+
+    def __init__(
+        self,
+        user_ids: list[int],
+        tokens: list[str],
+        admin_token: str,
+        post_ids: list[int],
+    ) -> None:
+        self.user_ids: list[int] = user_ids
+        self.tokens: list[str] = tokens
+        self.admin_token: str = admin_token
+        self.post_ids: list[int] = post_ids
+
+    @property
+    def author_token(self) -> str:
+        """Return the token of the first user, who writes the posts changed"""
+        return self.tokens[0]
+
+    def email(self, index: int) -> str:
+        """Return the email of the index-th seeded user"""
+        return f"user{index % len(self.user_ids)}@bench.com"
+
+    def create_posts(self, posts: int, batch_size: int = 10_000) -> list[int]:
+        """Create posts of the first user and return their ids"""
+        from posts.models import Post
+
+        ids: list[int] = []
+        for start in range(0, posts, batch_size):
+            created: list[Post] = Post.objects.bulk_create(
+                Post(
+                    title=f"Post {index}",
+                    description="Description",
+                    author_id=self.user_ids[0],
+                )
+                for index in range(start, min(start + batch_size, posts))
+            )
+            ids += [post.pk for post in created]
+        return ids
+
+
+def seed(
+    users: int, posts: int, batch_size: int = 10_000, rng: random.Random | None = None
+) -> Fixture:
+    """Create the users, their tokens, an admin and the posts"""
+    from django.contrib.auth.hashers import make_password
+    from rest_framework.authtoken.models import Token
+
+    from accounts.models import User
+    from posts.models import Post
+
+    rng = rng or random.Random(0)
+    encoded: str = make_password(PASSWORD)
+    user_ids: list[int] = []
+    tokens: list[str] = []
+    for start in range(0, users, batch_size):
+        created: list[User] = User.objects.bulk_create(
+            User(
+                email=f"user{index}@bench.com",
+                username=f"user{index}",
+                password=encoded,
+            )
+            for index in range(start, min(start + batch_size, users))
+        )
+        created_tokens: list[Token] = Token.objects.bulk_create(
+            Token(user=user, key=Token.generate_key()) for user in created
+        )
+        user_ids += [user.pk for user in created]
+        tokens += [token.key for token in created_tokens]
+
+    admin: User = User.objects.create(
+        email="admin@bench.com",
+        username="admin",
+        password=encoded,
+        is_staff=True,
+    )
+    admin_token: Token = Token.objects.create(user=admin)
+
+    post_ids: list[int] = []
+    for start in range(0, posts, batch_size):
+        created_posts: list[Post] = Post.objects.bulk_create(
+            Post(
+                title=sentence(rng, 3),
+                description=sentence(rng, 30),
+                author_id=rng.choice(user_ids),
+            )
+            for _ in range(min(batch_size, posts - start))
+        )
+        post_ids += [post.pk for post in created_posts]
+    return Fixture(user_ids, tokens, admin_token.key, post_ids)
+
+
+def main() -> None:
+    """Parse the arguments and seed a test database"""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args: argparse.Namespace = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        start: float = time.perf_counter()
+        seed(args.users, args.posts, args.batch_size)
+        print(
+            f"seeded {args.users} users and {args.posts} posts "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Cost per row of PostSerializer against PostValuesSerializer
+
+Seeds --posts posts, then reads and renders all of them --repeat times
+with each serializer: the model instances with PostSerializer(many=True),
+the value rows with PostValuesSerializer. Read, serialize and render are
+timed apart, and the rendered bytes are checked to be the same.
+
+    python -m benchmarks.serializer --posts 10000 --repeat 10
+"""
+
+import argparse
+import time
+from typing import Any, Callable
+
+from benchmarks.common import setup_django, test_database
+
+
+def seed(posts: int) -> None:
+    """Create one author and their posts"""
+    from accounts.models import User
+    from posts.models import Post
+
+    author: User = User.objects.create(
+        email="author@bench.com", username="author", password="!"
+    )
+    Post.objects.bulk_create(
+        (
+            Post(title=f"Post {index}", description="Description " * 20, author=author)
+            for index in range(posts)
+        ),
+        batch_size=1_000,
+    )
+
+
+def model_path() -> tuple[Callable[[], Any], Callable[[Any], Any]]:
+    """Return the read and the serialization of the current serializer"""
+    from posts.models import Post
+    from posts.serializer import PostSerializer
+
+    def read() -> list:
+        return list(Post.objects.select_related("author"))
+
+    return read, lambda posts: PostSerializer(instance=posts, many=True).data
+
+
+def values_path() -> tuple[Callable[[], Any], Callable[[Any], Any]]:
+    """Return the read and the serialization of the fast path"""
+    from posts.models import Post
+    from posts.serializer import PostValuesSerializer
+
+    serializer: PostValuesSerializer = PostValuesSerializer()
+
+    def read() -> list:
+        return list(serializer.rows(Post.objects.all()))
+
+    return read, serializer.data
+
+
+def measure(
+    path: tuple[Callable[[], Any], Callable[[Any], Any]], repeat: int
+) -> tuple[dict[str, float], bytes]:
+    """Return the best seconds of each step over repeat runs, and the bytes"""
+    from rest_framework.renderers import JSONRenderer
+
+    read, serialize = path
+    renderer: JSONRenderer = JSONRenderer()
+    best: dict[str, float] = {}
+    for _ in range(repeat):
+        timings: dict[str, float] = {}
+        start: float = time.perf_counter()
+        rows: Any = read()
+        timings["read"] = time.perf_counter() - start
+        start = time.perf_counter()
+        data: Any = serialize(rows)
+        timings["serialize"] = time.perf_counter() - start
+        start = time.perf_counter()
+        content: bytes = renderer.render(data)
+        timings["render"] = time.perf_counter() - start
+        for step, seconds in timings.items():
+            best[step] = min(best.get(step, seconds), seconds)
+    best["total"] = sum(best.values())
+    return best, content
+
+
+def main() -> None:
+    """Parse the arguments and print the microseconds per row of each path"""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args: argparse.Namespace = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        seed(args.posts)
+        model, model_content = measure(model_path(), args.repeat)
+        values, values_content = measure(values_path(), args.repeat)
+        assert model_content == values_content, "the outputs differ"
+
+        print(f"{'step':<10} {'model us/row':>13} {'values us/row':>14} {'speedup':>8}")
+        for step in model:
+            print(
+                f"{step:<10} {model[step] / args.posts * 1e6:13.2f} "
+                f"{values[step] / args.posts * 1e6:14.2f} "
+                f"{model[step] / values[step]:7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Base classes for the API views served natively under ASGI"""
+
+import asyncio
+from typing import Any, override
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponseBase
+
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+from my_project.server_timing import ServerTimingMixin, phase
+
+
+class AsyncAPIView(ServerTimingMixin, APIView):
+    """APIView whose handlers are coroutines
+
+    Django runs the view on the event loop instead of handing the whole
+    request to a worker thread. The authenticators with an aauthenticate
+    coroutine run on the loop too, the others in a thread. The permissions
+    are checked on the loop, so they must not query the database: the ones
+    of this project only read the loaded user and the ids of the objects.
+    """
+
+    @override
+    async def dispatch(  # type: ignore[override]
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        self.args = args
+        self.kwargs = kwargs
+        drf_request: Request = self.initialize_request(request, *args, **kwargs)
+        self.request = drf_request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(drf_request, *args, **kwargs)
+
+            if drf_request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, drf_request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response: Any = handler(drf_request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(drf_request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request: Request, *args: Any, **kwargs: Any) -> None:
+        """Run everything that needs to happen before the handler, like
+        APIView.initial"""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        request.accepted_renderer, request.accepted_media_type = (
+            self.perform_content_negotiation(request)
+        )
+        request.version, request.versioning_scheme = self.determine_version(
+            request, *args, **kwargs
+        )
+
+        with phase("auth"):
+            await self.aperform_authentication(request)
+        self.check_permissions(request)
+        if self.throttle_classes:
+            await sync_to_async(self.check_throttles)(request)
+
+    async def aperform_authentication(self, request: Request) -> None:
+        """Set request.user and request.auth, like Request._authenticate"""
+        for authenticator in request.authenticators:
+            aauthenticate: Any = getattr(authenticator, "aauthenticate", None)
+            try:
+                if aauthenticate is not None:
+                    user_auth: tuple[Any, Any] | None = await aauthenticate(request)
+                else:
+                    user_auth = await sync_to_async(authenticator.authenticate)(request)
+            except APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth
+                return
+
+        request._not_authenticated()
@@ -0,0 +1,164 @@
+"""Compression of the responses, negotiated with Accept-Encoding
+
+gzip is always offered, brotli only when the brotli package is installed.
+The responses smaller than COMPRESSION_MIN_LENGTH go out as they are, the
+streaming ones are compressed chunk by chunk as they are sent.
+
+The responses of a view cache, marked by the views with an X-Cache header,
+carry an ETag naming their exact content. Their compressed bytes are cached
+under that ETag, so a page served from the cache is not compressed again.
+Only the media types of SHARED_MEDIA_TYPES are, the others, like the pages
+of the browsable API showing the user and its CSRF token, are not the same
+for every client of an ETag.
+"""
+
+from hashlib import md5
+from typing import AsyncIterator, Iterable, Iterator, override
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponseBase
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.text import acompress_sequence, compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# The encodings offered, the preferred first when the client accepts both
+ENCODINGS: tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# The media types whose content is named by the ETag alone, whoever asks
+SHARED_MEDIA_TYPES: frozenset[str] = frozenset(
+    ("application/json", "application/msgpack")
+)
+
+
+def select_encoding(accept_encoding: str) -> str | None:
+    """Return the encoding to compress with, None when the client takes none"""
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        weight: float = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip().lower()] = weight
+    best: str | None = None
+    best_weight: float = 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(content: bytes, encoding: str, max_random_bytes: int) -> bytes:
+    """Return the content compressed with the encoding"""
+    if encoding == "br":
+        return brotli.compress(content, quality=5)
+    return compress_string(content, max_random_bytes=max_random_bytes)
+
+
+def brotli_sequence(sequence: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress the chunks with brotli, flushing each one to the client"""
+    compressor: brotli.Compressor = brotli.Compressor(quality=5)
+    for chunk in sequence:
+        data: bytes = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def abrotli_sequence(sequence: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress the chunks like brotli_sequence, reading them asynchronously"""
+    compressor: brotli.Compressor = brotli.Compressor(quality=5)
+    async for chunk in sequence:
+        data: bytes = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware negotiating brotli too, from a configurable size"""
+
+    @override
+    def process_response(
+        self, request: HttpRequest, response: HttpResponseBase
+    ) -> HttpResponseBase:
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_LENGTH
+        ):
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding: str | None = select_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_stream(response, encoding)
+            # The compressed size is only known once everything is streamed
+            del response.headers["Content-Length"]
+        else:
+            compressed: bytes = self.compressed_content(response, encoding)
+            # Return the compressed content only if it's actually shorter
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # Like GZipMiddleware, a strong ETag is made weak, since it names the
+        # uncompressed bytes. If-None-Match compares the ETags weakly anyway
+        etag: str | None = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def compress_stream(
+        self, response: HttpResponseBase, encoding: str
+    ) -> Iterator[bytes] | AsyncIterator[bytes]:
+        """Return the streaming content of the response, compressed"""
+        if encoding == "br":
+            if response.is_async:
+                return abrotli_sequence(response.streaming_content)
+            return brotli_sequence(response.streaming_content)
+        if response.is_async:
+            return acompress_sequence(
+                response.streaming_content, max_random_bytes=self.max_random_bytes
+            )
+        return compress_sequence(
+            response.streaming_content, max_random_bytes=self.max_random_bytes
+        )
+
+    def compressed_content(self, response: HttpResponseBase, encoding: str) -> bytes:
+        """Return the compressed content, from the cache for the cached pages"""
+        etag: str | None = response.get("ETag")
+        media_type: str = response.get("Content-Type", "").partition(";")[0]
+        if (
+            not response.has_header("X-Cache")
+            or not etag
+            or media_type.strip().lower() not in SHARED_MEDIA_TYPES
+        ):
+            return compress(response.content, encoding, self.max_random_bytes)
+
+        digest: str = md5(f"{etag}|{response.get('Content-Type')}".encode()).hexdigest()
+        key: str = f"compressed:{encoding}:{digest}"
+        compressed: bytes | None = cache.get(key)
+        if compressed is None:
+            compressed = compress(response.content, encoding, self.max_random_bytes)
+            cache.set(key, compressed, timeout=settings.COMPRESSION_CACHE_TIMEOUT)
+        return compressed
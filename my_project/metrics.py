@@ -0,0 +1,418 @@
+"""Metrics of the API in the text format of Prometheus, served at /metrics
+
+MetricsMiddleware records every request of the process: how many, how long
+they took and how many queries they ran by view, the server errors, the
+hits and misses of the views answering from a cache, and the requests in
+flight. Each worker process keeps its metrics in memory and, when
+METRICS_DIR is set, writes them to its own file there, at most
+METRICS_FLUSH_INTERVAL seconds after they changed. MetricsView adds up the
+files of every worker, so whichever worker is scraped tells about all of
+them. Without METRICS_DIR it tells about the worker scraped only.
+
+The counters and histograms of a worker which exited stay in the sum, its
+gauges are dropped. The files are only ever added to, empty METRICS_DIR
+when the server is deployed, like the directory of prometheus_client.
+"""
+
+import atexit
+import json
+import math
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponseBase
+from django.urls import ResolverMatch
+
+from rest_framework import status
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.parsers import BaseParser
+from rest_framework.permissions import BasePermission, IsAdminUser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from my_project.queries import QueryLog, current_log
+from my_project.renderers import PrometheusRenderer
+from my_project.server_timing import ServerTimingMixin
+
+# The type and the help of each metric
+METRICS: dict[str, tuple[str, str]] = {
+    "api_requests_total": ("counter", "Requests answered, by view, method and status"),
+    "api_request_errors_total": ("counter", "Requests answered with a server error"),
+    "api_request_duration_seconds": ("histogram", "Seconds to answer the requests"),
+    "api_request_db_queries": ("histogram", "Queries run to answer the requests"),
+    "api_cache_lookups_total": ("counter", "Answers of the view caches, by result"),
+    "api_requests_in_flight": ("gauge", "Requests being answered"),
+}
+
+# The upper bounds of the buckets of each histogram
+BUCKETS: dict[str, tuple[float, ...]] = {
+    "api_request_duration_seconds": (
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    ),
+    "api_request_db_queries": (0, 1, 2, 3, 5, 10, 20, 50, 100),
+}
+
+METHODS: frozenset[str] = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+)
+
+# A series: the name of its metric and its labels, sorted
+Series = tuple[str, tuple[tuple[str, str], ...]]
+
+
+def series(name: str, **labels: str) -> Series:
+    """Return the series of the metric with the labels"""
+    return name, tuple(sorted(labels.items()))
+
+
+class Registry:
+    """The metrics of this process, written to its file in METRICS_DIR
+
+    A histogram is kept as the count of each of its buckets, the last one
+    for +Inf, followed by the sum of the values
+    """
+
+    def __init__(self) -> None:
+        self._lock: Lock = Lock()
+        self._flush_lock: Lock = Lock()
+        self._pid: int | None = None
+        self._dirty: bool = False
+        self.values: dict[Series, float] = {}
+        self.histograms: dict[Series, list[float]] = {}
+
+    @property
+    def path(self) -> Path:
+        """Return the file of this process"""
+        return Path(settings.METRICS_DIR) / f"{os.getpid()}.json"
+
+    def start(self) -> None:
+        """Start the metrics of this process, forked or not
+
+        A process reusing the pid of an exited one carries on with its
+        counters, so their sum never goes down
+        """
+        self._pid = os.getpid()
+        self.values, self.histograms = {}, {}
+        if settings.METRICS_DIR is None:
+            return
+        saved: dict[str, Any] | None = read(self.path)
+        if saved is not None:
+            self.values = {
+                key: value
+                for key, value in saved["values"].items()
+                if METRICS[key[0]][0] == "counter"
+            }
+            self.histograms = saved["histograms"]
+        Thread(target=self.flush_periodically, daemon=True).start()
+        atexit.register(self.flush)
+
+    def add(self, metric: Series, amount: float = 1) -> None:
+        """Add to a counter or a gauge"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self.start()
+            self.values[metric] = self.values.get(metric, 0) + amount
+            self._dirty = True
+
+    def observe(self, metric: Series, value: float) -> None:
+        """Count a value in its bucket of a histogram"""
+        buckets: tuple[float, ...] = BUCKETS[metric[0]]
+        with self._lock:
+            if self._pid != os.getpid():
+                self.start()
+            counts: list[float] = self.histograms.setdefault(
+                metric, [0] * (len(buckets) + 2)
+            )
+            counts[bisect_left(buckets, value)] += 1
+            counts[-1] += value
+            self._dirty = True
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a copy of the metrics of this process"""
+        with self._lock:
+            return {
+                "values": dict(self.values),
+                "histograms": {
+                    key: list(counts) for key, counts in self.histograms.items()
+                },
+            }
+
+    def flush(self) -> None:
+        """Write the metrics to the file of this process, when they changed"""
+        with self._flush_lock:
+            if (
+                not self._dirty
+                or self._pid != os.getpid()
+                or settings.METRICS_DIR is None
+            ):
+                return
+            self._dirty = False
+            write(self.path, self.snapshot())
+
+    def flush_periodically(self) -> None:
+        """Flush every METRICS_FLUSH_INTERVAL seconds, for ever"""
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            self.flush()
+
+    def collect(self) -> dict[str, Any]:
+        """Return the sum of the metrics of every process
+
+        The file of this process may be late, its metrics are read from
+        memory instead
+        """
+        total: dict[str, Any] = self.snapshot()
+        if settings.METRICS_DIR is None:
+            return total
+        for path in Path(settings.METRICS_DIR).glob("*.json"):
+            if not path.stem.isdigit() or path.stem == str(os.getpid()):
+                continue
+            saved: dict[str, Any] | None = read(path)
+            if saved is None:
+                continue
+            alive: bool = is_alive(int(path.stem))
+            for key, value in saved["values"].items():
+                if alive or METRICS[key[0]][0] == "counter":
+                    total["values"][key] = total["values"].get(key, 0) + value
+            for key, counts in saved["histograms"].items():
+                summed: list[float] | None = total["histograms"].get(key)
+                total["histograms"][key] = (
+                    counts
+                    if summed is None
+                    else [a + b for a, b in zip(summed, counts)]
+                )
+        return total
+
+    def clear(self) -> None:
+        """Forget the metrics of this process"""
+        with self._lock:
+            self.values, self.histograms = {}, {}
+            self._dirty = False
+
+
+registry: Registry = Registry()
+
+
+def write(path: Path, metrics: dict[str, Any]) -> None:
+    """Write the metrics to a file, replacing it at once"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data: dict[str, list] = {
+        "values": [
+            [name, labels, value] for (name, labels), value in metrics["values"].items()
+        ],
+        "histograms": [
+            [name, labels, counts]
+            for (name, labels), counts in metrics["histograms"].items()
+        ],
+    }
+    temporary: Path = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(data))
+    temporary.replace(path)
+
+
+def read(path: Path) -> dict[str, Any] | None:
+    """Return the metrics of a file, None when it is missing or unknown"""
+    try:
+        data: dict[str, list] = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    return {
+        kind: {
+            (name, tuple(tuple(label) for label in labels)): value
+            for name, labels, value in data[kind]
+            if name in METRICS
+        }
+        for kind in ("values", "histograms")
+    }
+
+
+def is_alive(pid: int) -> bool:
+    """Return whether the process of the pid still runs"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def number(value: float) -> str:
+    """Return a value in the text format"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def escape(value: str) -> str:
+    """Return a label value escaped for the text format"""
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def labels_text(labels: tuple[tuple[str, str], ...]) -> str:
+    """Return the labels of a sample in the text format"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+
+def exposition(metrics: dict[str, Any]) -> str:
+    """Return the metrics in the text format of Prometheus"""
+    lines: list[str] = []
+    for name, (kind, help_text) in METRICS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        if kind != "histogram":
+            for (metric, labels), value in sorted(metrics["values"].items()):
+                if metric == name:
+                    lines.append(f"{name}{labels_text(labels)} {number(value)}")
+            continue
+        for (metric, labels), counts in sorted(metrics["histograms"].items()):
+            if metric != name:
+                continue
+            cumulative: float = 0
+            for bound, count in zip((*BUCKETS[name], math.inf), counts):
+                cumulative += count
+                bucket: tuple[tuple[str, str], ...] = (*labels, ("le", number(bound)))
+                lines.append(f"{name}_bucket{labels_text(bucket)} {number(cumulative)}")
+            lines.append(f"{name}_sum{labels_text(labels)} {number(counts[-1])}")
+            lines.append(f"{name}_count{labels_text(labels)} {number(cumulative)}")
+    return "\n".join(lines) + "\n"
+
+
+def view_label(request: HttpRequest) -> str:
+    """Return the name of the view of the request, the same for every path
+    matching no view"""
+    match: ResolverMatch | None = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else "unresolved"
+
+
+class MetricsMiddleware:
+    """Record the metrics of every request
+
+    It goes after QueryCountMiddleware, whose record gives the queries
+    """
+
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response: Callable[[HttpRequest], Any] = get_response
+        self.is_async: bool = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.is_async:
+            return self.__acall__(request)
+        registry.add(series("api_requests_in_flight"))
+        start: float = time.perf_counter()
+        try:
+            response: HttpResponseBase = self.get_response(request)
+        finally:
+            registry.add(series("api_requests_in_flight"), -1)
+        self.record(request, response, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        registry.add(series("api_requests_in_flight"))
+        start: float = time.perf_counter()
+        try:
+            response: HttpResponseBase = await self.get_response(request)
+        finally:
+            registry.add(series("api_requests_in_flight"), -1)
+        self.record(request, response, time.perf_counter() - start)
+        return response
+
+    @staticmethod
+    def record(
+        request: HttpRequest, response: HttpResponseBase, duration: float
+    ) -> None:
+        """Record the metrics of an answered request"""
+        view: str = view_label(request)
+        method: str = request.method if request.method in METHODS else "other"
+        registry.add(
+            series(
+                "api_requests_total",
+                view=view,
+                method=method,
+                status=str(response.status_code),
+            )
+        )
+        if response.status_code >= 500:
+            registry.add(series("api_request_errors_total", view=view, method=method))
+        registry.observe(
+            series("api_request_duration_seconds", view=view, method=method), duration
+        )
+        log: QueryLog | None = current_log.get()
+        if log is not None:
+            registry.observe(series("api_request_db_queries", view=view), log.count)
+        cache_result: str | None = response.get("X-Cache")
+        if cache_result is not None:
+            registry.add(
+                series(
+                    "api_cache_lookups_total", view=view, result=cache_result.lower()
+                )
+            )
+
+
+class IsMetricsScraper(BasePermission):
+    """Allow the requests coming from the addresses of METRICS_ALLOWED_IPS
+
+    REMOTE_ADDR is the address of the last hop, so behind a reverse proxy
+    it is the address of the proxy for every client
+    """
+
+    def has_permission(self, request: Request, view: APIView) -> bool:
+        return request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+
+
+class TextFormatNegotiation(BaseContentNegotiation):
+    """Answer with the text format whatever the Accept header
+
+    Its media type carries the version of the format, which an Accept
+    header like */* or text/plain does not, so DRF would find no match
+    """
+
+    def select_parser(
+        self, request: Request, parsers: list[BaseParser]
+    ) -> BaseParser | None:
+        return parsers[0] if parsers else None
+
+    def select_renderer(
+        self,
+        request: Request,
+        renderers: list[BaseRenderer],
+        format_suffix: str | None = None,
+    ) -> tuple[BaseRenderer, str]:
+        return renderers[0], renderers[0].media_type
+
+
+class MetricsView(ServerTimingMixin, APIView):
+    """Expose the metrics of every worker to Prometheus"""
+
+    permission_classes = [IsMetricsScraper | IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+    content_negotiation_class = TextFormatNegotiation
+    query_budget: int = 1
+
+    def get(self, _request: Request) -> Response:
+        """Return the metrics summed over the worker processes"""
+        return Response(data=exposition(registry.collect()), status=status.HTTP_200_OK)
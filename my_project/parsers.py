@@ -0,0 +1,71 @@
+"""Parsers of the API, registered in REST_FRAMEWORK
+
+Like the renderers, ORJSONParser falls back to the json module without
+orjson, and MessagePackParser is only offered when msgpack is installed.
+"""
+
+import codecs
+from typing import IO, Any, override
+
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser, get_encoding
+
+from my_project.renderers import MessagePackRenderer, ORJSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser decoding with orjson when it is installed
+
+    orjson only reads UTF-8, a body in another charset is left to JSONParser
+    """
+
+    renderer_class: type[ORJSONRenderer] = ORJSONRenderer
+
+    @override
+    def parse(
+        self,
+        stream: IO[bytes],
+        media_type: str | None = None,
+        parser_context: dict[str, Any] | None = None,
+    ) -> Any:
+        parser_context = parser_context or {}
+        encoding: str = codecs.lookup(get_encoding(parser_context)).name
+        if orjson is None or encoding != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackParser(BaseParser):
+    """Parse a MessagePack body, sent with Content-Type: application/msgpack"""
+
+    media_type: str = "application/msgpack"
+    renderer_class: type[MessagePackRenderer] = MessagePackRenderer
+
+    @override
+    def parse(
+        self,
+        stream: IO[bytes],
+        media_type: str | None = None,
+        parser_context: dict[str, Any] | None = None,
+    ) -> Any:
+        if msgpack is None:
+            raise ImproperlyConfigured("MessagePackParser requires msgpack.")
+        try:
+            return msgpack.unpackb(stream.read())
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
@@ -0,0 +1,213 @@
+"""Profiles of live requests, taken on demand with cProfile
+
+A request is profiled when an admin sends it with an X-Profile header and
+their token, or when it is drawn by PROFILING_SAMPLE_RATE, the fraction of
+all requests to profile, 0 by default. The middleware runs before the
+sessions are loaded, so it only knows the admins by their token. The other
+requests only pay a look up of the header. Each profile is written to
+PROFILING_DIR, named after the view and the time of the request, and its
+name is sent back in the X-Profile header to the admin who asked for it,
+never to a sampled client. Read it with pstats or snakeviz.
+The body of a streaming response is read after the profile ends.
+
+Each worker process keeps the most expensive call paths, a caller and the
+function it called, of the last profiles of each view, served to the admins
+by ProfilesView. Since Python 3.12 cProfile profiles every thread of the
+process, so one request is profiled at a time and a profile holds what the
+other threads did meanwhile, like the other requests of an event loop.
+"""
+
+import cProfile
+import os
+import pstats
+import random
+import re
+from collections import Counter, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponseBase
+from django.urls import ResolverMatch
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from my_project.server_timing import ServerTimingMixin
+
+PROFILE_HEADER: str = "HTTP_X_PROFILE"
+
+
+def call_paths(stats: pstats.Stats) -> Counter:
+    """Return the cumulative seconds of each caller -> callee of a profile"""
+    paths: Counter = Counter()
+    for callee, (*_counts, callers) in stats.stats.items():
+        callee_name: str = pstats.func_std_string(callee)
+        for caller, (*_caller_counts, cumulative) in callers.items():
+            paths[f"{pstats.func_std_string(caller)} -> {callee_name}"] += cumulative
+    return paths
+
+
+class ProfileSummaries:
+    """The most expensive call paths of the last profiles of each view"""
+
+    def __init__(self) -> None:
+        self._profiles: dict[str, deque[Counter]] = {}
+        self._lock: Lock = Lock()
+
+    def add(self, view: str, stats: pstats.Stats) -> None:
+        """Keep the top call paths of a profile of the view"""
+        top: Counter = Counter(
+            dict(call_paths(stats).most_common(settings.PROFILING_TOP))
+        )
+        with self._lock:
+            profiles: deque[Counter] = self._profiles.setdefault(
+                view, deque(maxlen=settings.PROFILING_HISTORY)
+            )
+            profiles.append(top)
+
+    def top(self, view: str) -> list[dict[str, Any]]:
+        """Return the top call paths of the view over its last profiles"""
+        with self._lock:
+            profiles: list[Counter] = list(self._profiles.get(view, ()))
+        total: Counter = sum(profiles, Counter())
+        return [
+            {"path": path, "cumulative_ms": round(seconds * 1000, 3)}
+            for path, seconds in total.most_common(settings.PROFILING_TOP)
+        ]
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the number of profiles and the top call paths of each view"""
+        with self._lock:
+            counts: dict[str, int] = {
+                view: len(profiles) for view, profiles in self._profiles.items()
+            }
+        return {
+            view: {"profiles": count, "top": self.top(view)}
+            for view, count in counts.items()
+        }
+
+    def clear(self) -> None:
+        """Forget every profile"""
+        with self._lock:
+            self._profiles.clear()
+
+
+summaries: ProfileSummaries = ProfileSummaries()
+
+
+def is_admin(request: HttpRequest) -> bool:
+    """Return whether the request authenticates an admin, like IsAdminUser"""
+    drf_request: Request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    try:
+        return IsAdminUser().has_permission(drf_request, None)
+    except APIException:
+        return False
+
+
+def view_name(request: HttpRequest) -> str:
+    """Return the name of the view of the request, fit for a file name"""
+    match: ResolverMatch | None = getattr(request, "resolver_match", None)
+    name: str = match.view_name if match is not None else "unresolved"
+    return re.sub(r"[^\w.-]", "_", name)
+
+
+class ProfilingMiddleware:
+    """Profile the requests asked by an admin or drawn by the sample rate"""
+
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response: Callable[[HttpRequest], Any] = get_response
+        self.is_async: bool = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        # cProfile can only run one profile at a time in a process
+        self.lock: Lock = Lock()
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.is_async:
+            return self.__acall__(request)
+        asked: bool = PROFILE_HEADER in request.META and is_admin(request)
+        if not asked and not self.sampled():
+            return self.get_response(request)
+        if not self.lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            profile: cProfile.Profile = cProfile.Profile()
+            response: HttpResponseBase = profile.runcall(self.get_response, request)
+            self.save(request, response, profile, asked)
+            return response
+        finally:
+            self.lock.release()
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        asked: bool = PROFILE_HEADER in request.META
+        if asked:
+            asked = await sync_to_async(is_admin)(request)
+        if not asked and not self.sampled():
+            return await self.get_response(request)
+        if not self.lock.acquire(blocking=False):
+            return await self.get_response(request)
+        try:
+            profile: cProfile.Profile = cProfile.Profile()
+            profile.enable()
+            try:
+                response: HttpResponseBase = await self.get_response(request)
+            finally:
+                profile.disable()
+            # The profile is written to a file, off the event loop
+            await sync_to_async(self.save)(request, response, profile, asked)
+            return response
+        finally:
+            self.lock.release()
+
+    @staticmethod
+    def sampled() -> bool:
+        """Return whether the sample rate draws this request"""
+        rate: float = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    @staticmethod
+    def save(
+        request: HttpRequest,
+        response: HttpResponseBase,
+        profile: cProfile.Profile,
+        asked: bool,
+    ) -> None:
+        """Write the profile and keep its top call paths, name it in the
+        response when an admin asked for it"""
+        view: str = view_name(request)
+        timestamp: str = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+        directory: Path = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path: Path = directory / f"{view}-{timestamp}-{os.getpid()}.prof"
+
+        stats: pstats.Stats = pstats.Stats(profile)
+        stats.dump_stats(path)
+        summaries.add(view, stats)
+        if asked:
+            response["X-Profile"] = path.name
+
+
+class ProfilesView(ServerTimingMixin, APIView):
+    """Show the most expensive call paths of the profiled views"""
+
+    permission_classes = [IsAdminUser]
+    query_budget: int = 1
+
+    def get(self, _request: Request) -> Response:
+        """Return the top call paths of each view profiled by this worker"""
+        return Response(data=summaries.snapshot(), status=status.HTTP_200_OK)
@@ -0,0 +1,159 @@
+"""Count of the queries and time spent in the database by each request
+
+QueryCountMiddleware records every query of a request: how many ran, how
+long they took and which ones ran more than once with the same SQL, the
+mark of an N+1. With QUERY_HEADERS on, the numbers are sent back in the
+X-DB-Queries, X-DB-Time and X-DB-Duplicates headers. A request going over
+the query_budget of its view, or over QUERY_TIME_BUDGET seconds in the
+database, is logged as a warning along with its repeated queries.
+
+The queries are seen by a wrapper of each database connection, see
+connection.execute_wrapper. The async views run their queries on the
+connection of another thread, so the wrapper is added to every connection
+as it is created and finds the record of the request in a context
+variable, which asgiref carries over to that thread.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponseBase
+from django.urls import ResolverMatch
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# The placeholders of an IN list, whose length changes with the values
+IN_LIST: re.Pattern[str] = re.compile(r"IN \((?:%s, )*%s\)")
+
+
+class QueryLog:
+    """The queries of one request"""
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.time: float = 0.0
+        self.signatures: Counter = Counter()
+
+    def add(self, sql: str, elapsed: float) -> None:
+        """Record one query"""
+        self.count += 1
+        self.time += elapsed
+        self.signatures[IN_LIST.sub("IN (...)", sql)] += 1
+
+    @property
+    def duplicates(self) -> dict[str, int]:
+        """Return the SQL run more than once and how many times it ran"""
+        return {sql: count for sql, count in self.signatures.items() if count > 1}
+
+
+current_log: ContextVar[QueryLog | None] = ContextVar("current_log", default=None)
+
+
+def record_query(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,
+    many: bool,
+    context: dict[str, Any],
+) -> Any:
+    """Execute wrapper timing the query into the log of the current request"""
+    log: QueryLog | None = current_log.get()
+    if log is None:
+        return execute(sql, params, many, context)
+    start: float = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        log.add(sql, time.perf_counter() - start)
+
+
+def install(connection: BaseDatabaseWrapper, **_kwargs: Any) -> None:
+    """Add record_query to the wrappers of the connection, once"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install)
+
+
+class QueryCountMiddleware:
+    """Record the queries of each request, report them and check the budgets
+
+    A view sets its budget with a query_budget attribute, the most queries
+    any of its methods should need. The others get QUERY_BUDGET_DEFAULT.
+    The body of a streaming response is read after the report, so its
+    queries are not counted.
+    """
+
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response: Callable[[HttpRequest], Any] = get_response
+        self.is_async: bool = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.is_async:
+            return self.__acall__(request)
+        # The connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            install(connection)
+        token = current_log.set(QueryLog())
+        try:
+            response: HttpResponseBase = self.get_response(request)
+            return self.report(request, response, current_log.get())
+        finally:
+            current_log.reset(token)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        token = current_log.set(QueryLog())
+        try:
+            response: HttpResponseBase = await self.get_response(request)
+            return self.report(request, response, current_log.get())
+        finally:
+            current_log.reset(token)
+
+    def report(
+        self, request: HttpRequest, response: HttpResponseBase, log: QueryLog
+    ) -> HttpResponseBase:
+        """Add the headers and log the request when it is over its budgets"""
+        duplicates: dict[str, int] = log.duplicates
+        if settings.QUERY_HEADERS:
+            response["X-DB-Queries"] = str(log.count)
+            response["X-DB-Time"] = f"{log.time * 1000:.2f}ms"
+            response["X-DB-Duplicates"] = str(sum(duplicates.values()))
+
+        match: ResolverMatch | None = getattr(request, "resolver_match", None)
+        view: Any = getattr(match.func, "view_class", match.func) if match else None
+        budget: int = getattr(view, "query_budget", settings.QUERY_BUDGET_DEFAULT)
+        exceeded: list[str] = []
+        if log.count > budget:
+            exceeded.append(f"query budget ({log.count} > {budget})")
+        if log.time > settings.QUERY_TIME_BUDGET:
+            exceeded.append(
+                f"time budget ({log.time * 1000:.2f}ms > "
+                f"{settings.QUERY_TIME_BUDGET * 1000:g}ms)"
+            )
+        if exceeded:
+            logger.warning(
+                "%s %s (%s) ran %d queries in %.2fms, over %s. Repeated: %s",
+                request.method,
+                request.path,
+                getattr(view, "__qualname__", view),
+                log.count,
+                log.time * 1000,
+                " and over ".join(exceeded),
+                duplicates or "none",
+            )
+        return response
@@ -0,0 +1,104 @@
+"""Renderers of the API, registered in REST_FRAMEWORK
+
+orjson and msgpack are optional. Without orjson, ORJSONRenderer renders
+with the json module like JSONRenderer. Without msgpack, the settings do
+not offer MessagePackRenderer at all.
+"""
+
+from typing import Any, Callable, override
+
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding with orjson when it is installed
+
+    The output is the one of JSONRenderer with COMPACT_JSON and UNICODE_JSON,
+    the defaults. An indented output, an ASCII only one or data orjson can
+    not encode, like an integer over 64 bits, is left to JSONRenderer.
+    """
+
+    @override
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: dict[str, Any] | None = None,
+    ) -> bytes:
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            # The datetimes are passed to the encoder of DRF, which writes
+            # UTC as Z where orjson writes +00:00
+            content: bytes = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, so the JSON stays a JavaScript subset
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render the data as MessagePack, asked with Accept: application/msgpack"""
+
+    media_type: str = "application/msgpack"
+    format: str = "msgpack"
+    charset: None = None
+    render_style: str = "binary"
+
+    @override
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: dict[str, Any] | None = None,
+    ) -> bytes:
+        if msgpack is None:
+            raise ImproperlyConfigured("MessagePackRenderer requires msgpack.")
+        if data is None:
+            return b""
+        default: Callable[[Any], Any] = JSONRenderer.encoder_class().default
+        return msgpack.packb(data, default=default)
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Render the text format of Prometheus, made by my_project.metrics"""
+
+    media_type: str = "text/plain; version=0.0.4"
+    format: str = "prometheus"
+    charset: str = "utf-8"
+
+    @override
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: dict[str, Any] | None = None,
+    ) -> bytes:
+        if not isinstance(data, str):
+            # The errors of DRF, like a refused permission, as a comment
+            data = f"# {data.get('detail', data)}\n"
+        return data.encode(self.charset)
@@ -0,0 +1,200 @@
+"""Server-Timing breakdown of the time spent on each request
+
+With SERVER_TIMING on, ServerTimingMiddleware splits the time of each
+request into its phases: auth, permissions, db, serialization and render,
+along with the total. They are sent back in a Server-Timing header, which
+the browsers show next to the request, and in the request_timed signal for
+the metrics to receive.
+
+The phases do not overlap: the time of the queries run during a phase is
+counted in db only, as recorded by QueryCountMiddleware. The views and the
+serializers mark their phases with the mixins below. The body of a
+streaming response is serialized after the response is returned, so it is
+not counted. With SERVER_TIMING off, marking a phase costs a look up of
+the context variable.
+"""
+
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, override
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.dispatch import Signal
+from django.http import HttpRequest, HttpResponseBase
+from django.urls import ResolverMatch
+
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from my_project.queries import QueryLog, current_log
+
+# Sent once a request is timed, with the request, the response and the
+# seconds of each phase in timings. The sender is the view class
+request_timed: Signal = Signal()
+
+
+class Timings:
+    """The seconds spent in each phase of one request"""
+
+    def __init__(self, log: QueryLog | None) -> None:
+        self.log: QueryLog | None = log
+        self.phases: dict[str, float] = {}
+        self.start: float = time.perf_counter()
+
+    @property
+    def db_time(self) -> float:
+        """Return the seconds spent in the database so far"""
+        return self.log.time if self.log is not None else 0.0
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add seconds to a phase"""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def finish(self) -> dict[str, float]:
+        """Return every phase, with the database and the total"""
+        phases: dict[str, float] = dict(self.phases)
+        if self.log is not None:
+            phases["db"] = self.log.time
+        phases["total"] = time.perf_counter() - self.start
+        return phases
+
+    def header(self, phases: dict[str, float]) -> str:
+        """Return the value of the Server-Timing header"""
+        metrics: list[str] = []
+        for name, seconds in phases.items():
+            metric: str = f"{name};dur={seconds * 1000:.2f}"
+            if name == "db":
+                metric += f';desc="{self.log.count} queries"'
+            metrics.append(metric)
+        return ", ".join(metrics)
+
+
+current_timings: ContextVar[Timings | None] = ContextVar(
+    "current_timings", default=None
+)
+
+
+class Phase:
+    """Add the time spent in the block to a phase, less its queries"""
+
+    def __init__(self, timings: Timings, name: str) -> None:
+        self.timings: Timings = timings
+        self.name: str = name
+        self.db_start: float = 0.0
+        self.start: float = 0.0
+
+    def __enter__(self) -> None:
+        self.db_start = self.timings.db_time
+        self.start = time.perf_counter()
+
+    def __exit__(self, *_exc_info: Any) -> None:
+        elapsed: float = time.perf_counter() - self.start
+        self.timings.add(self.name, elapsed - (self.timings.db_time - self.db_start))
+
+
+_untimed: nullcontext = nullcontext()
+
+
+def phase(name: str) -> Phase | nullcontext:
+    """Return a context timing its block as the phase name, when timing"""
+    timings: Timings | None = current_timings.get()
+    if timings is None:
+        return _untimed
+    return Phase(timings, name)
+
+
+class ServerTimingMixin:
+    """APIView mixin timing the authentication, the permissions and the
+    rendering
+
+    DRF renders a response once the view returned it, the response is
+    rendered in finalize_response instead when the request is timed
+    """
+
+    @override
+    def perform_authentication(self, request: Request) -> None:
+        with phase("auth"):
+            super().perform_authentication(request)
+
+    @override
+    def check_permissions(self, request: Request) -> None:
+        with phase("permissions"):
+            super().check_permissions(request)
+
+    @override
+    def check_object_permissions(self, request: Request, obj: Any) -> None:
+        with phase("permissions"):
+            super().check_object_permissions(request, obj)
+
+    @override
+    def finalize_response(
+        self, request: Request, response: HttpResponseBase, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if current_timings.get() is not None and isinstance(response, Response):
+            with phase("render"):
+                response.render()
+        return response
+
+
+class TimedSerializerMixin:
+    """Serializer mixin timing to_representation as the serialization"""
+
+    @override
+    def to_representation(self, instance: Any) -> Any:
+        with phase("serialization"):
+            return super().to_representation(instance)
+
+
+class ServerTimingMiddleware:
+    """Time the phases of each request, report them and send request_timed
+
+    It goes after QueryCountMiddleware, whose record of the queries gives
+    the time spent in the database
+    """
+
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response: Callable[[HttpRequest], Any] = get_response
+        self.is_async: bool = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.SERVER_TIMING:
+            return self.get_response(request)
+        token = current_timings.set(Timings(current_log.get()))
+        try:
+            response: HttpResponseBase = self.get_response(request)
+            return self.report(request, response, current_timings.get())
+        finally:
+            current_timings.reset(token)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        if not settings.SERVER_TIMING:
+            return await self.get_response(request)
+        token = current_timings.set(Timings(current_log.get()))
+        try:
+            response: HttpResponseBase = await self.get_response(request)
+            return self.report(request, response, current_timings.get())
+        finally:
+            current_timings.reset(token)
+
+    def report(
+        self, request: HttpRequest, response: HttpResponseBase, timings: Timings
+    ) -> HttpResponseBase:
+        """Add the Server-Timing header and send request_timed"""
+        phases: dict[str, float] = timings.finish()
+        response["Server-Timing"] = timings.header(phases)
+        match: ResolverMatch | None = getattr(request, "resolver_match", None)
+        view: Any = getattr(match.func, "view_class", match.func) if match else None
+        request_timed.send(
+            sender=view, request=request, response=response, timings=phases
+        )
+        return response
@@ -10,7 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
+from importlib.util import find_spec
 from pathlib import Path
+from tempfile import gettempdir
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,18 +47,51 @@ INSTALLED_APPS = [
 ]
 
 AUTH_USER_MODEL = "accounts.User"
+
+# MessagePack is offered through Accept and Content-Type only when msgpack is
+# installed. The JSON classes use orjson when it is installed, json otherwise
+MSGPACK_INSTALLED = find_spec("msgpack") is not None
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
+        "accounts.authentication.CachedTokenAuthentication",
+        "accounts.authentication.AsyncSessionAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "my_project.renderers.ORJSONRenderer",
+        *(["my_project.renderers.MessagePackRenderer"] if MSGPACK_INSTALLED else []),
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "my_project.parsers.ORJSONParser",
+        *(["my_project.parsers.MessagePackParser"] if MSGPACK_INSTALLED else []),
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
     "DEFAUTLT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated"),
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
 }
 
+# Seconds a token stays cached by CachedTokenAuthentication, and how many
+# tokens each process keeps before evicting the least recently used. A
+# revoked token is refused by every worker right away, through the shared
+# cache below
+AUTH_TOKEN_CACHE_TTL = 60
+AUTH_TOKEN_CACHE_MAX_ENTRIES = 10_000
+
+# Threads hashing passwords for the login and signup views, and how many
+# hashes may be pending before new requests are rejected with a 429
+PASSWORD_HASHING_WORKERS = 4
+PASSWORD_HASHING_MAX_PENDING = 16
+
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "my_project.profiling.ProfilingMiddleware",
+    "my_project.compression.CompressionMiddleware",
+    "my_project.queries.QueryCountMiddleware",
+    "my_project.metrics.MetricsMiddleware",
+    "my_project.server_timing.ServerTimingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -96,6 +132,74 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+# default is kept by each worker process. shared is read by all of them,
+# for what must be the same in every worker, like the version of the posts
+# lists. Its directory serves the workers of one host, point it at Redis or
+# Memcached when they run on several hosts. The test runner gives each run
+# a directory of its own, through SHARED_CACHE_DIR
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "SHARED_CACHE_DIR", Path(gettempdir()) / "my_project-shared-cache"
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 100_000},
+    },
+}
+
+# Seconds a page of the posts list stays cached, writes invalidate it before
+POSTS_CACHE_TIMEOUT = 60 * 5
+
+# Rows written by each INSERT of the bulk endpoint of the posts, and the
+# most posts a single request may carry
+POSTS_BULK_BATCH_SIZE = 500
+POSTS_BULK_MAX_ITEMS = 5_000
+
+# Bytes under which a response is sent uncompressed, and seconds the
+# compressed bytes of a cached page stay cached
+COMPRESSION_MIN_LENGTH = 1024
+COMPRESSION_CACHE_TIMEOUT = POSTS_CACHE_TIMEOUT
+
+# Whether the responses tell how many queries they ran and how long they
+# took. The requests over the query_budget of their view, or this default
+# one, or over QUERY_TIME_BUDGET seconds in the database are logged
+QUERY_HEADERS = DEBUG
+QUERY_BUDGET_DEFAULT = 10
+QUERY_TIME_BUDGET = 0.1
+
+# Whether the responses carry a Server-Timing header splitting their time
+# into auth, permissions, db, serialization and render, and send it in the
+# request_timed signal
+SERVER_TIMING = DEBUG
+
+# The requests profiled with cProfile: those of an admin sending an
+# X-Profile header, and this fraction of all requests. The profiles are
+# written to PROFILING_DIR, and each worker keeps the PROFILING_TOP most
+# expensive call paths of the last PROFILING_HISTORY profiles of each view
+PROFILING_SAMPLE_RATE = 0.0
+PROFILING_DIR = BASE_DIR / "profiles"
+PROFILING_TOP = 20
+PROFILING_HISTORY = 50
+
+# Where each worker process writes its metrics for /metrics to add them up,
+# at most METRICS_FLUSH_INTERVAL seconds late. Empty it on each deploy. When
+# it is None, nothing is written and /metrics tells about one worker only.
+# The test runner gives each run a directory of its own, through METRICS_DIR
+METRICS_DIR = os.environ.get("METRICS_DIR", BASE_DIR / "metrics")
+METRICS_FLUSH_INTERVAL = 1.0
+# /metrics answers the admins and the scrapers of METRICS_ALLOWED_IPS. The
+# address is the one of the last hop, behind a reverse proxy every client
+# has the address of the proxy, so list a scraper only when it reaches the
+# workers directly and scrape through the proxy with an admin token
+METRICS_ALLOWED_IPS = []
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -136,3 +240,5 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+TEST_RUNNER = "my_project.test_runner.TestRunner"
@@ -0,0 +1,83 @@
+"""Sparse fieldsets of the API, asked with ?fields=
+
+A client asking for ?fields=id,title gets only those keys. The serializer
+drops the other fields before anything is read, so a SerializerMethodField
+left out never runs its query, and the queryset is projected down to the
+columns the kept fields read.
+"""
+
+from functools import cache
+from typing import Any
+
+from django.db.models import QuerySet
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.serializers import BaseSerializer
+
+FIELDS_PARAM: str = "fields"
+
+
+@cache
+def field_names(serializer_class: type[BaseSerializer]) -> frozenset[str]:
+    """Return the names of the fields of the serializer class"""
+    return frozenset(serializer_class().fields)
+
+
+def requested_fields(
+    request: Request, serializer_class: type[BaseSerializer]
+) -> list[str] | None:
+    """Return the fields asked with ?fields=, None when the client asked for all"""
+    value: str | None = request.query_params.get(FIELDS_PARAM)
+    if value is None:
+        return None
+    fields: list[str] = [name.strip() for name in value.split(",") if name.strip()]
+    available: frozenset[str] = field_names(serializer_class)
+    unknown: list[str] = [name for name in fields if name not in available]
+    if not fields or unknown:
+        raise ValidationError(
+            {
+                FIELDS_PARAM: [
+                    f"Unknown fields: {', '.join(unknown) or '(none given)'}. "
+                    f"Choose among: {', '.join(sorted(available))}."
+                ]
+            }
+        )
+    return fields
+
+
+class SparseFieldsMixin:
+    """Serializer mixin keeping only the fields given in the fields argument
+
+    column_map tells which columns a field reads when it is not a column of
+    its own, like a related field which reads a column of another table
+    """
+
+    column_map: dict[str, tuple[str, ...]] = {}
+
+    def __init__(self, *args: Any, fields: list[str] | None = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def project(
+        cls, queryset: QuerySet, fields: list[str] | None, *needed: str
+    ) -> QuerySet:
+        """Select only the columns read by the fields and the needed ones
+
+        The relations are joined only when a kept field reads through them
+        """
+        if fields is None:
+            return queryset
+        columns: list[str] = [*needed]
+        for name in fields:
+            columns.extend(cls.column_map.get(name, (name,)))
+        related: set[str] = {
+            column.split("__")[0] for column in columns if "__" in column
+        }
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
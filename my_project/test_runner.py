@@ -0,0 +1,52 @@
+"""Test runner of the project"""
+
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, override
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from my_project.metrics import registry
+
+
+class TestRunner(DiscoverRunner):
+    """Run the tests on files of their own
+
+    The shared cache and the metrics of a run live in a temporary
+    directory, also given to the processes the tests start through
+    SHARED_CACHE_DIR and METRICS_DIR, so the tests never bump the versions
+    or revoke the tokens of a local server, nor add to its metrics
+    """
+
+    @override
+    def setup_test_environment(self, **kwargs: Any) -> None:
+        super().setup_test_environment(**kwargs)
+        self.directory: TemporaryDirectory = TemporaryDirectory(
+            prefix="my_project-tests-"
+        )
+        shared_cache: Path = Path(self.directory.name) / "shared-cache"
+        metrics: Path = Path(self.directory.name) / "metrics"
+        os.environ["SHARED_CACHE_DIR"] = str(shared_cache)
+        os.environ["METRICS_DIR"] = str(metrics)
+        self.settings_override: override_settings = override_settings(
+            CACHES={
+                **settings.CACHES,
+                "shared": {**settings.CACHES["shared"], "LOCATION": shared_cache},
+            },
+            METRICS_DIR=metrics,
+        )
+        self.settings_override.enable()
+
+    @override
+    def teardown_test_environment(self, **kwargs: Any) -> None:
+        # Nothing is left for the flush at exit to write to the default
+        # directory
+        registry.clear()
+        self.settings_override.disable()
+        os.environ.pop("SHARED_CACHE_DIR", None)
+        os.environ.pop("METRICS_DIR", None)
+        self.directory.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -18,8 +18,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, URLResolver, include
 
+from my_project.metrics import MetricsView
+from my_project.profiling import ProfilesView
+
 urlpatterns: list[URLResolver] = [
     path("admin/", admin.site.urls),
     path("posts/", include("posts.urls")),
     path("auth/", include("accounts.urls")),
+    path("profiles/", ProfilesView.as_view(), name="profiles"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
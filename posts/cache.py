@@ -0,0 +1,107 @@
+"""Versioned cache of the posts lists
+
+Every page of the posts list is cached under the current version of the
+posts. Any write bumps the version, so the pages cached before it are
+never read again and simply expire. A request reads the version once,
+before the posts, and uses it for its ETag and its page, so a page read
+while a write commits is cached under the version it replaces.
+
+The pages are kept by each worker process in the default cache, the
+version in the shared cache, which every worker reads. A write handled by
+one worker so retires the pages of all of them.
+"""
+
+import time
+from hashlib import md5
+from threading import Lock
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import BaseCache
+
+from rest_framework.request import Request
+
+VERSION_KEY: str = "posts:version"
+
+
+class CacheStats:
+    """Hit and miss counters of the posts lists cache in this process"""
+
+    def __init__(self) -> None:
+        self._lock: Lock = Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def hit(self) -> None:
+        """Count one page served from the cache"""
+        with self._lock:
+            self.hits += 1
+
+    def miss(self) -> None:
+        """Count one page that had to be computed"""
+        with self._lock:
+            self.misses += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the counters and the hit ratio"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total: int = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+        }
+
+
+stats: CacheStats = CacheStats()
+
+
+def get_version() -> int:
+    """Return the current version of the posts"""
+    shared: BaseCache = caches["shared"]
+    version: int | None = shared.get(VERSION_KEY)
+    if version is None:
+        # add() keeps the value of a concurrent reader that got there first
+        shared.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = shared.get(VERSION_KEY)
+    return int(version)
+
+
+async def aget_version() -> int:
+    """Return the current version of the posts, without blocking the event
+    loop on the files of the shared cache"""
+    shared: BaseCache = caches["shared"]
+    version: int | None = await shared.aget(VERSION_KEY)
+    if version is None:
+        await shared.aadd(VERSION_KEY, time.time_ns(), timeout=None)
+        version = await shared.aget(VERSION_KEY)
+    return int(version)
+
+
+def bump_version() -> None:
+    """Invalidate every cached page of the posts lists, in every worker"""
+    caches["shared"].set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def page_key(request: Request, version: int) -> str:
+    """Return the cache key of the page asked by the request, at a version
+    of the posts"""
+    url: str = md5(request.build_absolute_uri().encode()).hexdigest()
+    return f"posts:list:{version}:{url}"
+
+
+def get_page(key: str) -> Any | None:
+    """Return the cached page, counting the hit or the miss"""
+    data: Any | None = cache.get(key)
+    if data is None:
+        stats.miss()
+    else:
+        stats.hit()
+    return data
+
+
+def set_page(key: str, data: Any) -> None:
+    """Store a computed page"""
+    cache.set(key, data, timeout=settings.POSTS_CACHE_TIMEOUT)
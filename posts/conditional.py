@@ -0,0 +1,92 @@
+"""Conditional requests support of the posts app
+
+The validators are computed from cheap data, the updated column of one
+post and the username of its author or the version of the posts lists
+shared by the workers, so a client whose copy is current gets a 304 before
+anything is fetched in full or serialized, and a client writing over a copy
+which is not gets a 412.
+"""
+
+from datetime import datetime
+from hashlib import md5
+
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+CONDITIONAL_HEADERS: tuple[str, ...] = (
+    "HTTP_IF_NONE_MATCH",
+    "HTTP_IF_MODIFIED_SINCE",
+    "HTTP_IF_MATCH",
+    "HTTP_IF_UNMODIFIED_SINCE",
+)
+
+
+class PreconditionFailed(APIException):
+    """The resource changed between the check of the preconditions and the write"""
+
+    status_code: int = status.HTTP_412_PRECONDITION_FAILED
+    default_detail: str = "The resource was changed by another request."
+    default_code: str = "precondition_failed"
+
+
+def is_conditional(request: Request) -> bool:
+    """Return True when the request carries a precondition header"""
+    return any(header in request.META for header in CONDITIONAL_HEADERS)
+
+
+def post_validators(
+    request: Request, pk: int, updated: datetime, author: str
+) -> tuple[str, int]:
+    """Return the ETag and the Last-Modified timestamp of one post
+
+    Besides the post, the body shows the username of its author and is
+    rendered in the accepted media type, so both are in the ETag too
+    """
+    microseconds: int = int(updated.timestamp()) * 1_000_000 + updated.microsecond
+    variant: str = md5(f"{author}|{request.accepted_media_type}".encode()).hexdigest()
+    return f'"{pk}-{microseconds}-{variant[:12]}"', int(updated.timestamp())
+
+
+def list_validators(request: Request, version: int, *scope: object) -> tuple[str, int]:
+    """Return the ETag and the Last-Modified timestamp of a page of posts
+
+    The page depends on the version of the posts, on the url, on the
+    accepted media type and on whatever the scope adds, like the user
+    """
+    page: str = "|".join(
+        [request.build_absolute_uri(), str(request.accepted_media_type)]
+        + [str(item) for item in scope]
+    )
+    digest: str = md5(page.encode()).hexdigest()
+    return f'"{version}-{digest}"', version // 1_000_000_000
+
+
+def evaluate(
+    request: Request, etag: str, last_modified: int
+) -> HttpResponseBase | None:
+    """Return a 304 or a 412 response when the preconditions ask for it"""
+    response: HttpResponseBase | None = get_conditional_response(
+        request._request, etag=etag, last_modified=last_modified
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(
+    response: HttpResponseBase, etag: str, last_modified: int
+) -> HttpResponseBase:
+    """Add the ETag and Last-Modified headers to the response
+
+    The validators depend on the accepted media type, which Vary tells the
+    caches on the way
+    """
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_vary_headers(response, ("Accept",))
+    return response
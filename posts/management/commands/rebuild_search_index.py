@@ -0,0 +1,21 @@
+"""Command to fill the full-text index of the posts again"""
+
+from typing import Any, override
+
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+
+class Command(BaseCommand):
+    """Rebuild the posts_post_fts index from the posts_post table"""
+
+    help: str = (
+        "Rebuild the full-text index of the posts, for example after a "
+        "migration dropped its triggers or rows were written with them off"
+    )
+
+    @override
+    def handle(self, *args: Any, **options: Any) -> None:
+        posts: int = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {posts} posts"))
@@ -0,0 +1,77 @@
+"""Full-text index of the posts, an SQLite FTS5 table kept in sync by triggers
+
+The triggers live on posts_post, so a later migration which rebuilds that
+table (SQLite alters most columns by copying the table) drops them. Such a
+migration must create them again, and `manage.py rebuild_search_index`
+refills the index.
+"""
+
+from django.db import migrations
+
+CREATE_SQL: list[str] = [
+    """
+    CREATE VIRTUAL TABLE posts_post_fts USING fts5(
+        title,
+        description,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # A word of the title weighs ten times a word of the description
+    """
+    INSERT INTO posts_post_fts(posts_post_fts, rank) VALUES('rank', 'bm25(10.0, 1.0)')
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_insert AFTER INSERT ON posts_post BEGIN
+        INSERT INTO posts_post_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_delete AFTER DELETE ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_update AFTER UPDATE OF title, description
+    ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO posts_post_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO posts_post_fts(posts_post_fts) VALUES('rebuild')",
+]
+
+DROP_SQL: list[str] = [
+    "DROP TRIGGER IF EXISTS posts_post_fts_update",
+    "DROP TRIGGER IF EXISTS posts_post_fts_delete",
+    "DROP TRIGGER IF EXISTS posts_post_fts_insert",
+    "DROP TABLE IF EXISTS posts_post_fts",
+]
+
+
+def run(statements: list[str]):
+    """Run the statements on SQLite only, the other databases have no FTS5"""
+
+    def operation(_apps, schema_editor) -> None:
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0011_post_updated"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_SQL), run(DROP_SQL)),
+    ]
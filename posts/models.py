@@ -8,6 +8,7 @@ from django.db.models import (
     TextField,
     DateTimeField,
     ForeignKey,
+    Index,
     CASCADE,
 )
 from accounts.models import User
@@ -19,8 +20,18 @@ class Post(Model):
     title: CharField = CharField(max_length=50)
     description: TextField = TextField()
     created: DateTimeField = DateTimeField(auto_now_add=True)
+    updated: DateTimeField = DateTimeField(auto_now=True)
     author: ForeignKey = ForeignKey(User, on_delete=CASCADE, related_name="posts")
 
+    class Meta:
+        """Newest first ordering, backed by the indexes of the posts lists"""
+
+        ordering: list[str] = ["-created", "-id"]
+        indexes: list[Index] = [
+            Index(fields=["author", "created", "id"], name="posts_author_created_idx"),
+            Index(fields=["created", "id"], name="posts_created_idx"),
+        ]
+
     @override
     def __str__(self) -> str:
         return str(self.title)
@@ -0,0 +1,148 @@
+"""Pagination classes of the posts app"""
+
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Any, NamedTuple, override
+
+from django.db.models import Q, QuerySet
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from posts.models import Post
+
+
+class Cursor(NamedTuple):
+    """Position of a page boundary inside the (created, id) ordering"""
+
+    created: datetime
+    pk: int
+    reverse: bool
+
+
+class KeysetPagination(BasePagination):
+    """Paginate the posts newest first, keyed on (created, id)
+
+    Each page is read with a WHERE on the key of the last row the client saw,
+    so every page costs the same no matter how deep the client scrolls.
+    No OFFSET and no COUNT(*) are ever issued.
+    """
+
+    cursor_query_param: str = "cursor"
+    page_size_query_param: str = "page_size"
+    page_size: int = 20
+    max_page_size: int = 100
+    invalid_cursor_message: str = "Invalid cursor"
+
+    @override
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: APIView | None = None
+    ) -> list[Post]:
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(
+        self, queryset: QuerySet, request: Request, view: APIView | None = None
+    ) -> list[Post]:
+        """Return the page like paginate_queryset, with the async ORM"""
+        page_queryset: QuerySet = self.page_queryset(queryset, request)
+        return self.set_page([post async for post in page_queryset])
+
+    def page_queryset(self, queryset: QuerySet, request: Request) -> QuerySet:
+        """Return the rows of the page asked by the request, and one more"""
+        self.base_url: str = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor: Cursor | None = self.decode_cursor(request)
+
+        # The bound on created alone lets the database seek into the
+        # (created, id) indexes instead of filtering them from the start
+        if self.cursor is None:
+            queryset = queryset.order_by("-created", "-id")
+        elif self.cursor.reverse:
+            queryset = queryset.filter(
+                Q(created__gte=self.cursor.created),
+                Q(created__gt=self.cursor.created) | Q(id__gt=self.cursor.pk),
+            ).order_by("created", "id")
+        else:
+            queryset = queryset.filter(
+                Q(created__lte=self.cursor.created),
+                Q(created__lt=self.cursor.created) | Q(id__lt=self.cursor.pk),
+            ).order_by("-created", "-id")
+
+        # One extra row tells whether there is a page after this one
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, posts: list[Post]) -> list[Post]:
+        """Keep the rows of the page and work out its links"""
+        has_more: bool = len(posts) > self.page_size
+        posts = posts[: self.page_size]
+
+        if self.cursor is not None and self.cursor.reverse:
+            posts.reverse()
+            self.has_next: bool = True
+            self.has_previous: bool = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page: list[Post] = posts
+        return posts
+
+    @override
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(
+            data={
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_page_size(self, request: Request) -> int:
+        """Return the page size asked by the client, bounded by max_page_size"""
+        try:
+            page_size: int = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self) -> str | None:
+        """Build the url of the next page"""
+        if not self.has_next or not self.page:
+            return None
+        last: Post = self.page[-1]
+        return self.encode_cursor(Cursor(last.created, last.pk, reverse=False))
+
+    def get_previous_link(self) -> str | None:
+        """Build the url of the previous page"""
+        if not self.has_previous or not self.page:
+            return None
+        first: Post = self.page[0]
+        return self.encode_cursor(Cursor(first.created, first.pk, reverse=True))
+
+    def decode_cursor(self, request: Request) -> Cursor | None:
+        """Read the opaque cursor sent by the client"""
+        encoded: str | None = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created, pk, reverse = json.loads(urlsafe_b64decode(encoded.encode()))
+            return Cursor(datetime.fromisoformat(created), int(pk), bool(reverse))
+        except (binascii.Error, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor: Cursor) -> str:
+        """Build a url pointing at the given cursor"""
+        payload: bytes = json.dumps(
+            [cursor.created.isoformat(), cursor.pk, int(cursor.reverse)],
+            separators=(",", ":"),
+        ).encode()
+        encoded: str = urlsafe_b64encode(payload).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
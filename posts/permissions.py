@@ -10,10 +10,12 @@ from posts.models import Post
 class IsAuthorOrReadOnly(BasePermission):
     """Verify if the user is the author or not, if he is... the user can modify his own posts
     Otherwise only can read
+
+    The ids are compared, so the author of the post is never loaded
     """
 
     @override
     def has_object_permission(
         self, request: Request, _view: APIView, obj: Post
     ) -> bool:
-        return bool(request.method in SAFE_METHODS or request.user == obj.author)
+        return bool(request.method in SAFE_METHODS or request.user.pk == obj.author_id)
@@ -0,0 +1,33 @@
+"""Renderers of the posts app"""
+
+from typing import Any, override
+
+from my_project.renderers import ORJSONRenderer
+
+
+class NDJSONRenderer(ORJSONRenderer):
+    """Render each object as one compact JSON document followed by a newline
+
+    Used by the streaming mode of the posts lists, where every post is
+    written as its own line instead of one big JSON array
+    """
+
+    media_type: str = "application/x-ndjson"
+    format: str = "ndjson"
+
+    @override
+    def get_indent(
+        self, accepted_media_type: str | None, renderer_context: dict[str, Any]
+    ) -> None:
+        return None
+
+    @override
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: dict[str, Any] | None = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        return super().render(data, accepted_media_type, renderer_context) + b"\n"
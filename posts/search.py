@@ -0,0 +1,128 @@
+"""Full-text search over the posts
+
+The posts are indexed by the posts_post_fts table, an SQLite FTS5 index
+over their title and description kept in sync by triggers (see the
+0012_post_search_index migration). A search reads the ids of the best
+matches from the index and then the posts themselves by primary key.
+"""
+
+import binascii
+import json
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, NamedTuple, override
+
+from django.db import connection
+from django.db.models import QuerySet
+
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from posts.models import Post
+from posts.pagination import KeysetPagination
+
+FTS_TABLE: str = "posts_post_fts"
+
+WORD: re.Pattern[str] = re.compile(r"\w+")
+
+
+class SearchCursor(NamedTuple):
+    """Position of a page boundary inside the (rank, id) ordering"""
+
+    rank: float
+    pk: int
+
+
+def match_expression(query: str) -> str | None:
+    """Turn what the user typed into an FTS5 query matching every word
+
+    Each word is quoted, so the FTS5 operators and punctuation typed by the
+    user are searched for as text instead of being interpreted
+    """
+    words: list[str] = WORD.findall(query)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+def ranked_ids(
+    expression: str, after: SearchCursor | None, limit: int
+) -> list[tuple[int, float]]:
+    """Return the id and the rank of the best matches, best first"""
+    sql: str = f"SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+    params: list[Any] = [expression]
+    if after is not None:
+        sql += " AND (rank > %s OR (rank = %s AND rowid > %s))"
+        params += [after.rank, after.rank, after.pk]
+    sql += " ORDER BY rank, rowid LIMIT %s"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def rebuild() -> int:
+    """Fill the index again from posts_post and return how many posts it holds"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('optimize')")
+        cursor.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+class SearchPagination(KeysetPagination):
+    """Paginate the results of a search, best match first, keyed on (rank, id)
+
+    Like KeysetPagination, no OFFSET is ever issued, each page starts after
+    the rank and the id of the last match the client saw
+    """
+
+    def paginate_search(
+        self,
+        queryset: QuerySet,
+        expression: str,
+        request: Request,
+        view: APIView | None = None,
+    ) -> list[Post]:
+        """Return the posts of the queryset on the page asked by the request"""
+        self.base_url: str = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor: SearchCursor | None = self.decode_search_cursor(request)
+
+        # One extra match tells whether there is a page after this one
+        matches: list[tuple[int, float]] = ranked_ids(
+            expression, cursor, self.page_size + 1
+        )
+        self.has_next: bool = len(matches) > self.page_size
+        self.matches: list[tuple[int, float]] = matches[: self.page_size]
+
+        posts: dict[int, Post] = queryset.in_bulk([pk for pk, _rank in self.matches])
+        self.page: list[Post] = [posts[pk] for pk, _rank in self.matches if pk in posts]
+        return self.page
+
+    @override
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(data={"next": self.get_next_link(), "results": data})
+
+    @override
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.matches:
+            return None
+        pk, rank = self.matches[-1]
+        payload: bytes = json.dumps([rank, pk], separators=(",", ":")).encode()
+        encoded: str = urlsafe_b64encode(payload).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_search_cursor(self, request: Request) -> SearchCursor | None:
+        """Read the opaque cursor sent by the client"""
+        encoded: str | None = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            rank, pk = json.loads(urlsafe_b64decode(encoded.encode()))
+            return SearchCursor(float(rank), int(pk))
+        except (binascii.Error, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
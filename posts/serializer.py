@@ -1,22 +1,203 @@
 """All the serializers of the posts app"""
 
+from datetime import datetime, tzinfo
+from typing import Any, Callable, Iterable, override
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from rest_framework import ISO_8601
+from rest_framework.exceptions import ErrorDetail, ValidationError
 from rest_framework.serializers import (
+    DateTimeField,
+    IntegerField,
+    ListField,
+    ListSerializer,
+    Serializer,
     ModelSerializer,
     StringRelatedField,
     ManyRelatedField,
 )
+from rest_framework.settings import api_settings
+from my_project.server_timing import TimedSerializerMixin, phase
+from my_project.sparse_fields import SparseFieldsMixin
 from posts.models import Post
 
 
-class PostSerializer(ModelSerializer):
+class PostSerializer(TimedSerializerMixin, SparseFieldsMixin, ModelSerializer):
     """Serializer for the Post model"""
 
     author: StringRelatedField[Post] | ManyRelatedField = StringRelatedField(
         read_only=True
     )
+    # The string of the author is its username
+    column_map: dict[str, tuple[str, ...]] = {"author": ("author__username",)}
 
     class Meta:
         """Necessary class for parents class functionality"""
 
         model = Post
         fields: str | list[str] = "__all__"
+
+    @staticmethod
+    def changed_fields(
+        instance: Post, validated_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Return the validated values which differ from those of the instance"""
+        return {
+            name: value
+            for name, value in validated_data.items()
+            if getattr(instance, name) != value
+        }
+
+    @override
+    def update(self, instance: Post, validated_data: dict[str, Any]) -> Post:
+        """Write only the changed columns, along with updated"""
+        changed: dict[str, Any] = self.changed_fields(instance, validated_data)
+        if changed:
+            for name, value in changed.items():
+                setattr(instance, name, value)
+            instance.save(update_fields=[*changed, "updated"])
+        return instance
+
+
+class PostValuesSerializer:
+    """Read-only PostSerializer building the posts straight from value rows
+
+    The rows are tuples read with values_list, the author joined as its
+    username, so no model instance and no per field lookup is made for each
+    post. The output is the one of PostSerializer with the same fields.
+    """
+
+    # The pagination reads the keys of the first and the last rows of a page
+    keys: tuple[str, ...] = ("pk", "created")
+
+    def __init__(self, fields: list[str] | None = None):
+        serializer: PostSerializer = PostSerializer(fields=fields)
+        self.columns: list[str] = [*self.keys]
+        # For each field, its name, the index of its column in a row and
+        # the conversion of the value, None when it is output as read
+        self.layout: list[tuple[str, int, Callable[[Any], Any] | None]] = []
+        column_map: dict[str, tuple[str, ...]] = {
+            "id": ("pk",),
+            **PostSerializer.column_map,
+        }
+        for name, field in serializer.fields.items():
+            (column,) = column_map.get(name, (name,))
+            if column not in self.columns:
+                self.columns.append(column)
+            convert: Callable[[Any], Any] | None = None
+            if isinstance(field, DateTimeField):
+                convert = self.datetime_conversion(field)
+            self.layout.append((name, self.columns.index(column), convert))
+
+    @staticmethod
+    def datetime_conversion(field: DateTimeField) -> Callable[[Any], Any]:
+        """Return the to_representation of the field, reading its settings once
+
+        DateTimeField.to_representation looks the format and the timezone up
+        for each value, this conversion looks them up once per serializer
+        """
+        output_format: str | None = getattr(
+            field, "format", api_settings.DATETIME_FORMAT
+        )
+        field_timezone: tzinfo | None = (
+            field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        )
+        if output_format is None or output_format.lower() != ISO_8601:
+            return field.to_representation
+        if field_timezone is None:
+            return field.to_representation
+
+        def convert(value: datetime | None) -> str | None:
+            # Only the aware datetimes read from the database take the short way
+            if not value or value.tzinfo is None:
+                return field.to_representation(value)
+            text: str = value.astimezone(field_timezone).isoformat()
+            return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+        return convert
+
+    def rows(self, queryset: QuerySet) -> QuerySet:
+        """Return the queryset reading the rows of the posts"""
+        return queryset.values_list(*self.columns, named=True)
+
+    def to_representation(self, row: tuple) -> dict[str, Any]:
+        """Return the post of one row"""
+        return {
+            name: row[index] if convert is None else convert(row[index])
+            for name, index, convert in self.layout
+        }
+
+    def data(self, rows: Iterable[tuple]) -> list[dict[str, Any]]:
+        """Return the posts of the rows"""
+        with phase("serialization"):
+            return [self.to_representation(row) for row in rows]
+
+
+class BulkPostSerializer(ListSerializer):
+    """Validate a list of posts item by item
+
+    The invalid items do not fail the whole list, their errors are kept in
+    item_errors by index and validated_data holds only the valid items
+    """
+
+    child: PostSerializer = PostSerializer()
+
+    @override
+    def to_internal_value(self, data: Any) -> list[dict[str, Any]]:
+        if not isinstance(data, list):
+            message: str = self.error_messages["not_a_list"].format(
+                input_type=type(data).__name__
+            )
+            raise ValidationError({"non_field_errors": [message]}, code="not_a_list")
+        if not data:
+            raise ValidationError(
+                {"non_field_errors": [self.error_messages["empty"]]}, code="empty"
+            )
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages["max_length"].format(
+                max_length=self.max_length
+            )
+            raise ValidationError({"non_field_errors": [message]}, code="max_length")
+
+        self.item_errors: dict[int, dict[str, list[ErrorDetail]]] = {}
+        validated: list[dict[str, Any]] = []
+        for index, item in enumerate(data):
+            try:
+                validated.append(self.child.run_validation(item))
+            except ValidationError as error:
+                self.item_errors[index] = error.detail
+        return validated
+
+
+class PostSelectionSerializer(Serializer):
+    """Select posts by ids, by creation date or by both"""
+
+    ids: ListField = ListField(child=IntegerField(), required=False, allow_empty=False)
+    created_before: DateTimeField = DateTimeField(required=False)
+
+    def validate_ids(self, ids: list[int]) -> list[int]:
+        """Bound the number of ids like the bulk creation bounds its items"""
+        max_length: int = settings.POSTS_BULK_MAX_ITEMS
+        if len(ids) > max_length:
+            raise ValidationError(
+                f"Ensure this field has no more than {max_length} elements."
+            )
+        return ids
+
+    @override
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        if not attrs:
+            raise ValidationError("Give ids, created_before or both.")
+        return attrs
+
+    def select(self, queryset: QuerySet) -> QuerySet:
+        """Narrow the queryset down to the selected posts"""
+        if "ids" in self.validated_data:
+            queryset = queryset.filter(id__in=self.validated_data["ids"])
+        if "created_before" in self.validated_data:
+            queryset = queryset.filter(
+                created__lt=self.validated_data["created_before"]
+            )
+        return queryset
@@ -0,0 +1,31 @@
+"""Signal receivers of the posts app"""
+
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from posts.cache import bump_version
+from posts.models import Post
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_posts_cache(**_kwargs: Any) -> None:
+    """Any write on a post changes the posts lists
+
+    The version is bumped once the write is committed, a reader bumped
+    before would cache the rows the transaction replaces
+    """
+    transaction.on_commit(bump_version)
+
+
+@receiver(post_save, sender=User)
+def invalidate_posts_cache_on_rename(
+    created: bool, update_fields: frozenset[str] | None, **_kwargs: Any
+) -> None:
+    """The posts lists show the username of the authors"""
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    transaction.on_commit(bump_version)
@@ -0,0 +1,56 @@
+"""Streaming responses of the posts app"""
+
+from typing import AsyncIterator, Iterator
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+from rest_framework.request import Request
+
+from posts.renderers import NDJSONRenderer
+from posts.serializer import PostValuesSerializer
+
+
+def wants_stream(request: Request) -> bool:
+    """Return True when the client opted in the streaming mode
+    with ?stream=1 or with an Accept: application/x-ndjson header"""
+    if request.query_params.get("stream") in ("1", "true"):
+        return True
+    return isinstance(getattr(request, "accepted_renderer", None), NDJSONRenderer)
+
+
+def stream_posts(
+    queryset: QuerySet, chunk_size: int, fields: list[str] | None = None
+) -> StreamingHttpResponse:
+    """Stream every post of the queryset as NDJSON, newest first
+
+    Rows are read from the database chunk_size at a time and each one is
+    written as soon as it is serialized, so memory stays flat no matter
+    how many posts the queryset holds
+    """
+    renderer: NDJSONRenderer = NDJSONRenderer()
+    serializer: PostValuesSerializer = PostValuesSerializer(fields=fields)
+    rows: Iterator[tuple] = (
+        serializer.rows(queryset)
+        .order_by("-created", "-id")
+        .iterator(chunk_size=chunk_size)
+    )
+    lines: Iterator[bytes] = (
+        renderer.render(serializer.to_representation(row)) for row in rows
+    )
+    return StreamingHttpResponse(lines, content_type=renderer.media_type)
+
+
+def astream_posts(
+    queryset: QuerySet, chunk_size: int, fields: list[str] | None = None
+) -> StreamingHttpResponse:
+    """Stream the posts like stream_posts, reading them with the async ORM"""
+    renderer: NDJSONRenderer = NDJSONRenderer()
+    serializer: PostValuesSerializer = PostValuesSerializer(fields=fields)
+    rows: QuerySet = serializer.rows(queryset).order_by("-created", "-id")
+
+    async def lines() -> AsyncIterator[bytes]:
+        async for row in rows.aiterator(chunk_size=chunk_size):
+            yield renderer.render(serializer.to_representation(row))
+
+    return StreamingHttpResponse(lines(), content_type=renderer.media_type)
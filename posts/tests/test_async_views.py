@@ -0,0 +1,224 @@
+"""Tests for the async variants of the posts views"""
+
+import gzip
+from typing import Any
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_403_FORBIDDEN,
+    HTTP_404_NOT_FOUND,
+    HTTP_412_PRECONDITION_FAILED,
+)
+
+from accounts.authentication import CachedTokenAuthentication
+from accounts.models import User
+from posts import cache
+from posts.models import Post
+from posts.tests.test_setup import TestSetUp
+
+
+class TestAsyncPostViews(TestSetUp):
+    """Tests for AsyncPostListView, AsyncPostDetailView and AsyncPostsForUserView"""
+
+    async_client: AsyncClient
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.async_posts_url: str = reverse("async_posts_list")
+        self.async_for_this_user_url: str = reverse("async_posts_for_this_user")
+        author: User = User.objects.get(email=self.user_data["email"])
+        other: User = User.objects.get(email=self.user_data2["email"])
+        self.own_ids: list[int] = [
+            post.pk
+            for post in Post.objects.bulk_create(
+                Post(title=f"Post {index}", description="Description", author=author)
+                for index in range(5)
+            )
+        ]
+        self.other_id: int = Post.objects.create(
+            title="Other", description="Description", author=other
+        ).pk
+
+    def _detail_url(self, post_id: int) -> str:
+        return reverse("async_post_detail", kwargs={"post_id": post_id})
+
+    def _auth(self, token: str) -> dict[str, str]:
+        return {"Authorization": "Token " + token}
+
+    async def test_list_matches_the_sync_view(self) -> None:
+        """Ensure the async list returns the same page as PostListView"""
+        response: Any = await self.async_client.get(self.async_posts_url)
+        sync_response: Any = await self.async_client.get(self.posts_url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.json()["results"], sync_response.json()["results"])
+        self.assertEqual(len(response.json()["results"]), 6)
+
+    async def test_list_pages_and_cache(self) -> None:
+        """Ensure the async list follows its cursor and is cached"""
+        first: Any = await self.async_client.get(self.async_posts_url + "?page_size=4")
+        second: Any = await self.async_client.get(first.json()["next"])
+        again: Any = await self.async_client.get(self.async_posts_url + "?page_size=4")
+
+        self.assertEqual(len(first.json()["results"]), 4)
+        self.assertEqual(len(second.json()["results"]), 2)
+        self.assertIsNone(second.json()["next"])
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(again["X-Cache"], "HIT")
+
+    async def test_version_is_read_off_the_loop(self) -> None:
+        """Ensure the lists read the posts version through the async cache
+        API, not the sync one"""
+        with patch.object(cache, "get_version", side_effect=AssertionError):
+            response: Any = await self.async_client.get(self.async_posts_url)
+            for_this_user: Any = await self.async_client.get(
+                self.async_for_this_user_url, headers=self._auth(self.token_key)
+            )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(for_this_user.status_code, HTTP_200_OK)
+        self.assertEqual(
+            await cache.aget_version(), await sync_to_async(cache.get_version)()
+        )
+
+    async def test_list_stream(self) -> None:
+        """Ensure the async list streams every post as NDJSON"""
+        response: Any = await self.async_client.get(self.async_posts_url + "?stream=1")
+        content: bytes = b"".join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(content.splitlines()), 6)
+
+    async def test_list_stream_compressed(self) -> None:
+        """Ensure the async stream is compressed on the loop too"""
+        response: Any = await self.async_client.get(
+            self.async_posts_url + "?stream=1", headers={"Accept-Encoding": "gzip"}
+        )
+        content: bytes = b"".join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(len(gzip.decompress(content).splitlines()), 6)
+
+    async def test_create_post(self) -> None:
+        """Ensure an authenticated user creates a post, an anonymous one cannot"""
+        response: Any = await self.async_client.post(
+            self.async_posts_url,
+            self.post_data,
+            content_type="application/json",
+            headers=self._auth(self.token_key),
+        )
+        anonymous: Any = await self.async_client.post(
+            self.async_posts_url, self.post_data, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, HTTP_201_CREATED)
+        self.assertEqual(response.json()["author"], self.user_data["username"])
+        self.assertEqual(await Post.objects.acount(), 7)
+        self.assertEqual(anonymous.status_code, HTTP_401_UNAUTHORIZED)
+
+    async def test_token_is_checked_on_the_loop(self) -> None:
+        """Ensure the token goes through aauthenticate, not the sync path"""
+        with patch.object(
+            CachedTokenAuthentication, "authenticate", side_effect=AssertionError
+        ):
+            response: Any = await self.async_client.get(
+                self.async_for_this_user_url, headers=self._auth(self.token_key)
+            )
+            invalid: Any = await self.async_client.get(
+                self.async_for_this_user_url, headers=self._auth("invalid")
+            )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(invalid.status_code, HTTP_401_UNAUTHORIZED)
+        self.assertEqual(invalid.json()["detail"], "Invalid token.")
+
+    async def test_session_is_checked_on_the_loop(self) -> None:
+        """Ensure a logged in session authenticates the async views"""
+        await self.async_client.aforce_login(
+            await User.objects.aget(email=self.user_data["email"])
+        )
+
+        response: Any = await self.async_client.get(self.async_for_this_user_url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(len(response.json()["results"]), len(self.own_ids))
+
+    async def test_posts_for_user(self) -> None:
+        """Ensure only the posts of the current user are listed"""
+        response: Any = await self.async_client.get(
+            self.async_for_this_user_url, headers=self._auth(self.token_key)
+        )
+        anonymous: Any = await self.async_client.get(self.async_for_this_user_url)
+
+        self.assertEqual(
+            [post["id"] for post in response.json()["results"]],
+            list(reversed(self.own_ids)),
+        )
+        self.assertEqual(anonymous.status_code, HTTP_401_UNAUTHORIZED)
+
+    async def test_detail(self) -> None:
+        """Ensure one post is returned, with a 304 for a current copy"""
+        response: Any = await self.async_client.get(self._detail_url(self.other_id))
+        not_modified: Any = await self.async_client.get(
+            self._detail_url(self.other_id), headers={"If-None-Match": response["ETag"]}
+        )
+        missing: Any = await self.async_client.get(self._detail_url(0))
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.json()["author"], self.user_data2["username"])
+        self.assertEqual(not_modified.status_code, HTTP_304_NOT_MODIFIED)
+        self.assertEqual(missing.status_code, HTTP_404_NOT_FOUND)
+
+    async def test_patch(self) -> None:
+        """Ensure the author patches a post and an outdated If-Match gets a 412"""
+        url: str = self._detail_url(self.own_ids[0])
+        etag: str = (await self.async_client.get(url))["ETag"]
+
+        response: Any = await self.async_client.patch(
+            url,
+            {"title": "Edited"},
+            content_type="application/json",
+            headers={**self._auth(self.token_key), "If-Match": etag},
+        )
+        outdated: Any = await self.async_client.patch(
+            url,
+            {"title": "Late"},
+            content_type="application/json",
+            headers={**self._auth(self.token_key), "If-Match": etag},
+        )
+        forbidden: Any = await self.async_client.patch(
+            url,
+            {"title": "Not mine"},
+            content_type="application/json",
+            headers=self._auth(self.token_key2),
+        )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(outdated.status_code, HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(forbidden.status_code, HTTP_403_FORBIDDEN)
+        self.assertEqual((await Post.objects.aget(pk=self.own_ids[0])).title, "Edited")
+
+    async def test_delete(self) -> None:
+        """Ensure the delete keeps telling a 403 from a 404"""
+        forbidden: Any = await self.async_client.delete(
+            self._detail_url(self.other_id), headers=self._auth(self.token_key)
+        )
+        deleted: Any = await self.async_client.delete(
+            self._detail_url(self.own_ids[0]), headers=self._auth(self.token_key)
+        )
+        missing: Any = await self.async_client.delete(
+            self._detail_url(self.own_ids[0]), headers=self._auth(self.token_key)
+        )
+
+        self.assertEqual(forbidden.status_code, HTTP_403_FORBIDDEN)
+        self.assertEqual(deleted.status_code, HTTP_200_OK)
+        self.assertEqual(missing.status_code, HTTP_404_NOT_FOUND)
+        self.assertFalse(await Post.objects.filter(pk=self.own_ids[0]).aexists())
@@ -0,0 +1,313 @@
+"""Tests for the bulk creation, update and deletion of posts"""
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.response import Response
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_207_MULTI_STATUS,
+    HTTP_400_BAD_REQUEST,
+    HTTP_401_UNAUTHORIZED,
+)
+
+from accounts.models import User
+from posts import cache
+from posts.models import Post
+from posts.tests.test_setup import TestSetUp
+from posts.views import PostBulkView
+
+
+class TestPostBulkView(TestSetUp):
+    """Tests for PostBulkView"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.bulk_url: str = reverse("posts_bulk")
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+    def _items(self, quantity: int) -> list[dict[str, str]]:
+        return [
+            {"title": f"Post {index}", "description": "Description"}
+            for index in range(quantity)
+        ]
+
+    def test_create_all(self) -> None:
+        """Ensure every post of the array is created for the current user"""
+        response: Response = self.client.post(
+            path=self.bulk_url, data=self._items(5), format="json"
+        )
+
+        self.assertEqual(response.status_code, HTTP_201_CREATED)
+        self.assertEqual(len(response.data.get("created")), 5)
+        self.assertEqual(response.data.get("errors"), [])
+        self.assertEqual(
+            Post.objects.filter(author__email=self.user_data["email"]).count(), 5
+        )
+        for post in response.data.get("created"):
+            self.assertIsNotNone(post.get("id"))
+            self.assertEqual(post.get("author"), self.user_data["username"])
+
+    def test_invalid_items_do_not_abort_the_rest(self) -> None:
+        """Ensure the invalid items are reported by index and the others created"""
+        items: list[dict[str, Any]] = self._items(4)
+        items[1] = {"title": "No description"}
+        items[3] = {"title": "x" * 1000, "description": "Too long"}
+
+        response: Response = self.client.post(
+            path=self.bulk_url, data=items, format="json"
+        )
+
+        self.assertEqual(response.status_code, HTTP_207_MULTI_STATUS)
+        self.assertEqual(
+            [post.get("title") for post in response.data.get("created")],
+            ["Post 0", "Post 2"],
+        )
+        self.assertEqual(
+            [error.get("index") for error in response.data.get("errors")], [1, 3]
+        )
+        self.assertIn("description", response.data["errors"][0]["errors"])
+        self.assertIn("title", response.data["errors"][1]["errors"])
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_no_valid_item(self) -> None:
+        """Ensure a 400 is returned when nothing could be created"""
+        response: Response = self.client.post(
+            path=self.bulk_url, data=[{"title": "No description"}], format="json"
+        )
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data.get("errors")), 1)
+        self.assertEqual(Post.objects.count(), 0)
+
+    def test_not_a_list(self) -> None:
+        """Ensure a body which is not an array is rejected"""
+        response: Response = self.client.post(
+            path=self.bulk_url, data=self.post_data, format="json"
+        )
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data)
+
+    @override_settings(POSTS_BULK_MAX_ITEMS=3)
+    def test_too_many_items(self) -> None:
+        """Ensure an array longer than POSTS_BULK_MAX_ITEMS is rejected"""
+        response: Response = self.client.post(
+            path=self.bulk_url, data=self._items(4), format="json"
+        )
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(Post.objects.count(), 0)
+
+    @override_settings(POSTS_BULK_BATCH_SIZE=4)
+    def test_batched_inserts(self) -> None:
+        """Ensure the posts are written POSTS_BULK_BATCH_SIZE rows per INSERT"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(path=self.bulk_url, data=self._items(10), format="json")
+
+        inserts: list[str] = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith('INSERT INTO "posts_post"')
+        ]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(Post.objects.count(), 10)
+
+    def test_lists_are_invalidated(self) -> None:
+        """Ensure a cached page of posts does not hide the new posts"""
+        self.client.get(path=self.posts_url)
+
+        self.client.post(path=self.bulk_url, data=self._items(2), format="json")
+        response: Response = self.client.get(path=self.posts_url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(len(response.data.get("results")), 2)
+
+    def test_anonymous_user(self) -> None:
+        """Ensure an anonymous user cannot create posts"""
+        self.client.credentials()
+
+        response: Response = self.client.post(
+            path=self.bulk_url, data=self._items(1), format="json"
+        )
+
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
+
+
+class TestPostBulkUpdateDelete(TestSetUp):
+    """Tests for the bulk PATCH and DELETE of PostBulkView"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.bulk_url: str = reverse("posts_bulk")
+        self.author: User = User.objects.get(email=self.user_data["email"])
+        self.other: User = User.objects.get(email=self.user_data2["email"])
+        self.own_ids: list[int] = self._bulk_create_posts(4, self.author)
+        self.other_ids: list[int] = self._bulk_create_posts(2, self.other)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+    def _bulk_create_posts(self, posts_quantity: int, author: User) -> list[int]:
+        posts: list[Post] = Post.objects.bulk_create(
+            Post(title=f"Post {index}", description="Description", author=author)
+            for index in range(posts_quantity)
+        )
+        return [post.pk for post in posts]
+
+    def _writes(self, queries: CaptureQueriesContext, verb: str) -> list[str]:
+        return [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith(f'{verb} "posts_post"')
+            or query["sql"].startswith(f'{verb} FROM "posts_post"')
+        ]
+
+    def test_update_by_ids(self) -> None:
+        """Ensure the selected posts are changed with a single UPDATE"""
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.patch(
+                path=self.bulk_url,
+                data={"ids": self.own_ids[:3], "changes": {"title": "Renamed"}},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data, {"updated": 3})
+        self.assertEqual(len(self._writes(queries, "UPDATE")), 1)
+        self.assertEqual(
+            list(
+                Post.objects.filter(id__in=self.own_ids)
+                .order_by("id")
+                .values_list("title", flat=True)
+            ),
+            ["Renamed", "Renamed", "Renamed", "Post 3"],
+        )
+
+    def test_update_skips_the_posts_of_other_authors(self) -> None:
+        """Ensure the ids of posts of another author are not updated"""
+        response: Response = self.client.patch(
+            path=self.bulk_url,
+            data={"ids": self.other_ids, "changes": {"title": "Renamed"}},
+            format="json",
+        )
+
+        self.assertEqual(response.data, {"updated": 0})
+        self.assertFalse(Post.objects.filter(title="Renamed").exists())
+
+    def test_update_touches_updated(self) -> None:
+        """Ensure the updated column moves although update() skips auto_now"""
+        before: Post = Post.objects.get(pk=self.own_ids[0])
+
+        self.client.patch(
+            path=self.bulk_url,
+            data={"ids": [before.pk], "changes": {"description": "New"}},
+            format="json",
+        )
+
+        self.assertGreater(Post.objects.get(pk=before.pk).updated, before.updated)
+
+    def test_update_needs_changes(self) -> None:
+        """Ensure an empty or invalid set of changes is rejected"""
+        for changes in ({}, {"title": "x" * 1000}):
+            response: Response = self.client.patch(
+                path=self.bulk_url,
+                data={"ids": self.own_ids, "changes": changes},
+                format="json",
+            )
+
+            self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+            self.assertIn("changes", response.data)
+
+    def test_selection_is_required(self) -> None:
+        """Ensure a request selecting no post is rejected"""
+        response: Response = self.client.delete(
+            path=self.bulk_url, data={}, format="json"
+        )
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(Post.objects.count(), 6)
+
+    def test_delete_by_ids(self) -> None:
+        """Ensure the selected posts of the author are removed with one DELETE"""
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.delete(
+                path=self.bulk_url,
+                data={"ids": self.own_ids[:2] + self.other_ids},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data, {"deleted": 2})
+        self.assertEqual(len(self._writes(queries, "DELETE")), 1)
+        self.assertEqual(
+            set(Post.objects.values_list("id", flat=True)),
+            set(self.own_ids[2:] + self.other_ids),
+        )
+
+    def test_delete_created_before(self) -> None:
+        """Ensure created_before selects the older posts only"""
+        old: datetime = timezone.now() - timedelta(days=30)
+        Post.objects.filter(id__in=self.own_ids[:3] + self.other_ids).update(
+            created=old
+        )
+
+        response: Response = self.client.delete(
+            path=self.bulk_url,
+            data={"created_before": (old + timedelta(days=1)).isoformat()},
+            format="json",
+        )
+
+        self.assertEqual(response.data, {"deleted": 3})
+        self.assertEqual(Post.objects.filter(author=self.other).count(), 2)
+
+    def test_delete_many_in_one_statement(self) -> None:
+        """Ensure a large selection is deleted with one DELETE and no read of
+        the posts, within the query budget of the view"""
+        self._bulk_create_posts(1000, self.author)
+
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.delete(
+                path=self.bulk_url,
+                data={
+                    "created_before": (timezone.now() + timedelta(days=1)).isoformat()
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.data, {"deleted": 1004})
+        self.assertEqual(len(self._writes(queries, "DELETE")), 1)
+        self.assertEqual(self._writes(queries, "SELECT"), [])
+        self.assertLessEqual(len(queries), PostBulkView.query_budget)
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_delete_bumps_the_version_on_commit(self) -> None:
+        """Ensure the posts version is bumped once the deletion is committed"""
+        version: int = cache.get_version()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.delete(
+                path=self.bulk_url, data={"ids": self.own_ids[:2]}, format="json"
+            )
+            self.assertEqual(cache.get_version(), version)
+        for callback in callbacks:
+            callback()
+
+        self.assertNotEqual(cache.get_version(), version)
+
+    def test_lists_are_invalidated(self) -> None:
+        """Ensure a cached page of posts does not show the deleted posts"""
+        self.client.get(path=self.posts_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(
+                path=self.bulk_url, data={"ids": self.own_ids}, format="json"
+            )
+        response: Response = self.client.get(path=self.posts_url)
+
+        self.assertEqual(len(response.data.get("results")), 2)
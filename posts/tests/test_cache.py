@@ -0,0 +1,175 @@
+"""Tests for the versioned cache of the posts list"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import gettempdir
+from typing import Any, Callable
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_403_FORBIDDEN
+
+from posts import cache
+from posts.models import Post
+from posts.pagination import KeysetPagination
+from posts.tests.test_setup import TestSetUp
+
+
+def _version_of_another_process() -> int:
+    """Return the version of the posts as another worker process reads it"""
+    script: str = (
+        "import django; django.setup(); "
+        "from posts.cache import get_version; print(get_version())"
+    )
+    output: str = subprocess.run(
+        [sys.executable, "-c", script],
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "my_project.settings"},
+        cwd=settings.BASE_DIR,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return int(output)
+
+
+class TestPostsCache(TestSetUp):
+    """Tests for the cache of PostListView"""
+
+    def test_second_read_is_a_hit(self) -> None:
+        """Ensure an unchanged page is served from the cache"""
+        self._create_posts(2)
+
+        first: Response = self.client.get(path=self.posts_url)
+        second: Response = self.client.get(path=self.posts_url)
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+
+    def test_pages_are_cached_apart(self) -> None:
+        """Ensure each page has its own entry"""
+        self._create_posts(3)
+
+        first: Response = self.client.get(path=self.posts_url + "?page_size=1")
+        second: Response = self.client.get(path=first.data.get("next"))
+
+        self.assertEqual(second["X-Cache"], "MISS")
+        self.assertNotEqual(first.data.get("results"), second.data.get("results"))
+
+    def test_writes_invalidate_the_pages(self) -> None:
+        """Ensure creating, updating and deleting a post are seen right away"""
+        self._create_posts(1)
+        self.client.get(path=self.posts_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_posts(1)
+        response: Response = self.client.get(path=self.posts_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data.get("results")), 2)
+
+        post: Post = Post.objects.first()
+        post.title = "Updated title"
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        response = self.client.get(path=self.posts_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0].get("title"), "Updated title")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        response = self.client.get(path=self.posts_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data.get("results")), 1)
+
+    def test_deletes_through_the_views_invalidate_the_pages(self) -> None:
+        """Ensure the posts deleted by the views are not served from a page"""
+        self._create_posts(2)
+        self.client.get(path=self.posts_url)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+        for url in (
+            self.post_detail_url,
+            reverse("async_post_detail", kwargs={"post_id": 2}),
+        ):
+            with self.subTest(url=url):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.client.delete(path=url)
+                response: Response = self.client.get(path=self.posts_url)
+                self.assertEqual(response["X-Cache"], "MISS")
+
+        self.assertEqual(response.data.get("results"), [])
+
+    def test_write_during_a_read(self) -> None:
+        """Ensure a page read before a write is not cached as the page after
+        it"""
+        self._create_posts(1)
+        paginate: Callable = KeysetPagination.paginate_queryset
+
+        def paginate_then_write(*args: Any, **kwargs: Any) -> Any:
+            rows: Any = paginate(*args, **kwargs)
+            with self.captureOnCommitCallbacks(execute=True):
+                self._create_posts(1)
+            return rows
+
+        with patch.object(KeysetPagination, "paginate_queryset", paginate_then_write):
+            self.client.get(path=self.posts_url)
+        response: Response = self.client.get(path=self.posts_url)
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data.get("results")), 2)
+
+    def test_bumped_on_commit(self) -> None:
+        """Ensure a write retires the pages once committed, not before"""
+        self._create_posts(1)
+        version: int = cache.get_version()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                Post.objects.update(title="Updated title")
+                Post.objects.get().save()
+            self.assertEqual(cache.get_version(), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(cache.get_version(), version)
+
+    def test_version_is_shared(self) -> None:
+        """Ensure a write seen by one worker retires the pages of the others"""
+        self._create_posts(1)
+        self.client.get(path=self.posts_url)
+
+        cache.bump_version()
+
+        self.assertEqual(_version_of_another_process(), cache.get_version())
+        response: Response = self.client.get(path=self.posts_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+
+    def test_shared_cache_of_the_run(self) -> None:
+        """Ensure the tests, and the processes they start, never use the
+        shared cache of a local server"""
+        location: Path = Path(settings.CACHES["shared"]["LOCATION"])
+
+        self.assertNotEqual(location, Path(gettempdir()) / "my_project-shared-cache")
+        self.assertEqual(os.environ["SHARED_CACHE_DIR"], str(location))
+
+    def test_stats(self) -> None:
+        """Ensure the counters are shown to the admins only"""
+        before: dict = cache.stats.snapshot()
+        self.client.get(path=self.posts_url)
+        self.client.get(path=self.posts_url)
+
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+        response: Response = self.client.get(path=reverse("posts_cache_stats"))
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_admin)
+        response = self.client.get(path=reverse("posts_cache_stats"))
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data.get("hits"), before["hits"] + 1)
+        self.assertEqual(response.data.get("misses"), before["misses"] + 1)
@@ -0,0 +1,162 @@
+"""Tests for the compression of the posts responses"""
+
+import gzip
+import unittest
+from unittest.mock import patch
+
+from django.http import StreamingHttpResponse
+from django.test import override_settings
+
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+
+from my_project import compression
+from posts.tests.test_setup import TestSetUp
+
+
+class TestCompression(TestSetUp):
+    """Tests for CompressionMiddleware on the posts lists"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._create_posts(30)
+
+    def test_gzip(self) -> None:
+        """Ensure a large page is gzipped when the client accepts it"""
+        plain: Response = self.client.get(path=self.posts_url)
+
+        response: Response = self.client.get(
+            path=self.posts_url, HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_not_accepted(self) -> None:
+        """Ensure nothing is compressed for a client refusing every encoding"""
+        for accept_encoding in ("", "identity", "gzip;q=0", "*;q=0"):
+            with self.subTest(accept_encoding=accept_encoding):
+                response: Response = self.client.get(
+                    path=self.posts_url, HTTP_ACCEPT_ENCODING=accept_encoding
+                )
+
+                self.assertFalse(response.has_header("Content-Encoding"))
+                self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_threshold(self) -> None:
+        """Ensure the responses under the threshold go out as they are"""
+        with override_settings(COMPRESSION_MIN_LENGTH=10**6):
+            response: Response = self.client.get(
+                path=self.posts_url, HTTP_ACCEPT_ENCODING="gzip"
+            )
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_stream(self) -> None:
+        """Ensure a streamed list is gzipped chunk by chunk"""
+        plain: StreamingHttpResponse = self.client.get(
+            path=self.posts_url, data={"stream": 1}
+        )
+
+        response: StreamingHttpResponse = self.client.get(
+            path=self.posts_url, data={"stream": 1}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)),
+            b"".join(plain.streaming_content),
+        )
+
+    def test_cached_page_is_compressed_once(self) -> None:
+        """Ensure a page served from the cache reuses its compressed bytes"""
+        with patch.object(
+            compression, "compress", wraps=compression.compress
+        ) as compress:
+            miss: Response = self.client.get(
+                path=self.posts_url, HTTP_ACCEPT_ENCODING="gzip"
+            )
+            hit: Response = self.client.get(
+                path=self.posts_url, HTTP_ACCEPT_ENCODING="gzip"
+            )
+
+        self.assertEqual((miss["X-Cache"], hit["X-Cache"]), ("MISS", "HIT"))
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(hit.content, miss.content)
+
+    def test_pages_of_each_user(self) -> None:
+        """Ensure a page showing its user is never reused for another one"""
+        pages: dict[str, bytes] = {}
+        for username, token in (
+            (self.user_data["username"], self.token_key),
+            (self.user_data2["username"], self.token_key2),
+        ):
+            self.client.credentials(HTTP_AUTHORIZATION="Token " + token)
+            response: Response = self.client.get(
+                path=self.posts_url,
+                HTTP_ACCEPT="text/html",
+                HTTP_ACCEPT_ENCODING="gzip",
+            )
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            pages[username] = gzip.decompress(response.content)
+
+        # The browsable API names the user in its navigation bar
+        for username, page in pages.items():
+            with self.subTest(username=username):
+                self.assertIn(f'"navbar-text">{username}<'.encode(), page)
+
+    def test_weak_etag_still_matches(self) -> None:
+        """Ensure the weakened ETag of a compressed page still gives a 304"""
+        response: Response = self.client.get(
+            path=self.posts_url, HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertTrue(response["ETag"].startswith('W/"'))
+
+        response = self.client.get(
+            path=self.posts_url,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+
+    def test_select_encoding(self) -> None:
+        """Ensure the weights of Accept-Encoding are honoured"""
+        self.assertEqual(compression.select_encoding("deflate, gzip;q=0.5"), "gzip")
+        self.assertEqual(compression.select_encoding("*"), compression.ENCODINGS[0])
+        self.assertIsNone(compression.select_encoding("deflate"))
+        self.assertIsNone(compression.select_encoding("gzip;q=oops"))
+
+    @unittest.skipUnless(compression.brotli, "brotli is not installed")
+    def test_brotli(self) -> None:
+        """Ensure brotli is preferred when the client accepts it too"""
+        plain: Response = self.client.get(path=self.posts_url)
+
+        response: Response = self.client.get(
+            path=self.posts_url, HTTP_ACCEPT_ENCODING="gzip, br"
+        )
+        stream: StreamingHttpResponse = self.client.get(
+            path=self.posts_url, data={"stream": 1}, HTTP_ACCEPT_ENCODING="br"
+        )
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(compression.brotli.decompress(response.content), plain.content)
+        self.assertEqual(stream["Content-Encoding"], "br")
+        self.assertIn(
+            b'"title"',
+            compression.brotli.decompress(b"".join(stream.streaming_content)),
+        )
+
+    @unittest.skipIf(compression.brotli, "brotli is installed")
+    def test_brotli_missing(self) -> None:
+        """Ensure gzip is used when brotli is asked but not installed"""
+        response: Response = self.client.get(
+            path=self.posts_url, HTTP_ACCEPT_ENCODING="br, gzip"
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
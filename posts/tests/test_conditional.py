@@ -0,0 +1,211 @@
+"""Tests for the conditional requests of the posts endpoints"""
+
+from typing import Any, Callable
+from unittest.mock import patch
+
+from django.utils import timezone
+from django.utils.http import http_date
+
+from rest_framework.response import Response
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_412_PRECONDITION_FAILED,
+)
+
+from accounts.models import User
+from posts.models import Post
+from posts.views import PostDetailView
+from posts.tests.test_setup import TestSetUp
+
+
+class TestConditionalGet(TestSetUp):
+    """Tests for the ETag and Last-Modified validators"""
+
+    def test_post_detail_not_modified(self) -> None:
+        """Ensure a current copy of a post is answered with a cheap 304"""
+        self._create_posts(1)
+        response: Response = self.client.get(path=self.post_detail_url)
+        etag: str = response["ETag"]
+
+        with self.assertNumQueries(1):
+            not_modified: Response = self.client.get(
+                path=self.post_detail_url, HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+        self.assertEqual(not_modified.status_code, HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified["ETag"], etag)
+        self.assertEqual(not_modified.content, b"")
+
+    def test_post_detail_modified(self) -> None:
+        """Ensure an outdated copy of a post gets the new one"""
+        self._create_posts(1)
+        etag: str = self.client.get(path=self.post_detail_url)["ETag"]
+
+        post: Post = Post.objects.get()
+        post.title = "Updated title"
+        post.save()
+        response: Response = self.client.get(
+            path=self.post_detail_url, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data.get("title"), "Updated title")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_post_detail_author_renamed(self) -> None:
+        """Ensure renaming the author outdates the copies showing the old name"""
+        self._create_posts(1)
+        etag: str = self.client.get(path=self.post_detail_url)["ETag"]
+
+        author: User = User.objects.get(email=self.user_data["email"])
+        author.username = "renamed"
+        author.save()
+        response: Response = self.client.get(
+            path=self.post_detail_url, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data.get("author"), "renamed")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_post_detail_media_types(self) -> None:
+        """Ensure each media type of a post has its own ETag"""
+        self._create_posts(1)
+
+        json: Response = self.client.get(path=self.post_detail_url)
+        html: Response = self.client.get(
+            path=self.post_detail_url, HTTP_ACCEPT="text/html"
+        )
+
+        self.assertNotEqual(json["ETag"], html["ETag"])
+        self.assertIn("Accept", json["Vary"])
+        not_modified: Response = self.client.get(
+            path=self.post_detail_url,
+            HTTP_ACCEPT="text/html",
+            HTTP_IF_NONE_MATCH=json["ETag"],
+        )
+        self.assertEqual(not_modified.status_code, HTTP_200_OK)
+
+    def test_post_detail_if_modified_since(self) -> None:
+        """Ensure If-Modified-Since is honoured"""
+        self._create_posts(1)
+        last_modified: str = self.client.get(path=self.post_detail_url)["Last-Modified"]
+
+        response: Response = self.client.get(
+            path=self.post_detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(
+            path=self.post_detail_url, HTTP_IF_MODIFIED_SINCE=http_date(0)
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+    def test_post_list_not_modified(self) -> None:
+        """Ensure the list answers 304 until a post is written"""
+        self._create_posts(2)
+        etag: str = self.client.get(path=self.posts_url)["ETag"]
+
+        with self.assertNumQueries(0):
+            response: Response = self.client.get(
+                path=self.posts_url, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_posts(1)
+        response = self.client.get(path=self.posts_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(len(response.data.get("results")), 3)
+
+    def test_posts_for_user_validators_depend_on_the_user(self) -> None:
+        """Ensure one user's ETag cannot match the posts of another one"""
+        self._create_posts(1)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+        etag: str = self.client.get(path=self.post_for_this_user_url)["ETag"]
+
+        response: Response = self.client.get(
+            path=self.post_for_this_user_url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key2)
+        response = self.client.get(
+            path=self.post_for_this_user_url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+
+class TestConditionalPatch(TestSetUp):
+    """Tests for the optimistic concurrency of PATCH on a post"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._create_posts(1)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+    def test_if_match_current(self) -> None:
+        """Ensure a PATCH over the current version is written"""
+        etag: str = self.client.get(path=self.post_detail_url)["ETag"]
+
+        response: Response = self.client.patch(
+            path=self.post_detail_url, data={"title": "Edited"}, HTTP_IF_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data.get("title"), "Edited")
+        self.assertEqual(Post.objects.get().title, "Edited")
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(
+            response["ETag"], self.client.get(path=self.post_detail_url)["ETag"]
+        )
+
+    def test_if_match_outdated(self) -> None:
+        """Ensure the second of two editors of the same version gets a 412"""
+        etag: str = self.client.get(path=self.post_detail_url)["ETag"]
+        self.client.patch(
+            path=self.post_detail_url, data={"title": "First"}, HTTP_IF_MATCH=etag
+        )
+
+        response: Response = self.client.patch(
+            path=self.post_detail_url, data={"title": "Second"}, HTTP_IF_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Post.objects.get().title, "First")
+
+    def test_write_between_check_and_update(self) -> None:
+        """Ensure a write landing after the precondition check still gets a 412"""
+        etag: str = self.client.get(path=self.post_detail_url)["ETag"]
+        get_post_for_write: Callable[..., Post] = PostDetailView.get_post_for_write
+
+        def read_then_concurrent_write(*args: Any) -> Post:
+            post: Post = get_post_for_write(*args)
+            Post.objects.filter(pk=post.pk).update(
+                title="Concurrent", updated=timezone.now()
+            )
+            return post
+
+        with patch.object(
+            PostDetailView, "get_post_for_write", read_then_concurrent_write
+        ):
+            response: Response = self.client.patch(
+                path=self.post_detail_url, data={"title": "Late"}, HTTP_IF_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Post.objects.get().title, "Concurrent")
+
+    def test_if_unmodified_since(self) -> None:
+        """Ensure If-Unmodified-Since before the last write is refused"""
+        response: Response = self.client.patch(
+            path=self.post_detail_url,
+            data={"title": "Edited"},
+            HTTP_IF_UNMODIFIED_SINCE=http_date(24 * 60 * 60),
+        )
+
+        self.assertEqual(response.status_code, HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Post.objects.get().title, self.post_data["title"])
@@ -0,0 +1,69 @@
+"""Tests ensuring the posts lists are read through the indexes"""
+
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.response import Response
+
+from accounts.models import User
+from posts.models import Post
+from posts.tests.test_setup import TestSetUp
+
+
+@skipUnless(connection.vendor == "sqlite", "The query plans are read from SQLite")
+class TestPostsIndexes(TestSetUp):
+    """Run EXPLAIN on the queries of each posts endpoint"""
+
+    def _bulk_create_posts(self, posts_quantity: int) -> None:
+        author: User = User.objects.get(email=self.user_data["email"])
+        Post.objects.bulk_create(
+            Post(title=f"Post {index}", description="Description", author=author)
+            for index in range(posts_quantity)
+        )
+
+    def _assert_uses_index(self, url: str, index_name: str) -> None:
+        # Measure the query, not the cached page
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.get(path=url)
+            if response.streaming:
+                b"".join(response.streaming_content)
+
+        posts_queries: list[str] = [
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "posts_post"' in query["sql"]
+        ]
+        self.assertTrue(posts_queries)
+        for sql in posts_queries:
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                plan: str = "\n".join(str(row[-1]) for row in cursor.fetchall())
+            self.assertIn(f"USING INDEX {index_name}", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_post_list_uses_index(self) -> None:
+        """Ensure every page of the posts list seeks into (created, id)"""
+        self._bulk_create_posts(10)
+        first: Response = self.client.get(path=self.posts_url + "?page_size=3")
+
+        self._assert_uses_index(self.posts_url, "posts_created_idx")
+        self._assert_uses_index(first.data.get("next"), "posts_created_idx")
+        self._assert_uses_index(self.posts_url + "?stream=1", "posts_created_idx")
+
+    def test_posts_for_user_uses_index(self) -> None:
+        """Ensure every page of the posts of the user seeks into
+        (author, created, id)"""
+        self._bulk_create_posts(10)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+        first: Response = self.client.get(
+            path=self.post_for_this_user_url + "?page_size=3"
+        )
+
+        self._assert_uses_index(self.post_for_this_user_url, "posts_author_created_idx")
+        self._assert_uses_index(first.data.get("next"), "posts_author_created_idx")
+        second: Response = self.client.get(path=first.data.get("next"))
+        self._assert_uses_index(second.data.get("previous"), "posts_author_created_idx")
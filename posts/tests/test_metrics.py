@@ -0,0 +1,227 @@
+"""Tests for the metrics of the posts requests"""
+
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from django.urls import URLPattern, path, reverse
+
+from rest_framework.response import Response
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_403_FORBIDDEN,
+)
+
+from my_project.metrics import exposition, registry, series, write
+from posts.tests.test_setup import TestSetUp
+
+
+def _sample(text: str, sample: str) -> float:
+    """Return the value of a sample of the text format, 0 when missing"""
+    match: re.Match | None = re.search(
+        rf"^{re.escape(sample)} (\S+)$", text, re.MULTILINE
+    )
+    return float(match.group(1)) if match else 0.0
+
+
+class TestMetrics(TestSetUp):
+    """Tests for MetricsMiddleware and MetricsView"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        directory: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: Path = Path(directory.name)
+        # The test client comes from 127.0.0.1
+        settings_override: override_settings = override_settings(
+            METRICS_DIR=self.directory, METRICS_ALLOWED_IPS=["127.0.0.1"]
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        registry.clear()
+        self.addCleanup(registry.clear)
+        self.metrics_url: str = reverse("metrics")
+
+    def _metrics(self) -> str:
+        response: Response = self.client.get(path=self.metrics_url)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        return response.content.decode()
+
+    def test_requests(self) -> None:
+        """Ensure the requests are counted and timed by view"""
+        for _ in range(3):
+            self.client.get(path=self.posts_url)
+
+        text: str = self._metrics()
+
+        self.assertEqual(
+            _sample(
+                text,
+                'api_requests_total{method="GET",status="200",view="posts_list"}',
+            ),
+            3,
+        )
+        self.assertEqual(
+            _sample(
+                text,
+                'api_request_duration_seconds_count{method="GET",view="posts_list"}',
+            ),
+            3,
+        )
+        self.assertEqual(
+            _sample(
+                text,
+                'api_request_duration_seconds_bucket{method="GET",view="posts_list",'
+                'le="+Inf"}',
+            ),
+            3,
+        )
+        self.assertEqual(
+            _sample(text, 'api_request_db_queries_count{view="posts_list"}'), 3
+        )
+        self.assertEqual(
+            _sample(text, 'api_cache_lookups_total{result="hit",view="posts_list"}'),
+            2,
+        )
+        self.assertEqual(
+            _sample(text, 'api_cache_lookups_total{result="miss",view="posts_list"}'),
+            1,
+        )
+        # The scrape being answered
+        self.assertEqual(_sample(text, "api_requests_in_flight"), 1)
+
+    def test_workers_are_added_up(self) -> None:
+        """Ensure the metrics of the other workers are added, without the
+        gauges of the exited ones"""
+        self.client.get(path=self.posts_url)
+        requests = series(
+            "api_requests_total", method="GET", status="200", view="posts_list"
+        )
+        in_flight = series("api_requests_in_flight")
+        # The parent of the tests runs, the other pid has exited
+        write(
+            self.directory / f"{os.getppid()}.json",
+            {"values": {requests: 5, in_flight: 2}, "histograms": {}},
+        )
+        write(
+            self.directory / "4194304.json",
+            {"values": {requests: 7, in_flight: 3}, "histograms": {}},
+        )
+
+        text: str = self._metrics()
+
+        self.assertEqual(
+            _sample(
+                text,
+                'api_requests_total{method="GET",status="200",view="posts_list"}',
+            ),
+            13,
+        )
+        self.assertEqual(_sample(text, "api_requests_in_flight"), 3)
+
+    def test_errors(self) -> None:
+        """Ensure the server errors are counted"""
+        with self.settings(ROOT_URLCONF="posts.tests.test_metrics"):
+            self.client.raise_request_exception = False
+            with self.assertLogs("django.request", "ERROR"):
+                self.client.get(path="/fail")
+
+        self.assertEqual(
+            _sample(
+                self._metrics(),
+                'api_request_errors_total{method="GET",view="fail"}',
+            ),
+            1,
+        )
+
+    def test_exposition(self) -> None:
+        """Ensure the histograms are written with cumulative buckets"""
+        metric = series("api_request_db_queries", view="v")
+
+        text: str = exposition(
+            {"values": {}, "histograms": {metric: [1, 2, 0, 0, 0, 0, 0, 0, 0, 1, 50]}}
+        )
+
+        self.assertIn('api_request_db_queries_bucket{view="v",le="0"} 1', text)
+        self.assertIn('api_request_db_queries_bucket{view="v",le="1"} 3', text)
+        self.assertIn('api_request_db_queries_bucket{view="v",le="+Inf"} 4', text)
+        self.assertIn('api_request_db_queries_sum{view="v"} 50', text)
+        self.assertIn("# TYPE api_request_db_queries histogram", text)
+
+    def test_scrapers_and_admins_only(self) -> None:
+        """Ensure the others are refused the metrics"""
+        response: Response = self.client.get(
+            path=self.metrics_url, REMOTE_ADDR="10.0.0.1"
+        )
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+        response = self.client.get(path=self.metrics_url, REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_admin)
+        response = self.client.get(path=self.metrics_url, REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+    @override_settings(METRICS_ALLOWED_IPS=[])
+    def test_no_scraper_by_default(self) -> None:
+        """Ensure no address is trusted unless listed, not even a local one"""
+        response: Response = self.client.get(path=self.metrics_url)
+
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
+
+    def test_content_type(self) -> None:
+        """Ensure the text format is sent with its version, whatever the
+        client accepts"""
+        for accept in ("*/*", "text/plain", "application/json"):
+            with self.subTest(accept=accept):
+                response: Response = self.client.get(
+                    path=self.metrics_url, HTTP_ACCEPT=accept
+                )
+
+                self.assertEqual(response.status_code, HTTP_200_OK)
+                self.assertEqual(
+                    response["Content-Type"],
+                    "text/plain; version=0.0.4; charset=utf-8",
+                )
+
+    @override_settings(METRICS_DIR=None)
+    def test_no_directory(self) -> None:
+        """Ensure nothing is written without METRICS_DIR, and the metrics of
+        this worker are still served"""
+        self.client.get(path=self.posts_url)
+        registry.flush()
+
+        text: str = self._metrics()
+
+        self.assertEqual(list(self.directory.iterdir()), [])
+        self.assertEqual(
+            _sample(
+                text,
+                'api_requests_total{method="GET",status="200",view="posts_list"}',
+            ),
+            1,
+        )
+
+
+class TestMetricsDirectory(SimpleTestCase):
+    """Tests for the metrics directory of the test runs"""
+
+    def test_directory_of_the_run(self) -> None:
+        """Ensure the tests, and the processes they start, never write to the
+        metrics of a local server"""
+        directory: Path = Path(settings.METRICS_DIR)
+
+        self.assertNotEqual(directory, settings.BASE_DIR / "metrics")
+        self.assertEqual(os.environ["METRICS_DIR"], str(directory))
+
+
+def _fail(_request: object) -> None:
+    raise RuntimeError("Failing on purpose")
+
+
+urlpatterns: list[URLPattern] = [path("fail", _fail, name="fail")]
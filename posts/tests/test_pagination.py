@@ -0,0 +1,116 @@
+"""Tests for the keyset pagination of the posts lists"""
+
+from typing import Any
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+
+from accounts.models import User
+from posts.models import Post
+from posts.pagination import KeysetPagination
+from posts.tests.test_setup import TestSetUp
+
+
+class TestKeysetPagination(TestSetUp):
+    """Tests for the cursor pagination of PostListView and PostsForUserView"""
+
+    def _bulk_create_posts(self, posts_quantity: int, email: str) -> list[int]:
+        author: User = User.objects.get(email=email)
+        Post.objects.bulk_create(
+            Post(title=f"Post {index}", description="Description", author=author)
+            for index in range(posts_quantity)
+        )
+        return list(
+            Post.objects.filter(author=author)
+            .order_by("-created", "-id")
+            .values_list("id", flat=True)
+        )
+
+    def _walk(self, url: str) -> list[dict[str, Any]]:
+        posts: list[dict[str, Any]] = []
+        next_url: str | None = url
+        while next_url is not None:
+            response: Response = self.client.get(path=next_url)
+            self.assertEqual(response.status_code, HTTP_200_OK)
+            posts.extend(response.data.get("results"))
+            next_url = response.data.get("next")
+        return posts
+
+    def test_walk_all_pages_newest_first(self) -> None:
+        """Ensure following the next links returns every post once, newest first"""
+        ids: list[int] = self._bulk_create_posts(10, self.user_data["email"])
+
+        posts: list[dict[str, Any]] = self._walk(self.posts_url + "?page_size=3")
+
+        self.assertEqual([post.get("id") for post in posts], ids)
+
+    def test_walk_pages_with_the_same_created(self) -> None:
+        """Ensure posts sharing the same created time are ordered by id"""
+        self._bulk_create_posts(7, self.user_data["email"])
+        Post.objects.update(created=timezone.now())
+        ids: list[int] = list(Post.objects.order_by("-id").values_list("id", flat=True))
+
+        posts: list[dict[str, Any]] = self._walk(self.posts_url + "?page_size=2")
+
+        self.assertEqual([post.get("id") for post in posts], ids)
+
+    def test_previous_page(self) -> None:
+        """Ensure the previous link returns the page before the current one"""
+        ids: list[int] = self._bulk_create_posts(6, self.user_data["email"])
+
+        first: Response = self.client.get(path=self.posts_url + "?page_size=2")
+        second: Response = self.client.get(path=first.data.get("next"))
+        previous: Response = self.client.get(path=second.data.get("previous"))
+
+        self.assertIsNone(first.data.get("previous"))
+        self.assertEqual([post.get("id") for post in second.data["results"]], ids[2:4])
+        self.assertEqual([post.get("id") for post in previous.data["results"]], ids[:2])
+        self.assertIsNone(previous.data.get("previous"))
+        self.assertEqual(previous.data.get("next"), first.data.get("next"))
+
+    def test_page_size_is_bounded(self) -> None:
+        """Ensure the client cannot ask for more than max_page_size posts"""
+        self._bulk_create_posts(
+            KeysetPagination.max_page_size + 5, self.user_data["email"]
+        )
+
+        response: Response = self.client.get(path=self.posts_url + "?page_size=100000")
+
+        self.assertEqual(
+            len(response.data.get("results")), KeysetPagination.max_page_size
+        )
+
+    def test_invalid_cursor(self) -> None:
+        """Ensure a tampered cursor is rejected"""
+        response: Response = self.client.get(path=self.posts_url + "?cursor=xd")
+
+        self.assertEqual(response.status_code, HTTP_404_NOT_FOUND)
+        self.assertEqual(str(response.data.get("detail")), "Invalid cursor")
+
+    def test_no_offset_nor_count(self) -> None:
+        """Ensure deep pages are read by key instead of OFFSET or COUNT(*)"""
+        self._bulk_create_posts(9, self.user_data["email"])
+        first: Response = self.client.get(path=self.posts_url + "?page_size=3")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(path=first.data.get("next"))
+
+        for query in queries.captured_queries:
+            self.assertNotIn("OFFSET", query["sql"].upper())
+            self.assertNotIn("COUNT(", query["sql"].upper())
+
+    def test_posts_for_user_pages(self) -> None:
+        """Ensure the posts of the current user are paginated too"""
+        ids: list[int] = self._bulk_create_posts(5, self.user_data["email"])
+        self._bulk_create_posts(4, self.user_data2["email"])
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+        posts: list[dict[str, Any]] = self._walk(
+            self.post_for_this_user_url + "?page_size=2"
+        )
+
+        self.assertEqual([post.get("id") for post in posts], ids)
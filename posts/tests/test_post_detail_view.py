@@ -1,5 +1,8 @@
 """Tests for the PostDetail View"""
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from rest_framework.response import Response
 from rest_framework.status import (
     HTTP_200_OK,
@@ -86,6 +89,54 @@ class TestPostDetail(TestSetUp):
             response.data.get("description"), updated_data.get("description")
         )
 
+    def test_partial_update_post(self) -> None:
+        """Ensure PATCH writes only the given fields"""
+        self._create_posts(1)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.patch(
+                path=self.post_detail_url, data={"description": "Patched"}
+            )
+        updates: list[str] = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data.get("title"), self.post_data.get("title"))
+        self.assertEqual(response.data.get("description"), "Patched")
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"description"', updates[0])
+        self.assertIn('"updated"', updates[0])
+        self.assertNotIn('"title"', updates[0])
+
+    def test_partial_update_without_changes(self) -> None:
+        """Ensure a PATCH repeating the current values writes nothing"""
+        self._create_posts(1)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.patch(
+                path=self.post_detail_url, data={"title": self.post_data["title"]}
+            )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        for query in queries.captured_queries:
+            self.assertFalse(query["sql"].startswith("UPDATE"))
+
+    def test_partial_update_by_other_user(self) -> None:
+        """Ensure PATCH is refused to a user who is not the author"""
+        self._create_posts(1)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key2)
+
+        response: Response = self.client.patch(
+            path=self.post_detail_url, data={"title": "Not mine"}
+        )
+
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+
     def test_update_post_by_wrong_id(self) -> None:
         """Ensure the the view send an not found if the id is wrong"""
         self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
@@ -170,7 +221,7 @@ class TestPostDetail(TestSetUp):
 
         self.assertEqual(exists_post_status_code, HTTP_404_NOT_FOUND)
         self.assertEqual(response.status_code, HTTP_200_OK)
-        self.assertEqual(len(posts.data), posts_quantity - 1)
+        self.assertEqual(len(posts.data.get("results")), posts_quantity - 1)
 
     def test_delete_post_by_wrong_id(self) -> None:
         """Test the view send an error if the post does not exit"""
@@ -232,4 +283,4 @@ class TestPostDetail(TestSetUp):
 
         self.assertEqual(exists_post_status_code, HTTP_404_NOT_FOUND)
         self.assertEqual(response.status_code, HTTP_200_OK)
-        self.assertEqual(len(posts.data), posts_quantity - 1)
+        self.assertEqual(len(posts.data.get("results")), posts_quantity - 1)
@@ -3,6 +3,7 @@
 from rest_framework.response import Response
 from rest_framework.status import HTTP_201_CREATED, HTTP_200_OK, HTTP_401_UNAUTHORIZED
 from posts.tests.test_setup import TestSetUp
+from posts.pagination import KeysetPagination
 
 
 class TestPostList(TestSetUp):
@@ -68,7 +69,7 @@ class TestPostList(TestSetUp):
 
         response: Response = self.client.get(path=self.posts_url)
         self.assertEqual(response.status_code, HTTP_200_OK)
-        self.assertEqual(len(response.data), posts_quantity)
+        self.assertEqual(len(response.data.get("results")), posts_quantity)
 
     def test_post_list_with_no_credentials(self) -> None:
         """Ensure can display all the posts that were created before even with no credentials"""
@@ -77,7 +78,7 @@ class TestPostList(TestSetUp):
 
         response: Response = self.client.get(path=self.posts_url)
         self.assertEqual(response.status_code, HTTP_200_OK)
-        self.assertEqual(len(response.data), posts_quantity)
+        self.assertEqual(len(response.data.get("results")), posts_quantity)
 
     def test_post_list_with_wrong_credentials(self) -> None:
         """Ensure cannot display all the posts due wrong token"""
@@ -95,4 +96,5 @@ class TestPostList(TestSetUp):
         response = self.client.get(path=self.posts_url)
 
         self.assertEqual(response.status_code, HTTP_200_OK)
-        self.assertEqual(len(response.data), posts_quantity)
+        self.assertEqual(len(response.data.get("results")), KeysetPagination.page_size)
+        self.assertIsNotNone(response.data.get("next"))
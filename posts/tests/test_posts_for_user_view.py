@@ -18,12 +18,12 @@ class TestPostsForUser(TestSetUp):
         respnse: Response = self.client.get(path=self.post_for_this_user_url)
 
         self.assertEqual(respnse.status_code, HTTP_200_OK)
-        self.assertEqual(len(respnse.data), posts_quantity)
+        self.assertEqual(len(respnse.data.get("results")), posts_quantity)
         map(
             lambda post: self.assertEqual(
                 post.get("author"), self.user_data.get("username")
             ),
-            respnse.data,
+            respnse.data.get("results"),
         )
 
     def test_get_posts_for_current_user_with_no_credentials(self) -> None:
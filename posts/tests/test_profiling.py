@@ -0,0 +1,113 @@
+"""Tests for the profiles of the posts requests"""
+
+import pstats
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from django.test import override_settings
+from django.urls import reverse
+
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_403_FORBIDDEN
+
+from my_project.profiling import summaries
+from posts.tests.test_setup import TestSetUp
+
+
+class TestProfiling(TestSetUp):
+    """Tests for ProfilingMiddleware and ProfilesView"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        directory: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: Path = Path(directory.name)
+        settings_override: override_settings = override_settings(
+            PROFILING_DIR=self.directory
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        summaries.clear()
+        self.addCleanup(summaries.clear)
+
+    def test_admin_header(self) -> None:
+        """Ensure an admin asking for a profile gets one written"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_admin)
+
+        response: Response = self.client.get(path=self.posts_url, HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertTrue(response["X-Profile"].startswith("posts_list-"))
+        profile: Path = self.directory / response["X-Profile"]
+        self.assertGreater(pstats.Stats(str(profile)).total_calls, 0)
+
+    def test_not_admin(self) -> None:
+        """Ensure the header alone profiles nothing for the other users"""
+        for token in (self.token_key, None):
+            with self.subTest(token=token):
+                self.client.credentials(
+                    **({"HTTP_AUTHORIZATION": "Token " + token} if token else {})
+                )
+
+                response: Response = self.client.get(
+                    path=self.posts_url, HTTP_X_PROFILE="1"
+                )
+
+                self.assertEqual(response.status_code, HTTP_200_OK)
+                self.assertFalse(response.has_header("X-Profile"))
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sample_rate(self) -> None:
+        """Ensure the requests drawn by the sample rate are profiled, without
+        telling the client"""
+        response: Response = self.client.get(path=self.posts_url)
+
+        self.assertFalse(response.has_header("X-Profile"))
+        self.assertEqual(len(list(self.directory.glob("posts_list-*.prof"))), 1)
+
+    def test_async_view(self) -> None:
+        """Ensure an async view is profiled too"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_admin)
+
+        response: Response = self.client.get(
+            path=reverse("async_posts_list"), HTTP_X_PROFILE="1"
+        )
+
+        self.assertTrue(response["X-Profile"].startswith("async_posts_list-"))
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    async def test_async_sample_rate(self) -> None:
+        """Ensure a sampled request is profiled without telling the client,
+        on the event loop too"""
+        response: Any = await self.async_client.get(path=reverse("async_posts_list"))
+
+        self.assertFalse(response.has_header("X-Profile"))
+        self.assertEqual(len(list(self.directory.glob("async_posts_list-*.prof"))), 1)
+
+    def test_summaries(self) -> None:
+        """Ensure the admins see the top call paths of the profiled views"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_admin)
+        for _ in range(2):
+            self.client.get(path=self.posts_url, HTTP_X_PROFILE="1")
+
+        response: Response = self.client.get(path=reverse("profiles"))
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data["posts_list"]["profiles"], 2)
+        top: list[dict] = response.data["posts_list"]["top"]
+        self.assertTrue(top)
+        self.assertIn(" -> ", top[0]["path"])
+        self.assertEqual(
+            [path["cumulative_ms"] for path in top],
+            sorted((path["cumulative_ms"] for path in top), reverse=True),
+        )
+
+    def test_summaries_for_admins_only(self) -> None:
+        """Ensure only the admins see the profiles"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+        response: Response = self.client.get(path=reverse("profiles"))
+
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
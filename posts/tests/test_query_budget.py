@@ -0,0 +1,113 @@
+"""Query budget tests for the posts endpoints"""
+
+from typing import Any
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_403_FORBIDDEN
+
+from accounts.authentication import token_cache
+from accounts.models import User
+from posts.models import Post
+from posts.tests.test_setup import TestSetUp
+
+
+class TestPostsQueryBudget(TestSetUp):
+    """Ensure the number of queries does not grow with the number of posts"""
+
+    def _bulk_create_posts(self, posts_quantity: int) -> None:
+        author: User = User.objects.get(email=self.user_data["email"])
+        Post.objects.bulk_create(
+            Post(title=f"Post {index}", description="Description", author=author)
+            for index in range(posts_quantity)
+        )
+
+    def _count_queries(self, url: str) -> int:
+        # Measure the queries, not the cached page nor the cached token
+        cache.clear()
+        token_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path=url)
+            if response.streaming:
+                b"".join(response.streaming_content)
+        return len(queries)
+
+    def _assert_constant_queries(self, url: str) -> None:
+        self._bulk_create_posts(1)
+        few_posts_queries: int = self._count_queries(url)
+        self._bulk_create_posts(19)
+        many_posts_queries: int = self._count_queries(url)
+        self.assertEqual(few_posts_queries, many_posts_queries)
+
+    def test_post_list_budget(self) -> None:
+        """Ensure the posts list loads the authors in the same query"""
+        self._assert_constant_queries(self.posts_url)
+        self.assertEqual(self._count_queries(self.posts_url), 1)
+
+    def test_post_list_stream_budget(self) -> None:
+        """Ensure the streamed posts list loads the authors in the same query"""
+        self._assert_constant_queries(self.posts_url + "?stream=1")
+
+    def test_posts_for_user_budget(self) -> None:
+        """Ensure the posts of the user load the author in the same query"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+        self._assert_constant_queries(self.post_for_this_user_url)
+
+    def test_post_detail_budget(self) -> None:
+        """Ensure one post is read along with its author"""
+        self._bulk_create_posts(1)
+        post_id: int = Post.objects.get().pk
+        url: str = reverse("post_detail", kwargs={"post_id": post_id})
+
+        self.assertEqual(self._count_queries(url), 1)
+
+    def _count_write_queries(self, method: str, url: str, **kwargs: Any) -> int:
+        # The token is cached by a first request, as on a warm worker
+        self.client.get(path=url)
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = getattr(self.client, method)(path=url, **kwargs)
+        self.last_response: Response = response
+        return len(queries)
+
+    def _own_post_url(self) -> str:
+        self._bulk_create_posts(1)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+        return reverse("post_detail", kwargs={"post_id": Post.objects.get().pk})
+
+    def test_put_budget(self) -> None:
+        """Ensure an update reads the post and writes it, without its author"""
+        url: str = self._own_post_url()
+
+        queries: int = self._count_write_queries("put", url, data=self.post_data)
+
+        self.assertEqual(self.last_response.status_code, HTTP_200_OK)
+        self.assertEqual(
+            self.last_response.data.get("author"), self.user_data["username"]
+        )
+        self.assertEqual(queries, 2)
+
+    def test_delete_budget(self) -> None:
+        """Ensure a delete by the author reads the post once to send
+        post_delete, then deletes it"""
+        url: str = self._own_post_url()
+
+        queries: int = self._count_write_queries("delete", url)
+
+        self.assertEqual(self.last_response.status_code, HTTP_200_OK)
+        self.assertEqual(queries, 2)
+        self.assertFalse(Post.objects.exists())
+
+    def test_refused_delete_budget(self) -> None:
+        """Ensure a refused delete still tells a 403 from a 404 in two queries"""
+        url: str = self._own_post_url()
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key2)
+
+        queries: int = self._count_write_queries("delete", url)
+
+        self.assertEqual(self.last_response.status_code, HTTP_403_FORBIDDEN)
+        self.assertEqual(queries, 2)
+        self.assertTrue(Post.objects.exists())
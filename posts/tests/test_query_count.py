@@ -0,0 +1,108 @@
+"""Tests for the query counts reported by QueryCountMiddleware"""
+
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK
+
+from accounts.authentication import token_cache
+from posts.views import PostListView
+from posts.tests.test_setup import TestSetUp
+from my_project.queries import QueryLog
+
+
+@override_settings(QUERY_HEADERS=True)
+class TestQueryCount(TestSetUp):
+    """Tests for the query headers and the query budgets of the views"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._create_posts(3)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+    def test_headers(self) -> None:
+        """Ensure the headers report the queries the request ran"""
+        token_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.get(path=self.posts_url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(int(response["X-DB-Queries"]), len(queries))
+        self.assertEqual(response["X-DB-Duplicates"], "0")
+        self.assertTrue(response["X-DB-Time"].endswith("ms"))
+
+    @override_settings(QUERY_HEADERS=False)
+    def test_headers_off(self) -> None:
+        """Ensure nothing is reported when QUERY_HEADERS is off"""
+        response: Response = self.client.get(path=self.posts_url)
+
+        self.assertFalse(response.has_header("X-DB-Queries"))
+
+    def test_async_view(self) -> None:
+        """Ensure the queries run in a thread by an async view are counted"""
+        url: str = reverse("async_post_detail", kwargs={"post_id": 1})
+
+        response: Response = self.client.patch(path=url, data={"title": "Changed"})
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        # The post read, then its UPDATE
+        self.assertEqual(response["X-DB-Queries"], "2")
+
+    def test_over_budget(self) -> None:
+        """Ensure a view going over its budget is logged with its repeats"""
+        token_cache.clear()
+        with (
+            patch.object(PostListView, "query_budget", 0),
+            self.assertLogs("my_project.queries", "WARNING") as logs,
+        ):
+            response: Response = self.client.get(path=self.posts_url)
+
+        self.assertIn("(PostListView)", logs.output[0])
+        self.assertIn(
+            f"over query budget ({response['X-DB-Queries']} > 0)", logs.output[0]
+        )
+        self.assertNotIn("time budget", logs.output[0])
+
+    @override_settings(QUERY_TIME_BUDGET=0)
+    def test_over_time_budget(self) -> None:
+        """Ensure a view slower than the time budget is logged with its time"""
+        with self.assertLogs("my_project.queries", "WARNING") as logs:
+            response: Response = self.client.get(path=self.posts_url)
+
+        self.assertIn(
+            f"over time budget ({response['X-DB-Time']} > 0ms)", logs.output[0]
+        )
+        self.assertNotIn("query budget", logs.output[0])
+
+    def test_within_budget(self) -> None:
+        """Ensure the views stay within their budgets"""
+        token_cache.clear()
+        with self.assertNoLogs("my_project.queries", "WARNING"):
+            self.client.get(path=self.posts_url)
+            self.client.get(path=self.post_for_this_user_url)
+            self.client.get(path=self.post_detail_url)
+            self.client.put(path=self.post_detail_url, data=self.post_data)
+            self.client.get(path=reverse("posts_search"), data={"q": "test"})
+            self.client.get(path=reverse("userinfo"))
+
+    def test_duplicates(self) -> None:
+        """Ensure the same SQL run again is counted, whatever its IN list"""
+        log: QueryLog = QueryLog()
+        for _ in range(3):
+            log.add('SELECT * FROM "posts_post" WHERE "id" = %s', 0.001)
+        log.add('SELECT * FROM "accounts_user" WHERE "id" IN (%s, %s)', 0.001)
+        log.add('SELECT * FROM "accounts_user" WHERE "id" IN (%s)', 0.001)
+
+        self.assertEqual(log.count, 5)
+        self.assertEqual(
+            log.duplicates,
+            {
+                'SELECT * FROM "posts_post" WHERE "id" = %s': 3,
+                'SELECT * FROM "accounts_user" WHERE "id" IN (...)': 2,
+            },
+        )
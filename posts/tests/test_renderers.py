@@ -0,0 +1,135 @@
+"""Tests for the renderers and parsers of the API on the posts endpoints"""
+
+import io
+import json
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+from unittest.mock import patch
+
+from django.conf import settings
+
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.status import (
+    HTTP_201_CREATED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_406_NOT_ACCEPTABLE,
+)
+
+from my_project import parsers, renderers
+from posts.tests.test_setup import TestSetUp
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class TestORJSON(TestSetUp):
+    """Tests that ORJSONRenderer and ORJSONParser behave like the DRF ones"""
+
+    data: dict[str, Any] = {
+        "results": [
+            {"title": "Ünïcødé ✓   line separator", "likes": 3, "ratio": 0.5},
+            {"title": 'Quotes " and \\ slashes', "tags": [], "author": None},
+        ],
+        "created": datetime(2024, 1, 2, 3, 4, 5, 600, tzinfo=timezone.utc),
+        "price": Decimal("1.10"),
+        "detail": ErrorDetail("Not found.", code="not_found"),
+    }
+
+    def _assert_renders_like_json_renderer(self, accepted: str | None = None) -> None:
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(self.data, accepted),
+            JSONRenderer().render(self.data, accepted),
+        )
+
+    def test_same_bytes_as_json_renderer(self) -> None:
+        """Ensure the output is the one of JSONRenderer, with orjson or not"""
+        self._assert_renders_like_json_renderer()
+        with patch.object(renderers, "orjson", None):
+            self._assert_renders_like_json_renderer()
+
+    def test_fallbacks(self) -> None:
+        """Ensure what orjson does not render is left to JSONRenderer"""
+        self._assert_renders_like_json_renderer("application/json; indent=4")
+        self.assertEqual(
+            renderers.ORJSONRenderer().render({"big": 2**70}),
+            JSONRenderer().render({"big": 2**70}),
+        )
+
+    def test_post_list_page(self) -> None:
+        """Ensure a page of posts renders like JSONRenderer renders it"""
+        self._create_posts(3)
+
+        response: Response = self.client.get(path=self.posts_url)
+
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_parse(self) -> None:
+        """Ensure a body parses like JSONParser parses it, with orjson or not"""
+        body: bytes = json.dumps(self.data["results"]).encode()
+        for orjson in (parsers.orjson, None):
+            with patch.object(parsers, "orjson", orjson):
+                self.assertEqual(
+                    parsers.ORJSONParser().parse(io.BytesIO(body)),
+                    self.data["results"],
+                )
+                with self.assertRaisesMessage(ParseError, "JSON parse error"):
+                    parsers.ORJSONParser().parse(io.BytesIO(b'{"title": '))
+
+    def test_invalid_body_is_rejected(self) -> None:
+        """Ensure an invalid JSON body is a 400"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+        response: Response = self.client.post(
+            path=self.posts_url, data="{not json", content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn("JSON parse error", response.data.get("detail"))
+
+
+class TestMessagePack(TestSetUp):
+    """Tests for the MessagePack media type"""
+
+    accept: str = "application/msgpack"
+
+    @unittest.skipUnless(settings.MSGPACK_INSTALLED, "msgpack is not installed")
+    def test_render(self) -> None:
+        """Ensure Accept: application/msgpack returns the page as MessagePack"""
+        self._create_posts(3)
+        page: dict[str, Any] = self.client.get(path=self.posts_url).json()
+
+        response: Response = self.client.get(
+            path=self.posts_url, HTTP_ACCEPT=self.accept
+        )
+
+        self.assertEqual(response["Content-Type"], self.accept)
+        self.assertEqual(msgpack.unpackb(response.content), page)
+
+    @unittest.skipUnless(settings.MSGPACK_INSTALLED, "msgpack is not installed")
+    def test_parse(self) -> None:
+        """Ensure a MessagePack body creates a post"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+        response: Response = self.client.post(
+            path=self.posts_url,
+            data=msgpack.packb(self.post_data),
+            content_type=self.accept,
+        )
+
+        self.assertEqual(response.status_code, HTTP_201_CREATED)
+        self.assertEqual(response.data.get("title"), self.post_data["title"])
+
+    @unittest.skipIf(settings.MSGPACK_INSTALLED, "msgpack is installed")
+    def test_not_offered_without_msgpack(self) -> None:
+        """Ensure MessagePack is not acceptable when msgpack is missing"""
+        response: Response = self.client.get(
+            path=self.posts_url, HTTP_ACCEPT=self.accept
+        )
+
+        self.assertEqual(response.status_code, HTTP_406_NOT_ACCEPTABLE)
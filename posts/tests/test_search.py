@@ -0,0 +1,118 @@
+"""Tests for the full-text search of the posts"""
+
+import unittest
+from io import StringIO
+from typing import Any
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+
+from accounts.models import User
+from posts.models import Post
+from posts.search import FTS_TABLE, match_expression
+from posts.tests.test_setup import TestSetUp
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "The index is an SQLite FTS5 table")
+class TestPostSearch(TestSetUp):
+    """Tests for PostSearchView and the index behind it"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.search_url: str = reverse("posts_search")
+        self.author: User = User.objects.get(email=self.user_data["email"])
+
+    def _create(self, title: str, description: str) -> Post:
+        return Post.objects.create(
+            title=title, description=description, author=self.author
+        )
+
+    def _search(self, query: str) -> list[str]:
+        response: Response = self.client.get(path=self.search_url, data={"q": query})
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        return [post.get("title") for post in response.data.get("results")]
+
+    def test_match_every_word(self) -> None:
+        """Ensure only the posts holding every word are returned"""
+        self._create("Django tips", "Speed up the ORM")
+        self._create("Django news", "A new release")
+        self._create("Flask tips", "Speed up the routes")
+
+        self.assertEqual(self._search("tips speed django"), ["Django tips"])
+        self.assertEqual(sorted(self._search("SPEED")), ["Django tips", "Flask tips"])
+
+    def test_title_ranks_first(self) -> None:
+        """Ensure a match in the title ranks above a match in the description"""
+        self._create("About cooking", "Python is mentioned here")
+        self._create("Python", "About something else")
+
+        self.assertEqual(self._search("python"), ["Python", "About cooking"])
+
+    def test_operators_are_searched_as_text(self) -> None:
+        """Ensure FTS5 syntax typed by the user does not break the query"""
+        self._create("Cats AND dogs", "Pets")
+
+        self.assertEqual(self._search('cats AND "dogs (NEAR'), [])
+        self.assertEqual(self._search("cats, dogs!"), ["Cats AND dogs"])
+        self.assertEqual(match_expression('a "b" c*'), '"a" "b" "c"')
+
+    def test_no_words(self) -> None:
+        """Ensure a query without any word is rejected"""
+        for query in ("", "  !!! "):
+            response: Response = self.client.get(
+                path=self.search_url, data={"q": query}
+            )
+
+            self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+
+    def test_walk_all_pages(self) -> None:
+        """Ensure the next links return every match once, best first"""
+        for index in range(7):
+            self._create(f"Post {index}", "needle " * (index + 1))
+        posts: list[dict[str, Any]] = []
+        next_url: str | None = f"{self.search_url}?q=needle&page_size=3"
+
+        while next_url is not None:
+            response: Response = self.client.get(path=next_url)
+            posts.extend(response.data.get("results"))
+            next_url = response.data.get("next")
+
+        self.assertEqual(
+            [post.get("title") for post in posts],
+            [f"Post {index}" for index in reversed(range(7))],
+        )
+
+    def test_index_follows_the_writes(self) -> None:
+        """Ensure the triggers index updates and drop deleted posts, bulk or not"""
+        post: Post = self._create("Old title", "Description")
+        bulk: list[Post] = Post.objects.bulk_create(
+            Post(title="Bulk", description="Description", author=self.author)
+            for _ in range(2)
+        )
+
+        post.title = "New title"
+        post.save(update_fields=["title"])
+        Post.objects.filter(pk=bulk[0].pk).update(description="Updated in bulk")
+        Post.objects.filter(pk=bulk[1].pk)._raw_delete(connection.alias)
+
+        self.assertEqual(self._search("old"), [])
+        self.assertEqual(self._search("new title"), ["New title"])
+        self.assertEqual(self._search("updated bulk"), ["Bulk"])
+        self.assertEqual(len(self._search("bulk")), 1)
+
+    def test_rebuild_command(self) -> None:
+        """Ensure the command fills an emptied index again"""
+        self._create("Indexed", "Description")
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('delete-all')")
+        self.assertEqual(self._search("indexed"), [])
+
+        output: StringIO = StringIO()
+        call_command("rebuild_search_index", stdout=output)
+
+        self.assertEqual(self._search("indexed"), ["Indexed"])
+        self.assertIn("Indexed 1 posts", output.getvalue())
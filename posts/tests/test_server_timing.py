@@ -0,0 +1,93 @@
+"""Tests for the Server-Timing breakdown of the requests"""
+
+import time
+from typing import Any
+
+from django.test import override_settings
+from django.urls import reverse
+
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK
+
+from accounts.authentication import token_cache
+from my_project.queries import QueryLog
+from my_project.server_timing import Phase, Timings, request_timed
+from posts.views import PostListView
+from posts.tests.test_setup import TestSetUp
+
+
+def _phases(response: Response) -> dict[str, str]:
+    metrics: list[str] = response["Server-Timing"].split(", ")
+    return dict(metric.split(";", 1) for metric in metrics)
+
+
+@override_settings(SERVER_TIMING=True)
+class TestServerTiming(TestSetUp):
+    """Tests for ServerTimingMiddleware and the phases it reports"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._create_posts(3)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+    def test_phases(self) -> None:
+        """Ensure every phase of a page of posts is reported"""
+        token_cache.clear()
+
+        response: Response = self.client.get(path=self.posts_url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        phases: dict[str, str] = _phases(response)
+        self.assertEqual(
+            set(phases),
+            {"auth", "permissions", "db", "serialization", "render", "total"},
+        )
+        self.assertIn('desc="2 queries"', phases["db"])
+
+    def test_async_view(self) -> None:
+        """Ensure the phases of an async view are reported too"""
+        url: str = reverse("async_post_detail", kwargs={"post_id": 1})
+
+        response: Response = self.client.get(path=url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertLessEqual(
+            {"auth", "permissions", "db", "serialization", "render", "total"},
+            set(_phases(response)),
+        )
+
+    @override_settings(SERVER_TIMING=False)
+    def test_off(self) -> None:
+        """Ensure nothing is timed when SERVER_TIMING is off"""
+        response: Response = self.client.get(path=self.posts_url)
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    def test_signal(self) -> None:
+        """Ensure request_timed sends the phases along with the view"""
+        received: list[dict[str, Any]] = []
+
+        def receiver(**kwargs: Any) -> None:
+            received.append(kwargs)
+
+        request_timed.connect(receiver)
+        try:
+            self.client.get(path=self.posts_url)
+        finally:
+            request_timed.disconnect(receiver)
+
+        self.assertEqual(len(received), 1)
+        self.assertIs(received[0]["sender"], PostListView)
+        self.assertGreater(received[0]["timings"]["total"], 0)
+
+    def test_queries_not_in_phase(self) -> None:
+        """Ensure the time of the queries of a phase is counted in db only"""
+        log: QueryLog = QueryLog()
+        timings: Timings = Timings(log)
+
+        with Phase(timings, "serialization"):
+            time.sleep(0.05)
+            log.add("SELECT 1", 0.05)
+
+        self.assertLess(abs(timings.phases["serialization"]), 0.02)
+        self.assertEqual(timings.finish()["db"], 0.05)
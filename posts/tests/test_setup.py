@@ -2,6 +2,7 @@
 
 from typing import override, Any
 from rest_framework.test import APITestCase
+from django.core.cache import cache
 from django.urls import reverse
 
 
@@ -10,6 +11,8 @@ class TestSetUp(APITestCase):
 
     @override
     def setUp(self) -> None:
+        # The cached pages must not outlive the rows of the previous test
+        cache.clear()
         self.posts_url: str = reverse("posts_list")
         self.post_detail_url: str = reverse("post_detail", kwargs={"post_id": 1})
         self.post_for_this_user_url: str = reverse("posts_for_this_user")
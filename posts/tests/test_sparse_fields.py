@@ -0,0 +1,109 @@
+"""Tests for the ?fields= sparse fieldsets of the posts"""
+
+from typing import Any
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+
+from posts.models import Post
+from posts.tests.test_setup import TestSetUp
+
+
+class TestSparseFields(TestSetUp):
+    """Tests for the fields parameter of the posts views"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._create_posts(3)
+        self.post: Post = Post.objects.latest("id")
+
+    def _select_of_posts(self, queries: CaptureQueriesContext) -> str:
+        """Return the SELECT which read the posts"""
+        return next(
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "posts_post"' in query["sql"]
+        )
+
+    def test_list_only_reads_the_fields_asked(self) -> None:
+        """Ensure the page and the SELECT behind it hold only the fields asked"""
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.get(
+                path=self.posts_url, data={"fields": "id,title"}
+            )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        posts: list[dict[str, Any]] = response.data.get("results")
+        self.assertEqual(len(posts), 3)
+        self.assertTrue(all(set(post) == {"id", "title"} for post in posts))
+        select: str = self._select_of_posts(queries)
+        self.assertNotIn("description", select)
+        self.assertNotIn("accounts_user", select)
+
+    def test_author_joins_only_its_username(self) -> None:
+        """Ensure the author is read with the join, and only its username"""
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.get(
+                path=self.posts_url, data={"fields": "author"}
+            )
+
+        self.assertEqual(
+            response.data.get("results")[0], {"author": self.user_data["username"]}
+        )
+        select: str = self._select_of_posts(queries)
+        self.assertIn('"accounts_user"."username"', select)
+        self.assertNotIn('"accounts_user"."email"', select)
+        self.assertEqual(len(queries), 1)
+
+    def test_pages_follow_with_sparse_fields(self) -> None:
+        """Ensure the next links keep working when the keys are not asked for"""
+        titles: list[str] = []
+        next_url: str | None = f"{self.posts_url}?fields=title&page_size=2"
+
+        while next_url is not None:
+            response: Response = self.client.get(path=next_url)
+            titles.extend(post["title"] for post in response.data.get("results"))
+            next_url = response.data.get("next")
+
+        self.assertEqual(titles, [self.post_data["title"]] * 3)
+
+    def test_detail(self) -> None:
+        """Ensure a single post honours the fields and keeps its validators"""
+        url: str = reverse("post_detail", kwargs={"post_id": self.post.pk})
+
+        response: Response = self.client.get(path=url, data={"fields": "title"})
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data, {"title": self.post_data["title"]})
+        self.assertIn("ETag", response)
+
+    def test_posts_for_this_user(self) -> None:
+        """Ensure the posts of the user honour the fields"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+
+        response: Response = self.client.get(
+            path=self.post_for_this_user_url, data={"fields": "id"}
+        )
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(
+            response.data.get("results"),
+            [
+                {"id": pk}
+                for pk in Post.objects.order_by("-id").values_list("id", flat=True)
+            ],
+        )
+
+    def test_unknown_fields(self) -> None:
+        """Ensure a field the posts do not have, or none at all, is rejected"""
+        for fields in ("title,color", "", " , "):
+            response: Response = self.client.get(
+                path=self.posts_url, data={"fields": fields}
+            )
+
+            self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+            self.assertIn("fields", response.data)
@@ -0,0 +1,72 @@
+"""Tests for the streaming mode of the posts lists"""
+
+import json
+from typing import Any
+
+from django.http import StreamingHttpResponse
+
+from rest_framework.status import HTTP_200_OK
+
+from accounts.models import User
+from posts.models import Post
+from posts.tests.test_setup import TestSetUp
+
+
+class TestPostsStreaming(TestSetUp):
+    """Tests for the NDJSON streaming of PostListView and PostsForUserView"""
+
+    def _bulk_create_posts(self, posts_quantity: int, email: str) -> None:
+        author: User = User.objects.get(email=email)
+        Post.objects.bulk_create(
+            Post(title=f"Post {index}", description="Description", author=author)
+            for index in range(posts_quantity)
+        )
+
+    def _read_lines(self, response: StreamingHttpResponse) -> list[dict[str, Any]]:
+        content: bytes = b"".join(response.streaming_content)
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_stream_with_query_param(self) -> None:
+        """Ensure ?stream=1 returns every post, one JSON document per line"""
+        self._bulk_create_posts(45, self.user_data["email"])
+
+        response: StreamingHttpResponse = self.client.get(
+            path=self.posts_url + "?stream=1"
+        )
+        posts: list[dict[str, Any]] = self._read_lines(response)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(posts), 45)
+        self.assertEqual(
+            [post.get("id") for post in posts],
+            list(Post.objects.order_by("-created", "-id").values_list("id", flat=True)),
+        )
+        self.assertEqual(posts[0].get("author"), self.user_data.get("username"))
+
+    def test_stream_with_accept_header(self) -> None:
+        """Ensure an Accept: application/x-ndjson header turns the streaming on"""
+        self._bulk_create_posts(3, self.user_data["email"])
+
+        response: StreamingHttpResponse = self.client.get(
+            path=self.posts_url, HTTP_ACCEPT="application/x-ndjson"
+        )
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(self._read_lines(response)), 3)
+
+    def test_stream_posts_for_user(self) -> None:
+        """Ensure only the posts of the current user are streamed"""
+        self._bulk_create_posts(4, self.user_data["email"])
+        self._bulk_create_posts(2, self.user_data2["email"])
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key2)
+
+        response: StreamingHttpResponse = self.client.get(
+            path=self.post_for_this_user_url + "?stream=1"
+        )
+        posts: list[dict[str, Any]] = self._read_lines(response)
+
+        self.assertEqual(len(posts), 2)
+        for post in posts:
+            self.assertEqual(post.get("author"), self.user_data2.get("username"))
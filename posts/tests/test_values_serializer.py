@@ -0,0 +1,89 @@
+"""Tests for the parity of PostValuesSerializer with PostSerializer"""
+
+from datetime import datetime, timezone
+
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from accounts.models import User
+from posts.models import Post
+from posts.serializer import PostSerializer, PostValuesSerializer
+from posts.tests.test_setup import TestSetUp
+
+
+class TestPostValuesSerializer(TestSetUp):
+    """Tests that the fast path renders the same bytes as PostSerializer"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        authors: list[User] = list(User.objects.all())
+        titles: list[str] = ["Plain", "Ünïcødé ✓", 'Quotes " and \\ slashes', ""]
+        Post.objects.bulk_create(
+            Post(
+                title=title,
+                description=f"Description {index}\nwith a new line",
+                author=authors[index % len(authors)],
+            )
+            for index, title in enumerate(titles * 3)
+        )
+        # A datetime without microseconds has a shorter isoformat
+        Post.objects.filter(pk=Post.objects.latest("id").pk).update(
+            created=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        )
+        self.renderer: JSONRenderer = JSONRenderer()
+
+    def _assert_same_bytes(self, fields: list[str] | None) -> None:
+        posts: list[Post] = list(Post.objects.select_related("author"))
+        fast: PostValuesSerializer = PostValuesSerializer(fields=fields)
+        rows: list[tuple] = list(fast.rows(Post.objects.all()))
+
+        self.assertEqual(
+            self.renderer.render(fast.data(rows)),
+            self.renderer.render(
+                PostSerializer(instance=posts, many=True, fields=fields).data
+            ),
+        )
+
+    def test_same_bytes(self) -> None:
+        """Ensure every post renders to the same bytes"""
+        self._assert_same_bytes(None)
+
+    def test_same_bytes_with_sparse_fields(self) -> None:
+        """Ensure the fields and their order follow the fields asked"""
+        for fields in (["id"], ["title", "author"], ["updated", "created", "id"]):
+            with self.subTest(fields=fields):
+                self._assert_same_bytes(fields)
+
+    def test_list_views_render_like_the_serializer(self) -> None:
+        """Ensure the pages of the list views hold the output of PostSerializer"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token_key)
+        author: User = User.objects.get(email=self.user_data["email"])
+        for url, posts in (
+            (self.posts_url, Post.objects.all()),
+            (self.post_for_this_user_url, Post.objects.filter(author=author)),
+        ):
+            with self.subTest(url=url):
+                response: Response = self.client.get(path=url, data={"page_size": 100})
+
+                self.assertEqual(
+                    self.renderer.render(response.data.get("results")),
+                    self.renderer.render(
+                        PostSerializer(
+                            instance=posts.select_related("author"), many=True
+                        ).data
+                    ),
+                )
+
+    def test_stream_renders_like_the_serializer(self) -> None:
+        """Ensure each streamed line is the output of PostSerializer"""
+        response = self.client.get(path=reverse("posts_list"), data={"stream": 1})
+
+        self.assertEqual(
+            b"".join(response.streaming_content).splitlines(),
+            [
+                self.renderer.render(PostSerializer(instance=post).data)
+                for post in Post.objects.select_related("author")
+            ],
+        )
@@ -1,10 +1,32 @@
 """Urls of the posts app"""
 
 from django.urls import URLPattern, path
-from posts.views import PostListView, PostDetailView, PostsForUserView
+from posts.views import (
+    PostListView,
+    PostBulkView,
+    PostDetailView,
+    PostsForUserView,
+    PostsCacheStatsView,
+    PostSearchView,
+    AsyncPostListView,
+    AsyncPostDetailView,
+    AsyncPostsForUserView,
+)
 
 urlpatterns: list[URLPattern] = [
     path("", PostListView.as_view(), name="posts_list"),
+    path("bulk/", PostBulkView.as_view(), name="posts_bulk"),
     path("<int:post_id>", PostDetailView.as_view(), name="post_detail"),
     path("for_this_user/", PostsForUserView.as_view(), name="posts_for_this_user"),
+    path("search/", PostSearchView.as_view(), name="posts_search"),
+    path("cache_stats/", PostsCacheStatsView.as_view(), name="posts_cache_stats"),
+    path("async/", AsyncPostListView.as_view(), name="async_posts_list"),
+    path(
+        "async/<int:post_id>", AsyncPostDetailView.as_view(), name="async_post_detail"
+    ),
+    path(
+        "async/for_this_user/",
+        AsyncPostsForUserView.as_view(),
+        name="async_posts_for_this_user",
+    ),
 ]
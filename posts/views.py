@@ -1,38 +1,114 @@
 """File to manage of the logic and functionalities of the posts app"""
 
-from typing import Iterable, Any, override
+from datetime import datetime
+from math import ceil
+from typing import Iterable, Any, NoReturn, override
 
-from django.shortcuts import get_object_or_404
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, AnonymousUser
 from django.db.models import QuerySet
+from django.http import HttpResponseBase
 
 from rest_framework.views import APIView
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework.request import Request
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import (
     IsAuthenticated,
     IsAdminUser,
     IsAuthenticatedOrReadOnly,
 )
-from rest_framework.serializers import BaseSerializer
+from rest_framework.settings import api_settings
 
-from posts.serializer import PostSerializer
+from posts.serializer import (
+    BulkPostSerializer,
+    PostSelectionSerializer,
+    PostSerializer,
+    PostValuesSerializer,
+)
 from posts.models import Post
 from posts.permissions import IsAuthorOrReadOnly
+from posts.pagination import KeysetPagination
+from posts.renderers import NDJSONRenderer
+from posts.search import SearchPagination, match_expression
+from posts.streaming import astream_posts, stream_posts, wants_stream
+from posts import cache, conditional
+from my_project.async_api import AsyncAPIView
+from my_project.server_timing import ServerTimingMixin
+from my_project.sparse_fields import requested_fields
 
 
-class PostListView(APIView):
+class PostListView(ServerTimingMixin, APIView):
     """View to manage get the post and create a new ones"""
 
     permission_classes = [IsAuthenticatedOrReadOnly]
+    query_budget: int = 3
+    pagination_class = KeysetPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+    stream_chunk_size: int = 500
 
-    def get(self, _request: Request) -> Response:
-        """Return all the posts"""
-        posts: Iterable = Post.objects.all()
-        serializer: PostSerializer = PostSerializer(instance=posts, many=True)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+    def get(self, request: Request) -> HttpResponseBase:
+        """Return one page of posts, newest first, or all of them when streaming"""
+        fields: list[str] | None = requested_fields(request, PostSerializer)
+        if wants_stream(request):
+            return stream_posts(Post.objects.all(), self.stream_chunk_size, fields)
+
+        # Read once, before the posts, so a write meanwhile retires the page
+        version: int = cache.get_version()
+        etag, last_modified = conditional.list_validators(request, version)
+        cached: HttpResponseBase | None = self.cached_response(
+            request, version, etag, last_modified
+        )
+        if cached is not None:
+            return cached
+
+        paginator: KeysetPagination = self.pagination_class()
+        serializer: PostValuesSerializer = PostValuesSerializer(fields=fields)
+        rows: Iterable = paginator.paginate_queryset(
+            serializer.rows(Post.objects.all()), request, view=self
+        )
+        return self.page_response(
+            request, version, paginator, serializer.data(rows), etag, last_modified
+        )
+
+    def cached_response(
+        self, request: Request, version: int, etag: str, last_modified: int
+    ) -> HttpResponseBase | None:
+        """Return a 304 when the copy of the client is current, or the
+        cached page when there is one"""
+        not_modified: HttpResponseBase | None = conditional.evaluate(
+            request, etag, last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        data: dict[str, Any] | None = cache.get_page(cache.page_key(request, version))
+        if data is None:
+            return None
+        response: Response = Response(data=data, headers={"X-Cache": "HIT"})
+        return conditional.set_validators(response, etag, last_modified)
+
+    def page_response(
+        self,
+        request: Request,
+        version: int,
+        paginator: KeysetPagination,
+        posts: list[dict[str, Any]],
+        etag: str,
+        last_modified: int,
+    ) -> Response:
+        """Return one page of serialized posts and cache it under the version
+        read before them"""
+        response: Response = paginator.get_paginated_response(posts)
+        cache.set_page(cache.page_key(request, version), response.data)
+        response["X-Cache"] = "MISS"
+        return conditional.set_validators(response, etag, last_modified)
 
     def post(self, request: Request) -> Response:
         """create a new post"""
@@ -46,55 +122,485 @@ class PostListView(APIView):
         return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class PostDetailView(APIView):
+def delete_rows(posts: QuerySet) -> int:
+    """Delete the posts of a queryset with a single DELETE and count them
+
+    QuerySet.delete reads every row to send post_delete and deletes them by
+    primary key in batches. No model references a post and the search index
+    is kept by the triggers of the table, so nothing needs the rows or the
+    signals: the caller invalidates what it has to
+    """
+    return posts._raw_delete(posts.db)
+
+
+class PostBulkView(ServerTimingMixin, APIView):
+    """View to create, update or delete many posts in one request"""
+
+    permission_classes = [IsAuthenticated]
+    # The token, one INSERT per batch of the largest array and one to spare
+    query_budget: int = 2 + ceil(
+        settings.POSTS_BULK_MAX_ITEMS / settings.POSTS_BULK_BATCH_SIZE
+    )
+
+    def post(self, request: Request) -> Response:
+        """Create every valid post of a JSON array and report the invalid ones
+
+        The valid posts are written in one transaction, batch_size rows per
+        INSERT. The response is a 201 when every item was created, a 207
+        when some were not and a 400 when none was
+        """
+        serializer: BulkPostSerializer = BulkPostSerializer(
+            data=request.data, max_length=settings.POSTS_BULK_MAX_ITEMS
+        )
+        if not serializer.is_valid():
+            return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user: AbstractBaseUser | AnonymousUser = request.user
+        posts: list[Post] = [
+            Post(author=user, **item) for item in serializer.validated_data
+        ]
+        if posts:
+            with transaction.atomic():
+                Post.objects.bulk_create(
+                    posts, batch_size=settings.POSTS_BULK_BATCH_SIZE
+                )
+            # bulk_create sends no post_save, so the lists are invalidated here
+            cache.bump_version()
+
+        errors: list[dict[str, Any]] = [
+            {"index": index, "errors": item_errors}
+            for index, item_errors in serializer.item_errors.items()
+        ]
+        data: dict[str, Any] = {
+            "created": PostSerializer(instance=posts, many=True).data,
+            "errors": errors,
+        }
+        if not errors:
+            return Response(data=data, status=status.HTTP_201_CREATED)
+        if posts:
+            return Response(data=data, status=status.HTTP_207_MULTI_STATUS)
+        return Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+
+    def patch(self, request: Request) -> Response:
+        """Apply the same changes to the selected posts of the current user
+
+        The posts are selected by ids, created_before or both, and the
+        changes are written with one UPDATE restricted to the author in SQL
+        """
+        selection: PostSelectionSerializer = PostSelectionSerializer(data=request.data)
+        selection.is_valid(raise_exception=True)
+        changes: PostSerializer = PostSerializer(
+            data=request.data.get("changes"), partial=True
+        )
+        if not changes.is_valid():
+            return Response(
+                data={"changes": changes.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if not changes.validated_data:
+            return Response(
+                data={"changes": ["No field to update."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # update() skips auto_now, so updated is set here
+        updated: int = selection.select(
+            Post.objects.filter(author_id=request.user.pk)
+        ).update(**changes.validated_data, updated=timezone.now())
+        if updated:
+            # update() sends no post_save, so the lists are invalidated here
+            cache.bump_version()
+        return Response(data={"updated": updated}, status=status.HTTP_200_OK)
+
+    def delete(self, request: Request) -> Response:
+        """Delete the selected posts of the current user
+
+        However many posts are selected, they are removed with one DELETE
+        and the posts version is bumped once it is committed
+        """
+        selection: PostSelectionSerializer = PostSelectionSerializer(data=request.data)
+        selection.is_valid(raise_exception=True)
+
+        deleted: int = delete_rows(
+            selection.select(Post.objects.filter(author_id=request.user.pk))
+        )
+        if deleted:
+            # No post_delete is sent, so the lists are invalidated here
+            transaction.on_commit(cache.bump_version)
+        return Response(data={"deleted": deleted}, status=status.HTTP_200_OK)
+
+
+class PostDetailView(ServerTimingMixin, APIView):
     """View for each post"""
 
     permission_classes = [IsAdminUser | IsAuthorOrReadOnly]
+    query_budget: int = 4
 
-    def get(self, request: Request, post_id: int) -> Response:
+    def get(self, request: Request, post_id: int) -> HttpResponseBase:
         """Get one post"""
-        post: Post = get_object_or_404(Post, pk=post_id)
+        if conditional.is_conditional(request):
+            # Only the columns of the validators are read to answer a still
+            # current client
+            updated, author = get_object_or_404(
+                Post.objects.values_list("updated", "author__username"), pk=post_id
+            )
+            not_modified: HttpResponseBase | None = conditional.evaluate(
+                request, *conditional.post_validators(request, post_id, updated, author)
+            )
+            if not_modified is not None:
+                return not_modified
+
+        fields: list[str] | None = requested_fields(request, PostSerializer)
+        post: Post = get_object_or_404(
+            # The validators of the response read the updated column and the
+            # username of the author
+            PostSerializer.project(
+                Post.objects.select_related("author"),
+                fields,
+                "id",
+                "updated",
+                "author__username",
+            ),
+            pk=post_id,
+        )
         self.check_object_permissions(request, post)
-        serializer: PostSerializer = PostSerializer(instance=post)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        return self.post_response(request, post, fields)
 
     def put(self, request: Request, post_id: int) -> Response:
         """Update a post"""
         data: dict[str, Any] = request.data
-        post: Post = get_object_or_404(Post, pk=post_id)
-        self.check_object_permissions(request, post)
+        post: Post = self.get_post_for_write(request, post_id)
         serializer: PostSerializer = PostSerializer(instance=post, data=data)
         if serializer.is_valid():
             serializer.save()
             return Response(data=serializer.data, status=status.HTTP_200_OK)
         return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def patch(self, request: Request, post_id: int) -> HttpResponseBase:
+        """Update some fields of a post
+
+        With If-Match or If-Unmodified-Since, the post is written only if it
+        still is the version the client read, otherwise a 412 is returned
+        """
+        post: Post = self.get_post_for_write(request, post_id)
+        serializer: PostSerializer = PostSerializer(
+            instance=post, data=request.data, partial=True
+        )
+        if not serializer.is_valid():
+            return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if not conditional.is_conditional(request):
+            serializer.save()
+        else:
+            precondition_failed: HttpResponseBase | None = conditional.evaluate(
+                request, *self.post_validators(request, post)
+            )
+            if precondition_failed is not None:
+                return precondition_failed
+            self.compare_and_set(post, serializer.validated_data)
+        return self.post_response(request, post)
+
     def delete(self, request: Request, post_id: int) -> Response:
-        """Delete a post"""
-        post: Post = get_object_or_404(Post, pk=post_id)
+        """Delete a post conditioned on its author"""
+        posts: QuerySet = self.own_posts(request, post_id)
+
+        deleted, _ = posts.delete()
+        if deleted:
+            response: dict[str, str] = {"Message": "Deleted"}
+            return Response(data=response, status=status.HTTP_200_OK)
+
+        # Only a refused delete pays a second query to tell a 403 from a 404
+        self.refuse_delete(request, Post.objects.filter(pk=post_id).exists())
+
+    def own_posts(self, request: Request, post_id: int) -> QuerySet:
+        """Return the post the user may delete, the admins may delete any"""
+        posts: QuerySet = Post.objects.filter(pk=post_id)
+        # The admin override of permission_classes
+        if not IsAdminUser().has_permission(request, self):
+            posts = posts.filter(author_id=request.user.pk)
+        return posts
+
+    def refuse_delete(self, request: Request, exists: bool) -> NoReturn:
+        """Raise a 403 when the post exists, a 404 otherwise"""
+        if exists:
+            self.permission_denied(request)
+        raise NotFound(f"No {Post._meta.object_name} matches the given query.")
+
+    def post_response(
+        self, request: Request, post: Post, fields: list[str] | None = None
+    ) -> Response:
+        """Return the post along with its validators"""
+        serializer: PostSerializer = PostSerializer(instance=post, fields=fields)
+        response: Response = Response(data=serializer.data, status=status.HTTP_200_OK)
+        return conditional.set_validators(
+            response, *self.post_validators(request, post)
+        )
+
+    @staticmethod
+    def post_validators(request: Request, post: Post) -> tuple[str, int]:
+        """Return the validators of a post loaded along with its author"""
+        return conditional.post_validators(
+            request, post.pk, post.updated, post.author.username
+        )
+
+    def get_post_for_write(self, request: Request, post_id: int) -> Post:
+        """Return the post to change once the user is allowed to
+
+        The author is joined, the response and its validators show the
+        username, so it is never queried on its own
+        """
+        post: Post = get_object_or_404(
+            Post.objects.select_related("author"), pk=post_id
+        )
         self.check_object_permissions(request, post)
-        post.delete()
-        response: dict[str, str] = {"Message": "Deleted"}
-        return Response(data=response, status=status.HTTP_200_OK)
+        return post
+
+    def compare_and_set(self, post: Post, validated_data: dict[str, Any]) -> None:
+        """Write the changed fields only if the post was not updated meanwhile
+
+        The UPDATE is conditioned on the updated value the preconditions
+        were checked against, so no row lock is held between the two
+        """
+        changed: dict[str, Any] = PostSerializer.changed_fields(post, validated_data)
+        if not changed:
+            return
+        now: datetime = timezone.now()
+        if not Post.objects.filter(pk=post.pk, updated=post.updated).update(
+            **changed, updated=now
+        ):
+            raise conditional.PreconditionFailed()
+        # update() sends no post_save, so the lists are invalidated here
+        cache.bump_version()
+        for name, value in changed.items():
+            setattr(post, name, value)
+        post.updated = now
 
 
-class PostsForUserView(GenericAPIView):
+class PostsForUserView(ServerTimingMixin, GenericAPIView):
     """Show all the posts created by the current user"""
 
     permission_classes = [IsAuthenticated]
+    query_budget: int = 3
     serializer_class = PostSerializer
     queryset = Post.objects.all()
+    pagination_class = KeysetPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+    stream_chunk_size: int = 500
 
     @override
     def get_queryset(self) -> QuerySet:
         user: AbstractBaseUser | AnonymousUser = self.request.user
         return Post.objects.filter(author=user)
 
+    def get(self, request: Request) -> HttpResponseBase:
+        """Get one page of the posts created by the authenticated user,
+        or all of them when streaming"""
+        fields: list[str] | None = requested_fields(request, PostSerializer)
+        if wants_stream(request):
+            return stream_posts(self.get_queryset(), self.stream_chunk_size, fields)
+
+        etag, last_modified = conditional.list_validators(
+            request, cache.get_version(), request.user.pk
+        )
+        not_modified: HttpResponseBase | None = conditional.evaluate(
+            request, etag, last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        serializer: PostValuesSerializer = PostValuesSerializer(fields=fields)
+        rows: Iterable | None = self.paginate_queryset(
+            serializer.rows(self.get_queryset())
+        )
+
+        response: Response = self.get_paginated_response(serializer.data(rows))
+        return conditional.set_validators(response, etag, last_modified)
+
+
+class PostSearchView(ServerTimingMixin, APIView):
+    """Search the posts by the words of their title and description"""
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    query_budget: int = 3
+    pagination_class = SearchPagination
+
+    def get(self, request: Request) -> Response:
+        """Return one page of the posts matching every word of ?q=, best first"""
+        fields: list[str] | None = requested_fields(request, PostSerializer)
+        expression: str | None = match_expression(request.query_params.get("q", ""))
+        if expression is None:
+            return Response(
+                data={"q": ["Give at least one word to search for."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        paginator: SearchPagination = self.pagination_class()
+        posts: list[Post] = paginator.paginate_search(
+            PostSerializer.project(Post.objects.select_related("author"), fields, "id"),
+            expression,
+            request,
+            view=self,
+        )
+        serializer: PostSerializer = PostSerializer(
+            instance=posts, many=True, fields=fields
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+
+class PostsCacheStatsView(ServerTimingMixin, APIView):
+    """Show the hit and miss counters of the posts list cache"""
+
+    permission_classes = [IsAdminUser]
+    query_budget: int = 1
+
     def get(self, _request: Request) -> Response:
-        """Get all the posts created by the authenticated user"""
-        posts: QuerySet = self.get_queryset()
-        serializer: PostSerializer | BaseSerializer = self.get_serializer_class()(
-            instance=posts, many=True
+        """Return the counters of this worker process"""
+        return Response(data=cache.stats.snapshot(), status=status.HTTP_200_OK)
+
+
+class AsyncPostListView(AsyncAPIView, PostListView):
+    """PostListView served on the event loop, reading with the async ORM"""
+
+    async def get(self, request: Request) -> HttpResponseBase:
+        """Return one page of posts, newest first, or all of them when streaming"""
+        fields: list[str] | None = requested_fields(request, PostSerializer)
+        if wants_stream(request):
+            return astream_posts(Post.objects.all(), self.stream_chunk_size, fields)
+
+        # Read once, before the posts, so a write meanwhile retires the page
+        version: int = await cache.aget_version()
+        etag, last_modified = conditional.list_validators(request, version)
+        cached: HttpResponseBase | None = self.cached_response(
+            request, version, etag, last_modified
+        )
+        if cached is not None:
+            return cached
+
+        paginator: KeysetPagination = self.pagination_class()
+        serializer: PostValuesSerializer = PostValuesSerializer(fields=fields)
+        rows: Iterable = await paginator.apaginate_queryset(
+            serializer.rows(Post.objects.all()), request, view=self
+        )
+        return self.page_response(
+            request, version, paginator, serializer.data(rows), etag, last_modified
+        )
+
+    async def post(self, request: Request) -> Response:
+        """create a new post"""
+        serializer: PostSerializer = PostSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.instance = await Post.objects.acreate(
+                author=request.user, **serializer.validated_data
+            )
+            return Response(data=serializer.data, status=status.HTTP_201_CREATED)
+        return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncPostDetailView(AsyncAPIView, PostDetailView):
+    """PostDetailView served on the event loop, reading with the async ORM"""
+
+    async def get(self, request: Request, post_id: int) -> HttpResponseBase:
+        """Get one post"""
+        if conditional.is_conditional(request):
+            # Only the columns of the validators are read to answer a still
+            # current client
+            updated, author = await aget_object_or_404(
+                Post.objects.values_list("updated", "author__username"), pk=post_id
+            )
+            not_modified: HttpResponseBase | None = conditional.evaluate(
+                request, *conditional.post_validators(request, post_id, updated, author)
+            )
+            if not_modified is not None:
+                return not_modified
+
+        fields: list[str] | None = requested_fields(request, PostSerializer)
+        post: Post = await aget_object_or_404(
+            # The validators of the response read the updated column and the
+            # username of the author
+            PostSerializer.project(
+                Post.objects.select_related("author"),
+                fields,
+                "id",
+                "updated",
+                "author__username",
+            ),
+            pk=post_id,
+        )
+        self.check_object_permissions(request, post)
+        return self.post_response(request, post, fields)
+
+    async def put(self, request: Request, post_id: int) -> Response:
+        """Update a post"""
+        post: Post = await self.aget_post_for_write(request, post_id)
+        serializer: PostSerializer = PostSerializer(instance=post, data=request.data)
+        if serializer.is_valid():
+            await sync_to_async(serializer.save)()
+            return Response(data=serializer.data, status=status.HTTP_200_OK)
+        return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    async def patch(self, request: Request, post_id: int) -> HttpResponseBase:
+        """Update some fields of a post, see PostDetailView.patch"""
+        post: Post = await self.aget_post_for_write(request, post_id)
+        serializer: PostSerializer = PostSerializer(
+            instance=post, data=request.data, partial=True
+        )
+        if not serializer.is_valid():
+            return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if not conditional.is_conditional(request):
+            await sync_to_async(serializer.save)()
+        else:
+            precondition_failed: HttpResponseBase | None = conditional.evaluate(
+                request, *self.post_validators(request, post)
+            )
+            if precondition_failed is not None:
+                return precondition_failed
+            await sync_to_async(self.compare_and_set)(post, serializer.validated_data)
+        return self.post_response(request, post)
+
+    async def delete(self, request: Request, post_id: int) -> Response:
+        """Delete a post conditioned on its author"""
+        posts: QuerySet = self.own_posts(request, post_id)
+
+        deleted, _ = await posts.adelete()
+        if deleted:
+            response: dict[str, str] = {"Message": "Deleted"}
+            return Response(data=response, status=status.HTTP_200_OK)
+
+        # Only a refused delete pays a second query to tell a 403 from a 404
+        self.refuse_delete(request, await Post.objects.filter(pk=post_id).aexists())
+
+    async def aget_post_for_write(self, request: Request, post_id: int) -> Post:
+        """Return the post to change like get_post_for_write"""
+        post: Post = await aget_object_or_404(
+            Post.objects.select_related("author"), pk=post_id
+        )
+        self.check_object_permissions(request, post)
+        return post
+
+
+class AsyncPostsForUserView(AsyncAPIView, PostsForUserView):
+    """PostsForUserView served on the event loop, reading with the async ORM"""
+
+    async def get(self, request: Request) -> HttpResponseBase:
+        """Get one page of the posts created by the authenticated user,
+        or all of them when streaming"""
+        fields: list[str] | None = requested_fields(request, PostSerializer)
+        if wants_stream(request):
+            return astream_posts(self.get_queryset(), self.stream_chunk_size, fields)
+
+        etag, last_modified = conditional.list_validators(
+            request, await cache.aget_version(), request.user.pk
+        )
+        not_modified: HttpResponseBase | None = conditional.evaluate(
+            request, etag, last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        serializer: PostValuesSerializer = PostValuesSerializer(fields=fields)
+        rows: list[tuple] = await self.paginator.apaginate_queryset(
+            serializer.rows(self.get_queryset()), request, view=self
         )
 
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        response: Response = self.get_paginated_response(serializer.data(rows))
+        return conditional.set_validators(response, etag, last_modified)